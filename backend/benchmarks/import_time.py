@@ -0,0 +1,94 @@
+"""
+Başlangıç import süresi ölçümü.
+
+'python -X importtime' ile django.setup() (ve istenirse URLconf yükleme)
+süresini ölçer, en pahalı modülleri listeler ve eşik aşılırsa ya da
+tembel yüklenmesi gereken ağır SDK'lar başlangıçta import edilirse
+sıfırdan farklı kodla çıkar.
+
+Kullanım (backend/ dizininden):
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --target urls --max-ms 2500 --runs 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+TARGETS = {
+    # Her manage.py komutu ve worker bunu öder
+    'setup': 'import django; django.setup()',
+    # Worker'ın ilk isteğinde (ve manage.py check'te) yüklenen URLconf
+    'urls': 'import django; django.setup(); from django.urls import get_resolver; get_resolver().url_patterns',
+}
+
+DEFAULT_MAX_MS = {'setup': 1500, 'urls': 2500}
+
+# Başlangıçta yüklenmemesi gereken modüller (auth_providers ile tembel yüklenir)
+FORBIDDEN_PREFIXES = ('firebase_admin', 'grpc', 'google.cloud', 'google.oauth2', 'google.auth')
+
+
+def run_once(code):
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(result.returncode)
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        # İç içe importlar ek boşlukla girintilenir
+        modules.append((name[1:].rstrip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', choices=sorted(TARGETS), default='setup')
+    parser.add_argument('--max-ms', type=float, default=None, help='Toplam import süresi eşiği (ms)')
+    parser.add_argument('--runs', type=int, default=3, help='En iyi sonuç için tekrar sayısı')
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    max_ms = args.max_ms or DEFAULT_MAX_MS[args.target]
+    best = None
+    for _ in range(args.runs):
+        modules = run_once(TARGETS[args.target])
+        total_ms = sum(self_us for _, self_us, _ in modules) / 1000
+        if best is None or total_ms < best[0]:
+            best = (total_ms, modules)
+    total_ms, modules = best
+
+    print(f"Hedef: {args.target}  toplam import: {total_ms:.1f} ms  ({len(modules)} modül, eşik {max_ms:.0f} ms)")
+    print(f"\n{'kümülatif ms':>13}  modül")
+    top_level = [m for m in modules if not m[0].startswith(' ')]
+    for name, _, cumulative_us in sorted(top_level, key=lambda m: -m[2])[:args.top]:
+        print(f"{cumulative_us / 1000:>13.1f}  {name.strip()}")
+
+    failed = False
+    forbidden = sorted({
+        name.strip() for name, _, _ in modules
+        if name.strip().startswith(FORBIDDEN_PREFIXES)
+    })
+    if forbidden:
+        failed = True
+        print(f"\nHATA: başlangıçta yüklenmemesi gereken modüller: {', '.join(forbidden[:10])}")
+    if total_ms > max_ms:
+        failed = True
+        print(f"\nHATA: import süresi eşiği aşıldı ({total_ms:.1f} ms > {max_ms:.0f} ms)")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
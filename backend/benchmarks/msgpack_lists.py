@@ -0,0 +1,96 @@
+"""
+Liste yanıtlarında JSON ile MessagePack karşılaştırması.
+
+Geçici bir test veritabanında arkadaş listesi ve kullanıcı araması
+verisini (view'ların döndürdüğü veriyle aynı) üretir, iki renderer'ın
+kodlama/çözme süresini ve yanıt boyutunu (ham ve gzip'li) ölçer.
+
+Kullanım (backend/ dizininden):
+    python benchmarks/msgpack_lists.py
+    python benchmarks/msgpack_lists.py --rows 2000 --runs 50
+"""
+import argparse
+import gzip
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+import msgpack  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from benchmarks.serialization import seed  # noqa: E402
+from core.renderers import MessagePackRenderer  # noqa: E402
+from friends.models import Friendship  # noqa: E402
+from friends.serializers import FriendshipRowSerializer  # noqa: E402
+from users.cards import user_cards  # noqa: E402
+from users.models import CustomUser  # noqa: E402
+from users.serializers import UserSearchRowSerializer  # noqa: E402
+
+
+def timed(func, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=500)
+    parser.add_argument('--runs', type=int, default=30)
+    args = parser.parse_args()
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        me = seed(args.rows)
+        request = RequestFactory().get('/')
+        request.user = me
+
+        friends_serializer = FriendshipRowSerializer({'request': request})
+        friends = list((Friendship.objects.filter(user1=me) | Friendship.objects.filter(user2=me))
+                       .values(*friends_serializer.values_fields))
+        friends_serializer.context['user_cards'] = user_cards.get_many(friends_serializer.card_ids(friends))
+        search_serializer = UserSearchRowSerializer({'request': request})
+        search = CustomUser.objects.exclude(id=me.id).values(*search_serializer.values_fields)
+        payloads = {
+            'my-friends': friends_serializer.serialize(friends),
+            'search': search_serializer.serialize(search),
+        }
+
+        json_renderer, msgpack_renderer = JSONRenderer(), MessagePackRenderer()
+        print(f'Veritabanı: {connection.vendor}, liste başına {args.rows} satır\n')
+        print(f"{'liste':<12} {'biçim':<8} {'kodlama':>9} {'çözme':>9} {'boyut':>9} {'gzip':>9}")
+        for name, data in payloads.items():
+            encoded_json = json_renderer.render(data)
+            encoded_msgpack = msgpack_renderer.render(data)
+            assert msgpack.unpackb(encoded_msgpack) == json.loads(encoded_json)
+            for label, renderer, encoded, decode in (
+                ('json', json_renderer, encoded_json, json.loads),
+                ('msgpack', msgpack_renderer, encoded_msgpack, msgpack.unpackb),
+            ):
+                encode_ms = timed(lambda: renderer.render(data), args.runs)
+                decode_ms = timed(lambda: decode(encoded), args.runs)
+                print(f'{name:<12} {label:<8} {encode_ms:>7.2f}ms {decode_ms:>7.2f}ms '
+                      f'{len(encoded):>9} {len(gzip.compress(encoded)):>9}')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
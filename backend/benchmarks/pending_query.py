@@ -0,0 +1,125 @@
+"""
+Arşivlemenin bekleyen istek sorgularına etkisi.
+
+Geçici bir test veritabanı oluşturur (ayarlardaki veritabanına dokunmaz),
+çok sayıda eski onaylanmış/reddedilmiş ve az sayıda bekleyen istek ekler,
+PendingRequestsView ve SendFriendRequestView sorgularını arşivlemeden önce
+ve sonra ölçer.
+
+Kullanım (backend/ dizininden):
+    python benchmarks/pending_query.py
+    python benchmarks/pending_query.py --terminal 500000 --pending 1000 --runs 30
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from friends.models import FriendRequest  # noqa: E402
+from users.models import CustomUser  # noqa: E402
+
+
+def seed(user_count, terminal, pending):
+    CustomUser.objects.bulk_create(
+        [CustomUser(username=f'bench{i}', password='!') for i in range(user_count)],
+        batch_size=1000,
+    )
+    user_ids = list(CustomUser.objects.order_by('id').values_list('id', flat=True))
+
+    def pairs(start, count):
+        # (sender, receiver) benzersiz ve farklı: k -> (k mod U, k mod U + k div U + 1)
+        for k in range(start, start + count):
+            sender = k % user_count
+            yield user_ids[sender], user_ids[(sender + k // user_count + 1) % user_count]
+
+    batch = []
+    for k, (sender_id, receiver_id) in enumerate(pairs(0, terminal + pending)):
+        batch.append(FriendRequest(
+            sender_id=sender_id, receiver_id=receiver_id,
+            status='pending' if k >= terminal else ('approved' if k % 2 else 'rejected'),
+        ))
+        if len(batch) == 5000:
+            FriendRequest.objects.bulk_create(batch)
+            batch = []
+    FriendRequest.objects.bulk_create(batch)
+
+    # Sonuçlanmış istekleri eskit (update() auto_now'ı tetiklemez)
+    FriendRequest.objects.exclude(status='pending').update(updated_at=timezone.now() - timedelta(days=365))
+
+
+def timed(func, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.9) - 1]
+
+
+def measure(runs):
+    probe = FriendRequest.objects.filter(status='pending').values_list('sender_id', 'receiver_id').first()
+    queries = {
+        # PendingRequestsView.get_queryset
+        'pending list': lambda: list(
+            FriendRequest.objects.filter(status='pending').select_related('sender', 'receiver')
+        ),
+        'pending count': lambda: FriendRequest.objects.filter(status='pending').count(),
+        # SendFriendRequestView mevcut istek kontrolü
+        'send lookup': lambda: FriendRequest.objects.filter(sender_id=probe[0], receiver_id=probe[1]).first(),
+    }
+    return {name: timed(func, runs) for name, func in queries.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--terminal', type=int, default=100000, help='Onaylanmış/reddedilmiş istek sayısı')
+    parser.add_argument('--pending', type=int, default=500)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        print(f'Veritabanı: {connection.vendor}, {args.terminal} sonuçlanmış + {args.pending} bekleyen istek')
+        seed(args.users, args.terminal, args.pending)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE friends_friendrequest')
+
+        before = measure(args.runs)
+        started = time.monotonic()
+        call_command('archive_friend_requests', days=30, batch=5000, sleep=0, verbosity=0, stdout=open(os.devnull, 'w'))
+        archive_seconds = time.monotonic() - started
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM ANALYZE friends_friendrequest')
+        after = measure(args.runs)
+
+        print(f'Arşivleme: {archive_seconds:.1f} sn, kalan satır: {FriendRequest.objects.count()}\n')
+        print(f"{'sorgu':<15} {'önce p50':>10} {'önce p90':>10} {'sonra p50':>10} {'sonra p90':>10} {'hızlanma':>9}")
+        for name, (p50, p90) in before.items():
+            a50, a90 = after[name]
+            print(f'{name:<15} {p50:>8.2f}ms {p90:>8.2f}ms {a50:>8.2f}ms {a90:>8.2f}ms {p50 / a50 if a50 else 0:>8.1f}x')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Liste endpoint'lerinde DRF serializer'ları ile .values() satır
+serializer'larının (core.rows) karşılaştırması.
+
+Geçici bir test veritabanı oluşturur ve her liste için satır başına
+serileştirme süresini ölçer. Sorgular ve kart önbelleği ölçüme dahil
+değildir. İki yolun çıktısının byte byte aynı olduğu 'manage.py test'
+içinde doğrulanır (friends/tests.py, users/tests.py).
+
+Kullanım (backend/ dizininden):
+    python benchmarks/serialization.py
+    python benchmarks/serialization.py --rows 2000 --runs 30
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+
+from friends.models import BlockedUser, FriendRequest, Friendship  # noqa: E402
+from friends.serializers import (  # noqa: E402
+    BlockedUserRowSerializer, BlockedUserSerializer, FriendRequestAdminRowSerializer,
+    FriendRequestAdminSerializer, FriendshipRowSerializer, FriendshipSerializer,
+)
+from users.cards import user_cards  # noqa: E402
+from users.models import CustomUser  # noqa: E402
+from users.serializers import UserSearchRowSerializer, UserSearchSerializer  # noqa: E402
+
+
+def seed(rows):
+    users = []
+    for i in range(rows + 1):
+        user = CustomUser(username=f'bench{i}', password='!', first_name=f'Ad{i}' if i % 5 else '',
+                          last_name='Soyad' if i % 5 else '', email=f'bench{i}@example.com')
+        # Fotoğraf türlerinin karışımı: yok, harici URL, dosya, dosya + varyantlar
+        if i % 4 == 1:
+            user.profile_photo = f'https://example.com/p/{i}.jpg'
+        elif i % 4 == 2:
+            user.profile_photo_file = f'profile_photos/bench{i}.jpg'
+        elif i % 4 == 3:
+            user.profile_photo_file = f'profile_photos/bench{i}.jpg'
+            user.profile_photo_variants = {
+                str(size): f'profile_photos/variants/{i}/x_{size}.webp' for size in settings.PROFILE_PHOTO_SIZES
+            }
+        users.append(user)
+    CustomUser.objects.bulk_create(users, batch_size=1000)
+    me, *others = CustomUser.objects.order_by('id')
+    Friendship.objects.bulk_create(
+        [Friendship(user1=me, user2=other) if i % 2 else Friendship(user1=other, user2=me)
+         for i, other in enumerate(others)],
+        batch_size=1000,
+    )
+    FriendRequest.objects.bulk_create(
+        [FriendRequest(sender=other, receiver=me, note=f'not {i}' if i % 3 else '')
+         for i, other in enumerate(others)],
+        batch_size=1000,
+    )
+    BlockedUser.objects.bulk_create([BlockedUser(blocker=me, blocked=other) for other in others], batch_size=1000)
+    return me
+
+
+def timed(func, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=500)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        me = seed(args.rows)
+        cases = [
+            ('my-friends', Friendship.objects.filter(user1=me) | Friendship.objects.filter(user2=me),
+             FriendshipSerializer, FriendshipRowSerializer),
+            ('pending', FriendRequest.objects.filter(status='pending'),
+             FriendRequestAdminSerializer, FriendRequestAdminRowSerializer),
+            ('blocked', BlockedUser.objects.filter(blocker=me),
+             BlockedUserSerializer, BlockedUserRowSerializer),
+            ('search', CustomUser.objects.exclude(id=me.id),
+             UserSearchSerializer, UserSearchRowSerializer),
+        ]
+        print(f'Veritabanı: {connection.vendor}, liste başına {args.rows} satır\n')
+        print(f"{'liste':<12} {'photo_size':<10} {'DRF/satır':>11} {'satır/satır':>12} {'hızlanma':>9}")
+        for photo_size in ('', '256', 'original'):
+            request = RequestFactory().get('/', {'photo_size': photo_size} if photo_size else {})
+            request.user = me
+            for name, queryset, drf_class, row_class in cases:
+                objects = list(queryset)
+                row_serializer = row_class({'request': request})
+                rows = list(queryset.values(*row_serializer.values_fields))
+                context = {'request': request, 'user_cards': user_cards.get_many(row_serializer.card_ids(rows))}
+
+                drf = timed(lambda: drf_class(objects, many=True, context=context).data, args.runs)
+                fast = timed(lambda: row_class(context).serialize(rows), args.runs)
+                print(f'{name:<12} {photo_size or "-":<10} {drf / len(rows) * 1e6:>9.1f}µs '
+                      f'{fast / len(rows) * 1e6:>10.1f}µs {drf / fast:>8.1f}x')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Büyük tablolar için admin yardımcıları.
+
+Admin değişiklik listesi her sayfada COUNT(*) çalıştırır; milyonlarca
+satırda bu sayfanın kendisinden pahalıdır. EstimatedCountPaginator:
+- filtresiz listede Postgres istatistiklerinden (pg_class.reltuples) tahmin,
+- filtreli/aramalı listede ADMIN_EXACT_COUNT_LIMIT'te kesilen sayım
+kullanır; küçük tablolarda sayım tamdır.
+
+LargeTableAdmin bunu ve tam sonuç sayısını kapatmayı (ikinci COUNT) bir
+arada verir:
+
+    @admin.register(FriendEvent)
+    class FriendEventAdmin(LargeTableAdmin, admin.ModelAdmin): ...
+"""
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+def estimated_count(queryset):
+    """Postgres'te tablonun tahmini satır sayısı; bilinmiyorsa None"""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)',
+            [connection.ops.quote_name(queryset.model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    # Hiç ANALYZE edilmemiş tabloda reltuples -1'dir
+    return row[0] if row and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+        limit = settings.ADMIN_EXACT_COUNT_LIMIT
+        if not queryset.query.where:
+            estimate = estimated_count(queryset)
+            if estimate is not None and estimate > limit:
+                return estimate
+        # Sayım limit'te kesilir (LIMIT'li alt sorgu); daha sonraki sayfalara arama ile inilir
+        return queryset.order_by()[:limit].count()
+
+
+class LargeTableAdmin:
+    """ModelAdmin karışımı: tahmini sayım, ikinci COUNT yok, pk indeksine göre sıralama"""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ['-pk']
@@ -3,14 +3,47 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+ASGI altında giriş endpoint'leri (firebase-login, firebase-register,
+google-login) async view'larla sunulur: token doğrulaması sınırlı bir
+thread havuzunda (AUTH_VERIFY_THREADS) çalışır, event loop bloklanmaz.
+
+Senkron WhiteNoise middleware'i bu modda çıkarılır (settings); statik
+dosyalar collectstatic çıktısından (STATIC_ROOT, manifest'teki hash'li
+adlar) core.media.serve ile sunulur. DEBUG'da finder'lar kullanılır.
+
+Canlı ortamda (backend/ dizininden):
+    gunicorn core.asgi:application -k uvicorn_worker.UvicornWorker
+veya tek süreç:
+    uvicorn core.asgi:application --host 0.0.0.0 --port $PORT
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
 
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
+from core import media
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+os.environ.setdefault('ASYNC_AUTH_VIEWS', '1')
+
+
+class CollectedStaticFilesHandler(ASGIStaticFilesHandler):
+    """STATIC_URL altını STATIC_ROOT'tan sunar (hash'li adlar süresiz önbelleklenir)"""
+
+    def serve(self, request):
+        if settings.DEBUG:
+            return super().serve(request)
+        return media.serve(request, self.file_path(request.path), document_root=settings.STATIC_ROOT)
+
+
+application = CollectedStaticFilesHandler(get_asgi_application())
+
+# last_seen tamponunu arka planda yaz (yalnızca sunucu süreçleri)
+from users.activity import tracker  # noqa: E402
 
-application = get_asgi_application()
+tracker.enable()
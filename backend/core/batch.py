@@ -0,0 +1,240 @@
+"""
+Tek HTTP isteğinde birden çok API çağrısı (POST /api/batch/).
+
+    {
+      "parallel": true,
+      "requests": [
+        {"method": "GET", "path": "/api/users/me/"},
+        {"method": "GET", "path": "/api/friends/my-friends/?fields=id,friend",
+         "headers": {"If-None-Match": "\\"...\\""}},
+        {"method": "POST", "path": "/api/friends/send-request/", "body": {"receiver_id": 5}}
+      ]
+    }
+
+Yanıt aynı sırada: {"responses": [{"status": 200, "headers": {...}, "body": ...}, ...]}
+
+Alt istekler middleware zincirine girmeden, aynı kimlik ve oturumla doğrudan
+view'lara yönlendirilir; her biri kendi yetki kontrolünü yapar. Yalnızca
+BATCH_ALLOWED_PREFIXES altındaki yollar çağrılabilir. Alt istekler birbirinden
+bağımsızdır: biri başarısız olursa diğerleri geri alınmaz.
+
+parallel açıksa art arda gelen GET'ler thread havuzunda (BATCH_MAX_WORKERS)
+aynı anda çalışır; GET dışı istekler sırayla ve bariyer olarak çalışır, yani
+bir yazmadan sonraki okumalar yazmanın sonucunu görür. Thread'deki alt
+istekler kullanıcının bir kopyasını ve aynı anahtarla ayrı yüklenen oturumu
+görür (oturum değişiklikleri kaydedilmez); sorguları üst isteğin bütçe ve
+metrik sayaçlarına eklenir. Async view'lar async_to_sync ile çalıştırılır.
+
+Havuz süreç başına bir kez kurulur (fork sonrası yeniden); thread'ler
+veritabanı bağlantılarını istekler arasında tutar ve CONN_MAX_AGE'e göre
+close_old_connections() ile yeniler, böylece her alt istekte yeni bağlantı
+(ve SSL el sıkışması) açılmaz.
+"""
+import copy
+import io
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+
+from . import metrics, ratelimit
+from .middleware import QueryCounter
+from .querybudget import get_query_budget
+
+logger = logging.getLogger(__name__)
+
+METHODS = {'GET', 'POST', 'PUT', 'PATCH', 'DELETE'}
+# Üst istekten alt isteklere geçmeyen başlıklar (koşullu istekler alt istek başına verilir)
+DROPPED_HEADERS = {
+    'HTTP_ACCEPT', 'HTTP_ACCEPT_ENCODING', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MATCH',
+    'HTTP_IF_MODIFIED_SINCE', 'HTTP_IF_UNMODIFIED_SINCE', 'HTTP_RANGE',
+}
+# Alt yanıtlardan istemciye iletilen başlıklar
+FORWARDED_HEADERS = ('ETag', 'Cache-Control', 'Last-Modified', 'Location', 'Retry-After')
+
+
+class BatchError(ValueError):
+    """Geçersiz toplu istek (400)"""
+
+
+class SubRequest:
+    def __init__(self, spec):
+        if not isinstance(spec, dict):
+            raise BatchError('Her alt istek bir nesne olmalı')
+        self.method = str(spec.get('method', 'GET')).upper()
+        if self.method not in METHODS:
+            raise BatchError(f'Desteklenmeyen metot: {self.method}')
+        path = spec.get('path')
+        if not isinstance(path, str):
+            raise BatchError('path gerekli')
+        self.path, _, self.query_string = path.partition('?')
+        if not any(self.path.startswith(prefix) for prefix in settings.BATCH_ALLOWED_PREFIXES):
+            raise BatchError(f'Bu yol toplu istekte çağrılamaz: {self.path}')
+        headers = spec.get('headers') or {}
+        if not isinstance(headers, dict):
+            raise BatchError('headers bir nesne olmalı')
+        self.headers = {
+            'HTTP_' + str(name).upper().replace('-', '_'): str(value) for name, value in headers.items()
+        }
+        self.body = json.dumps(spec['body']).encode() if spec.get('body') is not None else b''
+        try:
+            self.match = resolve(self.path)
+        except Resolver404:
+            self.match = None
+
+    @property
+    def read_only(self):
+        return self.method == 'GET'
+
+    def build(self, parent, isolated=False):
+        """
+        Üst isteğin kimliği ve oturumuyla alt HttpRequest. isolated ise (thread)
+        oturum ve kullanıcı nesneleri paylaşılmaz.
+        """
+        request = HttpRequest()
+        request.method = self.method
+        request.path = request.path_info = self.path
+        request.META = {key: value for key, value in parent.META.items() if key not in DROPPED_HEADERS}
+        request.META.update(self.headers)
+        request.META.update({
+            'REQUEST_METHOD': self.method,
+            'PATH_INFO': self.path,
+            'QUERY_STRING': self.query_string,
+            'HTTP_ACCEPT': 'application/json',
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(self.body)),
+        })
+        request.GET = QueryDict(self.query_string)
+        request.COOKIES = parent.COOKIES
+        request._stream = io.BytesIO(self.body)
+        request._read_started = False
+        if isolated:
+            request.session = import_module(settings.SESSION_ENGINE).SessionStore(parent.session.session_key)
+            request.user = copy.copy(parent.user)
+        else:
+            request.session = parent.session
+            request.user = parent.user
+        request.resolver_match = self.match
+        return request
+
+
+def response_body(response):
+    # DRF yanıtlarının verisi render edilmeden alınır; dış yanıtla birlikte bir kez kodlanır
+    if hasattr(response, 'data'):
+        return response.data
+    if response.streaming or not response.content:
+        return None
+    if response.get('Content-Type', '').startswith('application/json'):
+        return json.loads(response.content)
+    return response.content.decode(response.charset or 'utf-8', 'replace')
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Süreç başına paylaşılan thread havuzu"""
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool_pid != pid:
+        with _pool_lock:
+            if _pool_pid != pid:
+                _pool = ThreadPoolExecutor(max_workers=settings.BATCH_MAX_WORKERS, thread_name_prefix='batch')
+                _pool_pid = pid
+    return _pool
+
+
+def dispatch(parent, sub, in_thread=False):
+    if sub.match is None:
+        return {'status': 404, 'headers': {}, 'body': {'detail': 'Bulunamadı.'}}
+    view = sub.match.func
+    if iscoroutinefunction(view):
+        view = async_to_sync(view)
+    try:
+        request = sub.build(parent, isolated=in_thread)
+        # Alt istekler middleware'e girmez; hız sınırı burada uygulanır
+        response = ratelimit.check(request, sub.match.func) \
+            or view(request, *sub.match.args, **sub.match.kwargs)
+        result = {
+            'status': response.status_code,
+            'headers': {name: response[name] for name in FORWARDED_HEADERS if response.has_header(name)},
+            'body': response_body(response),
+        }
+    except Exception:
+        logger.exception('batch.subrequest_failed', extra={'method': sub.method, 'path': sub.path})
+        result = {'status': 500, 'headers': {}, 'body': {'detail': 'Sunucu hatası.'}}
+    metrics.registry.inc('batch_subrequests_total', {
+        'route': sub.match.route, 'status': str(result['status']),
+    })
+    return result
+
+
+def dispatch_in_thread(parent, sub):
+    """Havuz thread'inde dispatch; (sonuç, thread'in sorgu sayacı) döndürür"""
+    # request_started/request_finished'in yaptığı gibi: bozuk veya CONN_MAX_AGE'i
+    # dolmuş bağlantıyı kapat, sağlamını sonraki alt isteğe bırak
+    close_old_connections()
+    counter = QueryCounter()
+    try:
+        with connection.execute_wrapper(counter):
+            result = dispatch(parent, sub, in_thread=True)
+    finally:
+        close_old_connections()
+    return result, counter
+
+
+def add_queries(parent, counter):
+    """Thread'de çalışan sorguları üst isteğin bütçe ve metrik sayaçlarına ekle"""
+    for attr in ('_budget_queries', '_metrics_queries'):
+        total = getattr(parent, attr, None)
+        if total is not None:
+            total.count += counter.count
+            total.duration += counter.duration
+
+
+def parse(payload):
+    specs = payload.get('requests') if isinstance(payload, dict) else None
+    if not isinstance(specs, list) or not specs:
+        raise BatchError('requests listesi gerekli')
+    if len(specs) > settings.BATCH_MAX_REQUESTS:
+        raise BatchError(f'En fazla {settings.BATCH_MAX_REQUESTS} alt istek gönderilebilir')
+    return [SubRequest(spec) for spec in specs]
+
+
+def query_budget(subs):
+    """Alt view'ların bütçeleri toplamı (bütçesi olmayanlar için 0)"""
+    return sum(get_query_budget(sub.match.func) or 0 for sub in subs if sub.match is not None)
+
+
+def run(parent, subs, parallel=False):
+    if not parallel or settings.BATCH_MAX_WORKERS <= 1:
+        return [dispatch(parent, sub) for sub in subs]
+
+    pool = get_pool()
+    results = [None] * len(subs)
+    index = 0
+    while index < len(subs):
+        if not subs[index].read_only:
+            results[index] = dispatch(parent, subs[index])
+            index += 1
+            continue
+        # Art arda gelen GET'ler birlikte çalışır
+        end = index
+        while end < len(subs) and subs[end].read_only:
+            end += 1
+        futures = {i: pool.submit(dispatch_in_thread, parent, subs[i]) for i in range(index, end)}
+        for i, future in futures.items():
+            results[i], counter = future.result()
+            add_queries(parent, counter)
+        index = end
+    return results
@@ -0,0 +1,120 @@
+"""
+API yanıtları için brotli/gzip sıkıştırma.
+
+Accept-Encoding'e göre br (brotli kuruluysa) veya gzip seçilir. Yalnızca
+sıkıştırılabilir içerik türleri ve COMPRESSION_MIN_SIZE'dan büyük gövdeler
+sıkıştırılır; streaming yanıtlar (sync ve async) parça parça sıkıştırılır.
+Zaten Content-Encoding taşıyan yanıtlara (ör. WhiteNoise'un önceden
+sıkıştırılmış statik dosyaları) ve Range yanıtlarına dokunulmaz.
+"""
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # brotli isteğe bağlı; yoksa yalnızca gzip
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/msgpack', 'application/javascript',
+    'application/xml', 'image/svg+xml',
+)
+
+
+def accepted_encodings(header):
+    """Accept-Encoding'den q > 0 olan kodlamalar"""
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                continue
+        if coding and q > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def choose_encoding(header):
+    accepted = accepted_encodings(header)
+    if brotli is not None and settings.COMPRESSION_BROTLI and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+class Compressor:
+    def __init__(self, encoding):
+        if encoding == 'br':
+            self.compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+            self.finish = self.compressor.finish
+            self.compress = self.compressor.process
+        else:
+            # wbits=31: gzip başlığı ve CRC
+            self.compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+            self.finish = self.compressor.flush
+            self.compress = self.compressor.compress
+
+    def compress_all(self, data):
+        return self.compress(data) + self.finish()
+
+    def stream(self, chunks):
+        # Parça başına flush edilmez (oran düşer); sıkıştırıcı blok doldukça çıktı verir
+        for chunk in chunks:
+            data = self.compress(chunk)
+            if data:
+                yield data
+        yield self.finish()
+
+    async def astream(self, chunks):
+        async for chunk in chunks:
+            data = self.compress(chunk)
+            if data:
+                yield data
+        yield self.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or response.status_code == 206:
+            return response
+        content_type = response.get('Content-Type', '').lower()
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        # Yanıt kodlamaya göre değişebilir; önbellekler için her durumda Vary
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+        if encoding is None:
+            return response
+        compressor = Compressor(encoding)
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compressor.astream(response.streaming_content)
+            else:
+                response.streaming_content = compressor.stream(response.streaming_content)
+            # Sıkıştırılmış uzunluk önceden bilinmez
+            del response.headers['Content-Length']
+        else:
+            compressed = compressor.compress_all(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # Gövde değişti: güçlü ETag zayıf ETag'e çevrilir (Django GZipMiddleware ile aynı)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,102 @@
+"""
+Seyrek alan seçimi: ?fields= ve ?expand=.
+
+    ?fields=id,friend.full_name,friend.profile_photo_url
+    ?fields=id,sender&expand=sender
+
+fields verilmezse tüm alanlar döner (iç içe kullanıcı kartları dahil).
+fields verildiğinde yalnızca listelenen alanlar döner. İç içe bir kullanıcı
+alanı yalnızca adıyla istenirse id olarak döner (kart hiç yüklenmez);
+expand'de de varsa tam kart, alt alanlarıyla (friend.full_name) istenirse
+kartın yalnızca o alanları döner.
+
+Row serializer'lar (core.rows) seçimi .values() projeksiyonuna kadar indirir;
+DRF serializer'ları için SparseFieldsMixin kullanılır.
+"""
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+
+def split_param(values):
+    return [item.strip() for value in values for item in value.split(',') if item.strip()]
+
+
+class FieldSet:
+    def __init__(self, fields=None, expand=()):
+        # None: tüm alanlar
+        self.selected = None
+        self.nested = {}
+        if fields:
+            self.selected = set()
+            for path in fields:
+                name, _, subfield = path.partition('.')
+                self.selected.add(name)
+                if subfield:
+                    self.nested.setdefault(name, set()).add(subfield)
+        self.expand = set(expand)
+
+    @classmethod
+    def from_request(cls, request):
+        params = getattr(request, 'query_params', request.GET)
+        return cls(split_param(params.getlist('fields')), split_param(params.getlist('expand')))
+
+    def validate(self, available):
+        if self.selected is None:
+            return
+        unknown = self.selected - set(available)
+        if unknown:
+            raise ValidationError({'fields': f"Bilinmeyen alan(lar): {', '.join(sorted(unknown))}"})
+
+    def includes(self, name):
+        return self.selected is None or name in self.selected
+
+    def expanded(self, name):
+        """İç içe kullanıcı alanı kart olarak mı dönecek (yoksa id)"""
+        return self.selected is None or name in self.expand or name in self.nested
+
+    def pick(self, name, data):
+        """İç içe nesneden yalnızca istenen alt alanlar"""
+        subfields = self.nested.get(name)
+        if not subfields or data is None:
+            return data
+        unknown = subfields - data.keys()
+        if unknown:
+            raise ValidationError({'fields': f"Bilinmeyen alan(lar): {', '.join(f'{name}.{s}' for s in sorted(unknown))}"})
+        return {key: value for key, value in data.items() if key in subfields}
+
+    def filter(self, data):
+        """Hazır bir sözlükte (ör. önbellekten gelen kart) seçimi uygula"""
+        if self.selected is None:
+            return data
+        self.validate(data.keys())
+        return {key: value for key, value in data.items() if key in self.selected}
+
+
+ALL_FIELDS = FieldSet()
+
+
+def fieldset_from_context(context):
+    """Serializer context'indeki seçim; yoksa istekten ayrıştırılıp context'e yazılır"""
+    fieldset = context.get('fieldset')
+    if fieldset is None:
+        request = context.get('request')
+        fieldset = FieldSet.from_request(request) if request is not None else ALL_FIELDS
+        context['fieldset'] = fieldset
+    return fieldset
+
+
+class SparseFieldsMixin:
+    """DRF serializer'larında ?fields= ile istenmeyen alanları hiç hesaplamaz"""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # Yalnızca kök serializer (veya many=True listesinin elemanı) seçimi uygular
+        if not isinstance(self.parent, (type(None), serializers.ListSerializer)):
+            return fields
+        fieldset = fieldset_from_context(self.context)
+        readable = [name for name, field in fields.items() if not field.write_only]
+        fieldset.validate(readable)
+        return {
+            name: field for name, field in fields.items()
+            if field.write_only or fieldset.includes(name)
+        }
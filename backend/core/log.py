@@ -0,0 +1,44 @@
+"""
+Yapılandırılmış (JSON satır) ve örneklemeli loglama yardımcıları.
+LOGGING ayarında formatter ve filter olarak kullanılır.
+"""
+import json
+import logging
+import random
+
+# LogRecord'un standart alanları; bunların dışındakiler 'extra' ile gelmiştir
+_RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class SamplingFilter(logging.Filter):
+    """
+    WARNING ve üstü her zaman geçer, altındaki kayıtlardan
+    sadece 'rate' oranında rastgele örnek geçer.
+    """
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = float(rate)
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Her kaydı extra alanlarıyla birlikte tek satır JSON olarak yazar"""
+
+    def format(self, record):
+        payload = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'event': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
@@ -0,0 +1,133 @@
+"""
+Üretimde MEDIA_ROOT'tan dosya sunumu (MEDIA_SERVE). ASGI modunda
+collectstatic çıktısı (STATIC_ROOT) da bununla sunulur (core/asgi.py).
+
+- İçerik özetli adlar (core.storage) bir yıl, 'immutable' önbelleklenir;
+  diğerleri MEDIA_CACHE_MAX_AGE kadar
+- ETag / Last-Modified ile koşullu istekler (304)
+- Tek aralıklı 'Range: bytes=...' istekleri (206, 416)
+- Önceden sıkıştırılmış .br/.gz kardeş dosyalar (collectstatic üretir)
+  Accept-Encoding izin veriyorsa gönderilir; ETag ve aralıklar seçilen
+  temsile göredir
+"""
+import mimetypes
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from .compression import accepted_encodings
+from .storage import is_hashed_name
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+# Tercih sırasıyla (Content-Encoding, dosya uzantısı)
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+
+def parse_range(header, size):
+    """(başlangıç, bitiş) kapalı aralık; geçersizse None, karşılanamazsa ValueError"""
+    match = RANGE_RE.match(header.strip())
+    if not match or not any(match.groups()):
+        return None  # desteklenmeyen biçim (ör. çoklu aralık): tam dosya döner
+    start, end = match.groups()
+    if start == '':
+        # bytes=-N: son N byte
+        length = int(end)
+        if length == 0:
+            raise ValueError
+        return max(size - length, 0), size - 1
+    start = int(start)
+    if end and int(end) < start:
+        return None  # sözdizimi geçersiz (RFC 9110 14.1.1): yok sayılır, tam dosya döner
+    if start >= size:
+        raise ValueError
+    return start, min(int(end), size - 1) if end else size - 1
+
+
+def read_range(path, start, end):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def negotiate(full_path, accept_encoding):
+    """(gönderilecek dosya, Content-Encoding, .br/.gz kardeşi var mı)"""
+    siblings = [
+        (coding, full_path.with_name(full_path.name + suffix)) for coding, suffix in PRECOMPRESSED
+    ]
+    siblings = [(coding, sibling) for coding, sibling in siblings if sibling.is_file()]
+    accepted = accepted_encodings(accept_encoding) if siblings else set()
+    for coding, sibling in siblings:
+        if coding in accepted:
+            return sibling, coding, True
+    return full_path, None, bool(siblings)
+
+
+def serve(request, path, document_root=None):
+    try:
+        full_path = Path(safe_join(document_root or settings.MEDIA_ROOT, path))
+    except Exception:
+        raise Http404
+    if not full_path.is_file():
+        raise Http404
+
+    name = full_path.name
+    content_type, encoding = mimetypes.guess_type(name)
+    vary = False
+    # Kendisi sıkıştırılmış dosyalar (ör. .gz arşivi) olduğu gibi gönderilir
+    if encoding is None:
+        full_path, encoding, vary = negotiate(full_path, request.headers.get('Accept-Encoding', ''))
+    stat = full_path.stat()
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    last_modified = http_date(stat.st_mtime)
+    if is_hashed_name(path):
+        cache_control = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        cache_control = f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+
+    response = get_conditional_response(request, etag=etag, last_modified=stat.st_mtime)
+    if response is None:
+        content_type = content_type or 'application/octet-stream'
+        range_header = request.headers.get('Range')
+        # If-Range eşleşmezse dosya değişmiş demektir: tam dosya gönderilir
+        if_range = request.headers.get('If-Range')
+        if range_header and if_range and if_range not in (etag, last_modified):
+            range_header = None
+        try:
+            byte_range = parse_range(range_header, stat.st_size) if range_header else None
+        except ValueError:
+            response = HttpResponse(status=416)
+            response.headers['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+
+        if byte_range is None:
+            response = FileResponse(open(full_path, 'rb'), content_type=content_type, filename=name)
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                read_range(full_path, start, end), status=206, content_type=content_type
+            )
+            response.headers['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            response.headers['Content-Length'] = str(end - start + 1)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = last_modified
+    response.headers['Cache-Control'] = cache_control
+    response.headers['Accept-Ranges'] = 'bytes'
+    if vary:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    return response
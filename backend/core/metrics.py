@@ -0,0 +1,224 @@
+"""
+Süreç içi metrik kaydı ve Prometheus metin çıktısı.
+
+Her worker kendi sayaç/histogramlarını bellekte tutar. METRICS_DIR
+ayarlanmışsa her worker anlık görüntüsünü periyodik olarak bu dizine
+yazar ve /metrics tüm worker dosyalarını birleştirerek döner
+(gunicorn'un birden fazla worker'ı için). Süreci artık çalışmayan
+worker'ların dosyaları toplama sırasında silinir.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+HELP = {
+    'http_requests_total': ('counter', 'HTTP istek sayısı (route, method, status)'),
+    'http_request_duration_seconds': ('histogram', 'İstek süresi (saniye)'),
+    'http_response_size_bytes': ('histogram', 'Yanıt gövdesi boyutu (byte)'),
+    'db_queries_per_request': ('histogram', 'İstek başına veritabanı sorgu sayısı'),
+    'db_query_duration_seconds': ('histogram', 'İstek başına toplam veritabanı süresi (saniye)'),
+    'tasks_total': ('counter', 'Çalıştırılan görev sayısı (task, outcome)'),
+    'task_duration_seconds': ('histogram', 'Görev çalışma süresi (saniye)'),
+    'task_queue_delay_seconds': ('histogram', 'Görevin çalışma zamanından başlamasına kadar geçen süre (saniye)'),
+    'task_batch_size': ('histogram', 'Worker\'ın tek seferde aldığı görev sayısı'),
+    'batch_subrequests_total': ('counter', '/api/batch/ alt istek sayısı (route, status)'),
+    'rate_limited_total': ('counter', 'Hız sınırına takılan istek sayısı (view, scope)'),
+    'friend_events_relayed_total': ('counter', 'Sink\'lere aktarılan arkadaşlık olayı sayısı (type)'),
+    'user_card_cache_total': ('counter', 'Kullanıcı kartı önbelleği isabet/ıskalama (result)'),
+}
+
+
+class Registry:
+    """Thread-safe sayaç ve histogram deposu"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self.last_flush = 0.0
+
+    def inc(self, name, labels, value=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] += value
+
+    def observe(self, name, labels, value, buckets=DURATION_BUCKETS):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {
+                    'buckets': list(buckets),
+                    'counts': [0] * len(buckets),
+                    'sum': 0.0,
+                    'count': 0,
+                }
+            for i, bound in enumerate(histogram['buckets']):
+                if value <= bound:
+                    histogram['counts'][i] += 1
+                    break
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def snapshot(self):
+        """JSON'a yazılabilir anlık görüntü"""
+        with self.lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [
+                    [name, list(labels), dict(h, counts=list(h['counts']))]
+                    for (name, labels), h in self.histograms.items()
+                ],
+            }
+
+    def maybe_flush(self):
+        """METRICS_DIR varsa anlık görüntüyü en fazla METRICS_FLUSH_INTERVAL'de bir diske yaz"""
+        metrics_dir = settings.METRICS_DIR
+        if not metrics_dir:
+            return
+        now = time.monotonic()
+        if now - self.last_flush < settings.METRICS_FLUSH_INTERVAL:
+            return
+        self.last_flush = now
+        self.flush(metrics_dir)
+
+    def flush(self, metrics_dir):
+        os.makedirs(metrics_dir, exist_ok=True)
+        path = os.path.join(metrics_dir, f'metrics-{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+
+registry = Registry()
+
+
+def record_request(route, method, status_code, duration, response_size, query_count, query_time):
+    """Middleware'in her istek sonunda çağırdığı tek giriş noktası"""
+    labels = {'route': route, 'method': method}
+    registry.inc('http_requests_total', dict(labels, status=str(status_code)))
+    registry.observe('http_request_duration_seconds', labels, duration)
+    if response_size is not None:
+        registry.observe('http_response_size_bytes', labels, response_size, SIZE_BUCKETS)
+    registry.observe('db_queries_per_request', labels, query_count, COUNT_BUCKETS)
+    registry.observe('db_query_duration_seconds', labels, query_time)
+    registry.maybe_flush()
+
+
+def _merge(snapshots):
+    counters = defaultdict(float)
+    histograms = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            counters[(name, tuple(map(tuple, labels)))] += value
+        for name, labels, h in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.get(key)
+            if merged is None or merged['buckets'] != h['buckets']:
+                histograms[key] = dict(h, counts=list(h['counts']))
+                continue
+            merged['counts'] = [a + b for a, b in zip(merged['counts'], h['counts'])]
+            merged['sum'] += h['sum']
+            merged['count'] += h['count']
+    return counters, histograms
+
+
+def _process_alive(filename):
+    """metrics-<pid>.json dosyasını yazan süreç hâlâ çalışıyor mu"""
+    try:
+        pid = int(filename.removeprefix('metrics-').removesuffix('.json'))
+    except ValueError:
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def collect():
+    """Bu süreç ve (varsa) diğer worker'ların metriklerini birleştir"""
+    metrics_dir = settings.METRICS_DIR
+    if not metrics_dir:
+        return _merge([registry.snapshot()])
+
+    registry.flush(metrics_dir)
+    snapshots = []
+    for filename in os.listdir(metrics_dir):
+        if not filename.endswith('.json'):
+            continue
+        if not _process_alive(filename):
+            # Yeniden başlatılmış/ölmüş worker: sayaçları bir daha toplanmasın
+            try:
+                os.remove(os.path.join(metrics_dir, filename))
+            except OSError:
+                pass
+            continue
+        try:
+            with open(os.path.join(metrics_dir, filename)) as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError):
+            # Yazılmakta olan veya bozuk dosyayı atla
+            continue
+    return _merge(snapshots)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels, extra=None):
+    items = list(labels) + (list(extra) if extra else [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in items) + '}'
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_prometheus():
+    """Prometheus text exposition format (0.0.4)"""
+    counters, histograms = collect()
+    lines = []
+    seen = set()
+
+    def header(name):
+        if name in seen:
+            return
+        seen.add(name)
+        kind, help_text = HELP.get(name, ('untyped', name))
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+
+    for (name, labels), value in sorted(counters.items()):
+        header(name)
+        lines.append(f'{name}{_labels(labels)} {_format_number(value)}')
+
+    for (name, labels), h in sorted(histograms.items(), key=lambda item: item[0]):
+        header(name)
+        cumulative = 0
+        for bound, count in zip(h['buckets'], h['counts']):
+            cumulative += count
+            lines.append(f'{name}_bucket{_labels(labels, [("le", _format_number(bound))])} {cumulative}')
+        lines.append(f'{name}_bucket{_labels(labels, [("le", "+Inf")])} {h["count"]}')
+        lines.append(f'{name}_sum{_labels(labels)} {_format_number(h["sum"])}')
+        lines.append(f'{name}_count{_labels(labels)} {h["count"]}')
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,124 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.utils.deprecation import MiddlewareMixin
+
+from . import metrics
+from .querybudget import QueryBudgetExceeded, get_query_budget, is_exempt
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    """
+    connection.execute_wrapper ile kullanılan sorgu sayacı.
+    Bir istek boyunca çalışan sorgu sayısını ve toplam süresini tutar.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def route_label(request):
+    """Metrik etiketi için URL kalıbı (ör. api/friends/admin/approve/<int:pk>/)"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.route or match.view_name or 'unknown'
+
+
+def _install_counter(request, attr):
+    counter = QueryCounter()
+    setattr(request, attr, counter)
+    connection.execute_wrappers.append(counter)
+
+
+def _uninstall_counter(request, attr):
+    counter = getattr(request, attr, None)
+    if counter is not None and counter in connection.execute_wrappers:
+        connection.execute_wrappers.remove(counter)
+    return counter
+
+
+# process_request/process_response kancaları (MiddlewareMixin) sayesinde bu
+# middleware'ler ASGI altında da çalışır. Async view'larda kancalar ve async ORM
+# aynı istek thread'inde çalıştığından sorgu sayacı orada da geçerlidir.
+
+class MetricsMiddleware(MiddlewareMixin):
+    """
+    Route başına istek süresi, durum kodu, yanıt boyutu ve
+    veritabanı sorgu sayısı/süresi metriklerini kaydeder.
+    """
+
+    def process_request(self, request):
+        _install_counter(request, '_metrics_queries')
+        request._metrics_start = time.perf_counter()
+
+    def process_response(self, request, response):
+        counter = _uninstall_counter(request, '_metrics_queries')
+        if counter is None:
+            return response
+        duration = time.perf_counter() - request._metrics_start
+
+        response_size = None if response.streaming else len(response.content)
+        metrics.record_request(
+            route=route_label(request),
+            method=request.method,
+            status_code=response.status_code,
+            duration=duration,
+            response_size=response_size,
+            query_count=counter.count,
+            query_time=counter.duration,
+        )
+        return response
+
+
+class QueryBudgetMiddleware(MiddlewareMixin):
+    """
+    View'ın 'query_budget' değerini aşan istekleri loglar.
+    QUERY_BUDGET_RAISE açıksa (DEBUG/test) QueryBudgetExceeded fırlatır.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.missing_reported = set()
+
+    def process_request(self, request):
+        _install_counter(request, '_budget_queries')
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_query_budget(view_func)
+
+    def process_response(self, request, response):
+        counter = _uninstall_counter(request, '_budget_queries')
+        if counter is None:
+            return response
+
+        route = route_label(request)
+        budget = getattr(request, 'query_budget', None)
+        if budget is None:
+            if request.resolver_match is not None and not is_exempt(route) \
+                    and route not in self.missing_reported:
+                self.missing_reported.add(route)
+                logger.warning('query_budget.missing', extra={'route': route})
+        elif counter.count > budget:
+            logger.warning('query_budget.exceeded', extra={
+                'route': route, 'method': request.method,
+                'queries': counter.count, 'budget': budget,
+            })
+            if settings.QUERY_BUDGET_RAISE:
+                raise QueryBudgetExceeded(
+                    f'{request.method} {request.path}: {counter.count} sorgu, bütçe {budget}'
+                )
+        return response
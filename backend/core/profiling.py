@@ -0,0 +1,170 @@
+"""
+İsteğe bağlı istek profilleme.
+
+PROFILING_SAMPLE_RATE=N ise her N istekten biri, PROFILING_HEADER_ENABLED
+açıksa da geçerli imzalı 'X-Profile-Token' başlığı taşıyan istekler
+cProfile altında çalıştırılır. SQL sorguları süreleriyle kaydedilir ve
+sonuçlar PROFILING_DIR altında sınırlı bir halka tamponda saklanır.
+
+İkisi de kapalıyken middleware hiç yüklenmez (MiddlewareNotUsed),
+yani ek maliyet yoktur.
+"""
+import cProfile
+import io
+import itertools
+import json
+import os
+import pstats
+import re
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from .middleware import route_label
+
+TOKEN_HEADER = 'X-Profile-Token'
+TOKEN_SALT = 'core.profiling'
+PROFILE_ID_RE = re.compile(r'^[\w-]+$')
+
+
+def make_profile_token(user):
+    """Admin için profilleme başlığı değeri üret"""
+    return signing.dumps({'user_id': user.id}, salt=TOKEN_SALT)
+
+
+def check_profile_token(token):
+    try:
+        signing.loads(token, salt=TOKEN_SALT, max_age=settings.PROFILING_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+class SqlRecorder:
+    """execute_wrapper: her sorguyu süresiyle kaydeder"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'many': many,
+                'ms': round((time.perf_counter() - start) * 1000, 3),
+            })
+
+
+class ProfileStore:
+    """PROFILING_DIR altında en fazla PROFILING_MAX_ENTRIES kayıt tutan halka tampon"""
+
+    def __init__(self, directory=None, max_entries=None):
+        self.directory = str(directory or settings.PROFILING_DIR)
+        self.max_entries = max_entries or settings.PROFILING_MAX_ENTRIES
+
+    def path(self, profile_id, ext):
+        if not PROFILE_ID_RE.match(profile_id):
+            raise ValueError('Geçersiz profil id')
+        return os.path.join(self.directory, f'{profile_id}.{ext}')
+
+    def save(self, meta, profiler):
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r'[^\w]+', '-', meta['route']).strip('-') or 'root'
+        profile_id = f"{time.time_ns()}-{slug[:60]}"
+        meta['id'] = profile_id
+
+        stats_text = io.StringIO()
+        pstats.Stats(profiler, stream=stats_text).sort_stats('cumulative').print_stats(40)
+        meta['top_functions'] = stats_text.getvalue()
+
+        profiler.dump_stats(self.path(profile_id, 'prof'))
+        with open(self.path(profile_id, 'json'), 'w') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=1)
+        self.prune()
+        return profile_id
+
+    def list(self):
+        """En yeniden eskiye kayıt özetleri"""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for filename in sorted(os.listdir(self.directory), reverse=True):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename)) as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            entries.append({
+                key: meta.get(key)
+                for key in ('id', 'method', 'path', 'route', 'status', 'duration_ms',
+                            'query_count', 'query_ms', 'created_at')
+            })
+        return entries
+
+    def prune(self):
+        ids = sorted(
+            filename[:-5] for filename in os.listdir(self.directory) if filename.endswith('.json')
+        )
+        for profile_id in ids[:max(0, len(ids) - self.max_entries)]:
+            for ext in ('json', 'prof'):
+                try:
+                    os.remove(self.path(profile_id, ext))
+                except FileNotFoundError:
+                    pass
+
+
+class ProfilingMiddleware:
+    """Örneklenen veya imzalı başlık taşıyan istekleri cProfile ile çalıştırır"""
+
+    def __init__(self, get_response):
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.header_enabled = settings.PROFILING_HEADER_ENABLED
+        if not self.sample_rate and not self.header_enabled:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.counter = itertools.count(1)
+        self.store = ProfileStore()
+
+    def should_profile(self, request):
+        if self.header_enabled:
+            token = request.headers.get(TOKEN_HEADER)
+            if token and check_profile_token(token):
+                return True
+        return bool(self.sample_rate) and next(self.counter) % self.sample_rate == 0
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        recorder = SqlRecorder()
+        start = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        duration = time.perf_counter() - start
+
+        profile_id = self.store.save({
+            'method': request.method,
+            'path': request.get_full_path(),
+            'route': route_label(request),
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 3),
+            'query_count': len(recorder.queries),
+            'query_ms': round(sum(q['ms'] for q in recorder.queries), 3),
+            'queries': recorder.queries,
+            'created_at': time.time(),
+        }, profiler)
+        response['X-Profile-Id'] = profile_id
+        return response
@@ -0,0 +1,108 @@
+"""
+View başına sorgu bütçesi.
+
+View sınıfları 'query_budget = N' ile bir istekte en fazla kaç sorgu
+çalıştırabileceklerini bildirir. QueryBudgetMiddleware aşımları loglar
+(QUERY_BUDGET_RAISE açıksa hata fırlatır), aşağıdaki yardımcılar da
+testlerde bütçeleri doğrulamak için kullanılır:
+
+    class FriendsQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+        def test_budgets_declared(self):
+            self.assertAllViewsHaveBudgets()
+
+        def test_my_friends(self):
+            self.client.force_login(self.user)
+            self.assertWithinQueryBudget('get', '/api/friends/my-friends/')
+"""
+from django.conf import settings
+from django.db import connection
+from django.urls import URLPattern, URLResolver, get_resolver, resolve
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Bir istek view'ın sorgu bütçesini aştı"""
+
+
+def get_view_class(view_func):
+    """as_view() ile üretilmiş fonksiyondan view sınıfını bul"""
+    return getattr(view_func, 'view_class', None) or getattr(view_func, 'cls', None)
+
+
+def get_query_budget(view_func):
+    """View sınıfının (veya fonksiyonun) bildirdiği bütçe, yoksa None"""
+    view_class = get_view_class(view_func)
+    if view_class is not None:
+        return getattr(view_class, 'query_budget', None)
+    return getattr(view_func, 'query_budget', None)
+
+
+def is_exempt(route):
+    route = route.lstrip('^')
+    return any(route.startswith(prefix) for prefix in settings.QUERY_BUDGET_EXEMPT_PREFIXES)
+
+
+def iter_url_views(urlconf=None):
+    """URLconf'taki tüm (route, view_func) çiftlerini dolaş"""
+
+    def walk(patterns, prefix):
+        for entry in patterns:
+            route = prefix + str(entry.pattern)
+            if isinstance(entry, URLResolver):
+                yield from walk(entry.url_patterns, route)
+            elif isinstance(entry, URLPattern):
+                yield route, entry.callback
+
+    yield from walk(get_resolver(urlconf).url_patterns, '')
+
+
+def views_without_budget(urlconf=None):
+    """Bütçe bildirmemiş (ve muaf olmayan) route'lar"""
+    return [
+        route for route, view_func in iter_url_views(urlconf)
+        if not is_exempt(route) and get_query_budget(view_func) is None
+    ]
+
+
+def assert_all_views_have_budgets(urlconf=None):
+    missing = views_without_budget(urlconf)
+    if missing:
+        raise QueryBudgetExceeded(
+            'Sorgu bütçesi tanımlanmamış view\'lar:\n' + '\n'.join(f'  {route}' for route in missing)
+        )
+
+
+def assert_within_query_budget(client, method, path, data=None, **extra):
+    """
+    İsteği test client ile at, sorgu sayısını view'ın bütçesiyle karşılaştır.
+    Yanıtı döndürür.
+    """
+    from django.test.utils import CaptureQueriesContext
+
+    budget = get_query_budget(resolve(path.split('?', 1)[0]).func)
+    if budget is None:
+        raise QueryBudgetExceeded(f'{path} için sorgu bütçesi tanımlanmamış')
+
+    kwargs = dict(extra)
+    if data is not None:
+        kwargs['data'] = data
+        if method.lower() != 'get':
+            kwargs.setdefault('content_type', 'application/json')
+    with CaptureQueriesContext(connection) as ctx:
+        response = getattr(client, method.lower())(path, **kwargs)
+
+    if len(ctx.captured_queries) > budget:
+        queries = '\n'.join(f"  {q['sql']}" for q in ctx.captured_queries)
+        raise QueryBudgetExceeded(
+            f'{method.upper()} {path}: {len(ctx.captured_queries)} sorgu, bütçe {budget}\n{queries}'
+        )
+    return response
+
+
+class QueryBudgetTestMixin:
+    """unittest/Django TestCase için bütçe assert'leri"""
+
+    def assertAllViewsHaveBudgets(self, urlconf=None):
+        assert_all_views_have_budgets(urlconf)
+
+    def assertWithinQueryBudget(self, method, path, data=None, **extra):
+        return assert_within_query_budget(self.client, method, path, data, **extra)
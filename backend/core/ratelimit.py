@@ -0,0 +1,191 @@
+"""
+View başına hız sınırı.
+
+View sınıfları 'rate_limits' ile kapsam başına oran bildirir:
+
+    class SendFriendRequestView(APIView):
+        rate_limits = [('ip', '60/m'), ('user', '20/m')]
+
+Kapsamlar: 'user' (oturumdaki kullanıcı id'si; anonimse atlanır) ve 'ip'.
+Oran 'N/s|m|h|d' biçimindedir; kova kapasitesi N'dir, yani N istek art
+arda geçebilir, sonra kova periyot/N hızla dolar.
+
+RateLimitMiddleware kontrolü process_view'da, view çalışmadan yapar; sınır
+aşıldıysa 429 ve Retry-After döner. 'ip' kapsamı veritabanına hiç gitmez,
+'user' kapsamı kullanıcıyı yüklemeden yalnızca oturumu okur. Bu yüzden
+listelerde 'ip' önce yazılır. /api/batch/ alt istekleri aynı kontrolden geçer.
+
+Arka uçlar:
+- Yerel (varsayılan): worker başına, kilitsiz GCRA (token bucket'ın tek zaman
+  damgasıyla tutulan eşdeğeri). GIL altında eşzamanlı iki istek nadiren aynı
+  anda geçebilir; sınır yaklaşık olarak korunur.
+- Paylaşımlı: RATE_LIMIT_CACHE bir Django cache adıysa tüm worker'lar ortak
+  sayar. Django cache API'si karşılaştır-ve-yaz sunmadığından burada atomik
+  incr ile kayan pencere sayacı kullanılır (aynı ortalama oran ve kapasite).
+"""
+import logging
+import math
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import caches
+from django.http import JsonResponse
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject, empty
+
+from . import metrics
+from .querybudget import get_view_class
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'20/m' -> (20, 60)"""
+    count, _, unit = rate.partition('/')
+    return int(count), PERIODS[unit.strip().lower()[:1]]
+
+
+class LocalBackend:
+    """
+    Worker başına GCRA; anahtar başına yalnızca 'teorik varış zamanı' saklanır.
+    Anahtarlar son kullanım sırasıyla tutulur; max_keys aşılınca en uzun
+    süredir görülmeyenler atılır (LRU), sıcak anahtarların durumu korunur.
+    """
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self.tats = OrderedDict()
+
+    def hit(self, key, count, period):
+        """İzin verildiyse 0, verilmediyse beklenecek saniye"""
+        now = time.monotonic()
+        interval = period / count
+        tat = max(self.tats.get(key, now), now)
+        # Kova doluysa (count istek birikmişse) bir sonraki jetona kadar bekle
+        wait = tat - now - (period - interval)
+        if wait > 0:
+            return wait
+        self.tats[key] = tat + interval
+        self.tats.move_to_end(key)
+        if len(self.tats) > self.max_keys:
+            self.prune()
+        return 0
+
+    def prune(self):
+        while len(self.tats) > self.max_keys:
+            try:
+                self.tats.popitem(last=False)
+            except KeyError:
+                break
+
+
+class CacheBackend:
+    """
+    Django cache üzerinde kayan pencere sayacı (worker'lar arası).
+    Önce atomik olarak artırılır, karar dönen değerle verilir; böylece
+    eşzamanlı istekler aynı boşluğu paylaşamaz. Reddedilen istek sayacı geri alır.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def hit(self, key, count, period):
+        cache = caches[self.alias]
+        now = time.time()
+        window = int(now // period)
+        elapsed = (now % period) / period
+        current_key, previous_key = f'rl:{key}:{window}', f'rl:{key}:{window - 1}'
+        # İlk istek add ile oluşturur; sonrakiler atomik incr
+        if cache.add(current_key, 1, period * 2):
+            current = 1
+        else:
+            try:
+                current = cache.incr(current_key)
+            except ValueError:
+                # Anahtar add ile incr arasında düştü
+                cache.set(current_key, 1, period * 2)
+                current = 1
+        previous = cache.get(previous_key, 0)
+        if previous * (1 - elapsed) + current <= count:
+            return 0
+
+        try:
+            cache.decr(current_key)
+        except ValueError:
+            pass
+        room = count - current
+        if previous and room >= 0:
+            # Önceki pencerenin ağırlığı bir isteğe yer açacak kadar azalana dek
+            return max(period * (1 - elapsed - room / previous), 0.001)
+        return period * (1 - elapsed)
+
+
+_backends = {}
+
+
+def get_backend():
+    alias = settings.RATE_LIMIT_CACHE
+    if alias not in _backends:
+        _backends[alias] = CacheBackend(alias) if alias else LocalBackend(settings.RATE_LIMIT_LOCAL_MAX_KEYS)
+    return _backends[alias]
+
+
+def client_ip(request):
+    """RATE_LIMIT_PROXY_COUNT kadar güvenilir vekil arkasındaki istemci adresi"""
+    proxies = settings.RATE_LIMIT_PROXY_COUNT
+    if proxies:
+        forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def session_user_id(request):
+    """request.user'ı yüklemeden (kullanıcı sorgusu yok) oturumdaki kullanıcı id'si"""
+    user = request.__dict__.get('user')
+    if isinstance(user, SimpleLazyObject):
+        user = user._wrapped
+    if user is not None and user is not empty and user.is_authenticated:
+        return user.id
+    session = getattr(request, 'session', None)
+    return session.get(SESSION_KEY) if session is not None else None
+
+
+def check(request, view_func):
+    """Sınır aşıldıysa 429 yanıtı, yoksa None"""
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+    view_class = get_view_class(view_func)
+    limits = getattr(view_class or view_func, 'rate_limits', None)
+    if not limits:
+        return None
+
+    backend = get_backend()
+    name = getattr(view_class or view_func, '__name__', 'view')
+    for scope, rate in limits:
+        ident = session_user_id(request) if scope == 'user' else client_ip(request)
+        if not ident:
+            continue
+        count, period = parse_rate(rate)
+        wait = backend.hit(f'{name}:{scope}:{ident}', count, period)
+        if wait:
+            retry_after = math.ceil(wait)
+            metrics.registry.inc('rate_limited_total', {'view': name, 'scope': scope})
+            logger.warning('rate_limit.exceeded', extra={
+                'view': name, 'scope': scope, 'ident': str(ident), 'retry_after': retry_after,
+            })
+            response = JsonResponse(
+                {'error': f'Çok fazla istek. {retry_after} saniye sonra tekrar deneyin.'}, status=429
+            )
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+    return None
+
+
+class RateLimitMiddleware(MiddlewareMixin):
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        return check(request, view_func)
@@ -0,0 +1,27 @@
+"""
+MessagePack yanıtları (Accept: application/msgpack).
+
+JSON'a çevrilemeyen türler (datetime, Decimal, UUID, lazy metin...) DRF'in
+JSONEncoder'ıyla aynı biçime dönüştürülür; iki biçimin içeriği aynıdır.
+"""
+import msgpack
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_encoder = JSONEncoder()
+
+
+def encode_default(obj):
+    return _encoder.default(obj)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default, use_bin_type=True, datetime=False)
@@ -0,0 +1,97 @@
+"""
+.values() satırlarından DRF'siz, hızlı serileştirme.
+
+Sık çağrılan liste endpoint'lerinde ModelSerializer'ın alan başına
+to_representation / SerializerMethodField maliyetini atlamak için.
+RowSerializer alt sınıfı, çıktı alanlarını sırasıyla tanımlar:
+
+    @uses('status')
+    def status_display(self, row):
+        return STATUS_LABELS[row['status']]
+
+    class FriendRequestRowSerializer(RowSerializer):
+        fields = [
+            ('id', 'id'),                                  # satırdaki sütun
+            ('status_display', status_display),            # hesaplanan alan
+            ('created_at', datetime_field('created_at')),
+        ]
+
+Hesaplanan alanlar okudukları sütunları uses() ile bildirir. Alan haritası
+serializer oluşturulurken ?fields= seçimine (core.fieldsets) göre bir kez
+derlenir; values_fields yalnızca seçilen alanların sütunlarını içerir.
+Çıktı, karşılık gelen DRF serializer'ıyla birebir aynı olmalıdır
+(bkz. benchmarks/serialization.py).
+"""
+from functools import partial
+from operator import itemgetter
+
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .fieldsets import fieldset_from_context
+
+_datetime_field = serializers.DateTimeField()
+
+
+def datetime_formatter():
+    """
+    DateTimeField.to_representation ile aynı çıktı; saat dilimi ve biçim
+    satır başına değil, çağrı başına bir kez çözülür.
+    """
+    to_representation = _datetime_field.to_representation
+    output_format = api_settings.DATETIME_FORMAT
+    field_timezone = _datetime_field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return to_representation
+
+    def format_datetime(value):
+        if not value:
+            return None
+        if isinstance(value, str) or timezone.is_naive(value):
+            return to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return format_datetime
+
+
+def uses(*columns):
+    """Hesaplanan alanın .values() ile seçilmesi gereken sütunları"""
+    def decorator(getter):
+        getter.columns = columns
+        return getter
+    return decorator
+
+
+def datetime_field(name):
+    @uses(name)
+    def getter(self, row):
+        return self.format_datetime(row[name])
+    return getter
+
+
+class RowSerializer:
+    fields = []
+
+    def __init__(self, context=None):
+        self.context = context if context is not None else {}
+        self.format_datetime = datetime_formatter()
+        self.fieldset = fieldset_from_context(self.context)
+        self.fieldset.validate(name for name, _ in self.fields)
+        selected = [(name, source) for name, source in self.fields if self.fieldset.includes(name)]
+        # .values() ile seçilecek sütunlar
+        self.values_fields = list(dict.fromkeys(
+            column for _, source in selected
+            for column in ((source,) if isinstance(source, str) else source.columns)
+        ))
+        # Her alan tek argümanlı (row) bir çağrıya indirgenir
+        self.getters = [(name, self.bind(name, source)) for name, source in selected]
+
+    def bind(self, name, source):
+        return itemgetter(source) if isinstance(source, str) else partial(source, self)
+
+    def to_representation(self, row):
+        return {name: getter(row) for name, getter in self.getters}
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
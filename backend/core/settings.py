@@ -38,9 +38,14 @@ INSTALLED_APPS = [
     # Local apps
     'users',
     'friends',
+    'tasks',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',  # Route başına süre/sorgu metrikleri
+    'core.middleware.QueryBudgetMiddleware',  # View başına sorgu bütçesi kontrolü
+    'core.profiling.ProfilingMiddleware',  # Kapalıyken hiç yüklenmez
+    'core.compression.CompressionMiddleware',  # br/gzip, COMPRESSION_MIN_SIZE üstü
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     "whitenoise.middleware.WhiteNoiseMiddleware",  # CSS dosyaları için şart
@@ -48,6 +53,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.ratelimit.RateLimitMiddleware',  # View başına rate_limits, view'dan önce 429
+    'users.activity.ActivityMiddleware',  # last_seen, toplu yazılır
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -115,7 +122,12 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+STORAGES = {
+    # Yüklenen medya: içerik özetli adlar (core.storage), süresiz önbelleklenebilir
+    'default': {'BACKEND': 'core.storage.HashedMediaStorage'},
+    # collectstatic sırasında .gz (ve brotli kuruluysa .br) kopyaları da üretilir
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
 
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -131,6 +143,18 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Mobil istemci 'Accept/Content-Type: application/msgpack' ile MessagePack kullanabilir
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'core.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'core.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 # CORS settings
@@ -156,4 +180,210 @@ else:
     SESSION_COOKIE_SAMESITE = 'Lax'
 
 # Google OAuth settings
-GOOGLE_CLIENT_ID = 'YOUR_GOOGLE_CLIENT_ID'
\ No newline at end of file
+GOOGLE_CLIENT_ID = 'YOUR_GOOGLE_CLIENT_ID'
+
+# --- YÜK TESTİ (SAHTE FIREBASE) ---
+# FAKE_FIREBASE_AUTH=1 ile yerel anahtarla imzalanmış test token'ları kabul edilir.
+# Render'da hiçbir koşulda açılmaz.
+FAKE_FIREBASE_AUTH = os.environ.get('FAKE_FIREBASE_AUTH') == '1' and not IN_RENDER
+FAKE_FIREBASE_PROJECT_ID = os.environ.get('FAKE_FIREBASE_PROJECT_ID', 'friendapp-loadtest')
+FAKE_FIREBASE_KEY_PATH = os.environ.get('FAKE_FIREBASE_KEY_PATH', str(BASE_DIR / 'fake_firebase_key.pem'))
+
+# Firebase token doğrulayıcısı (dotted path). None ise firebase_admin kullanılır.
+FIREBASE_TOKEN_VERIFIER = 'users.fake_firebase.verify_id_token' if FAKE_FIREBASE_AUTH else None
+
+# Kimlik doğrulama sağlayıcıları: ilk kullanımda (veya gunicorn post_worker_init'te) yüklenir
+AUTH_PROVIDERS = {
+    'firebase': 'users.auth_providers.FirebaseProvider',
+    'google': 'users.auth_providers.GoogleProvider',
+}
+
+# Giriş endpoint'lerinin async sürümleri (core/asgi.py bunu açar)
+ASYNC_AUTH_VIEWS = os.environ.get('ASYNC_AUTH_VIEWS') == '1'
+# Async view'larda bloklayan token doğrulaması için thread havuzu boyutu
+AUTH_VERIFY_THREADS = int(os.environ.get('AUTH_VERIFY_THREADS', '16'))
+
+if ASYNC_AUTH_VIEWS:
+    # WhiteNoise senkron bir middleware ve async zinciri thread'e düşürür.
+    # ASGI modunda statik dosyaları core/asgi.py STATIC_ROOT'tan sunar (collectstatic gerekir).
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
+
+
+# --- METRİKLER VE LOGLAMA ---
+# /metrics Prometheus çıktısı. Gunicorn'da birden fazla worker varsa METRICS_DIR
+# tüm worker'ların paylaştığı bir dizin olmalı (ör. /tmp/friendapp-metrics).
+METRICS_DIR = os.environ.get('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', '5'))
+# Üretimde (DEBUG kapalı) /metrics için bu token ya da admin oturumu gerekir
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# INFO/DEBUG kayıtlarının ne kadarı yazılsın (WARNING ve üstü her zaman yazılır)
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', '1.0' if DEBUG else '0.1'))
+
+# Sorgu bütçesi aşılınca hata fırlat (DEBUG ve testlerde açık, canlıda sadece log)
+QUERY_BUDGET_RAISE = os.environ.get('QUERY_BUDGET_RAISE', '1' if DEBUG else '0') == '1'
+# Bütçe kontrolünden muaf route önekleri
+QUERY_BUDGET_EXEMPT_PREFIXES = ['admin/', 'media/', 'metrics']
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'core.log.JsonFormatter'},
+    },
+    'filters': {
+        'sampled': {'()': 'core.log.SamplingFilter', 'rate': LOG_SAMPLE_RATE},
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json',
+            'filters': ['sampled'],
+        },
+    },
+    'loggers': {
+        'users': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        'friends': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        'core': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        'tasks': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+
+# --- PROFİLLEME ---
+# Her N istekten birini cProfile ile çalıştır (0 = kapalı)
+PROFILING_SAMPLE_RATE = int(os.environ.get('PROFILING_SAMPLE_RATE', '0'))
+# Admin'in /api/profiling/token/ ile aldığı imzalı X-Profile-Token başlığını kabul et
+PROFILING_HEADER_ENABLED = os.environ.get('PROFILING_HEADER_ENABLED') == '1'
+PROFILING_TOKEN_MAX_AGE = 3600
+PROFILING_DIR = os.environ.get('PROFILING_DIR', str(BASE_DIR / 'profiles'))
+PROFILING_MAX_ENTRIES = int(os.environ.get('PROFILING_MAX_ENTRIES', '50'))
+
+
+# --- SON GÖRÜLME ---
+# Aynı kullanıcının bu kadar saniye içindeki tekrar istekleri yok sayılır
+ACTIVITY_WINDOW = int(os.environ.get('ACTIVITY_WINDOW', '60'))
+# Tampondaki last_seen değerleri bu aralıkla arka plan thread'inde veritabanına yazılır
+ACTIVITY_FLUSH_INTERVAL = int(os.environ.get('ACTIVITY_FLUSH_INTERVAL', '30'))
+
+
+# --- PROFİL FOTOĞRAFLARI ---
+# Yüklenen fotoğraflardan üretilecek boyutlar (uzun kenar, px)
+PROFILE_PHOTO_SIZES = [64, 256, 1024]
+# Liste endpoint'lerinde (arkadaşlar, arama, istekler) varsayılan avatar boyutu
+PROFILE_PHOTO_LIST_SIZE = int(os.environ.get('PROFILE_PHOTO_LIST_SIZE', '64'))
+PROFILE_PHOTO_FORMAT = os.environ.get('PROFILE_PHOTO_FORMAT', 'WEBP')  # WEBP veya JPEG
+PROFILE_PHOTO_QUALITY = 80
+
+
+# --- GÖREV KUYRUĞU ---
+# Worker: python manage.py run_tasks
+# Production'da web servisinin yanında ayrı bir süreç (Render'da Background Worker,
+# aynı ortam değişkenleriyle) olarak çalışmalıdır; worker yoksa kuyruğa yazılan
+# görevler (ör. profil fotoğrafı varyantları) hiç çalışmaz. Worker'sız ortamda TASKS_EAGER=1.
+# 1 ise görevler kuyruğa yazılmaz, commit sonrası istek içinde çalışır
+# (varsayılan: DEBUG'da açık, yerel geliştirmede worker gerekmez)
+TASKS_EAGER = os.environ.get('TASKS_EAGER', '1' if DEBUG else '0') == '1'
+TASKS_BATCH_SIZE = int(os.environ.get('TASKS_BATCH_SIZE', '20'))
+TASKS_POLL_INTERVAL = float(os.environ.get('TASKS_POLL_INTERVAL', '1'))
+TASKS_MAX_ATTEMPTS = 5
+# Yeniden deneme beklemesi: base * 2^(deneme-1) saniye, en fazla max
+TASKS_RETRY_BASE_DELAY = 10
+TASKS_RETRY_MAX_DELAY = 3600
+# Bu süreden uzun 'running' kalan görev (ölü worker) tekrar alınır
+TASKS_LOCK_TIMEOUT = 600
+TASKS_RETENTION_DAYS = 7
+
+
+# --- ARKADAŞLIK OLAYLARI (OUTBOX) ---
+# Relay: python manage.py relay_events
+# Olayların ekleneceği NDJSON dosyası (boşsa dosya sink'i kapalı)
+FRIEND_EVENTS_FILE = os.environ.get('FRIEND_EVENTS_FILE', '')
+# Olay gruplarının POST edileceği adres (boşsa kapalı)
+FRIEND_EVENTS_WEBHOOK_URL = os.environ.get('FRIEND_EVENTS_WEBHOOK_URL', '')
+FRIEND_EVENTS_WEBHOOK_TOKEN = os.environ.get('FRIEND_EVENTS_WEBHOOK_TOKEN', '')
+FRIEND_EVENTS_BATCH_SIZE = int(os.environ.get('FRIEND_EVENTS_BATCH_SIZE', '200'))
+FRIEND_EVENTS_POLL_INTERVAL = float(os.environ.get('FRIEND_EVENTS_POLL_INTERVAL', '1'))
+# Aktarılmış olaylardan, bu günden eskiler çift başına son olaya indirgenir
+FRIEND_EVENTS_COMPACT_AFTER_DAYS = int(os.environ.get('FRIEND_EVENTS_COMPACT_AFTER_DAYS', '30'))
+# Aktarılmış olaylar bu günden sonra tamamen silinir
+FRIEND_EVENTS_RETENTION_DAYS = int(os.environ.get('FRIEND_EVENTS_RETENTION_DAYS', '365'))
+
+
+# --- İSTEK ARŞİVİ ---
+# python manage.py archive_friend_requests: bu günden eski onaylanmış/reddedilmiş istekler taşınır
+FRIEND_REQUEST_ARCHIVE_DAYS = int(os.environ.get('FRIEND_REQUEST_ARCHIVE_DAYS', '90'))
+
+# POST /api/friends/send-requests/ tek istekte en fazla alıcı
+FRIEND_REQUEST_BATCH_MAX = 100
+
+
+# --- REHBER EŞLEŞTİRME ---
+# POST /api/users/match-contacts/ tek istekte en fazla e-posta özeti
+CONTACT_MATCH_MAX = 5000
+# Tek sorguda aranan özet sayısı
+CONTACT_MATCH_CHUNK = 1000
+
+
+# --- KULLANICI KARTI ÖNBELLEĞİ ---
+# Worker başına en fazla kart ve yerel kopyanın ömrü (sn)
+USER_CARD_CACHE_SIZE = int(os.environ.get('USER_CARD_CACHE_SIZE', '10000'))
+USER_CARD_CACHE_TTL = int(os.environ.get('USER_CARD_CACHE_TTL', '60'))
+# Worker'lar arası paylaşılan katman için CACHES içindeki ad (boşsa kapalı)
+USER_CARD_SHARED_CACHE = os.environ.get('USER_CARD_SHARED_CACHE', '')
+USER_CARD_SHARED_TTL = 3600
+# /api/users/bulk/ tek istekte en fazla kullanıcı
+USER_BULK_MAX = 300
+
+
+# --- TOPLU API İSTEKLERİ ---
+# POST /api/batch/ tek istekte en fazla alt istek
+BATCH_MAX_REQUESTS = int(os.environ.get('BATCH_MAX_REQUESTS', '20'))
+# "parallel": true ile GET'leri aynı anda çalıştıran thread sayısı (1: kapalı)
+BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', '4'))
+# Toplu istekte çağrılabilen yollar
+BATCH_ALLOWED_PREFIXES = ['/api/users/', '/api/friends/']
+
+
+# --- SIKIŞTIRMA VE MEDYA SUNUMU ---
+# Bu boyuttan (byte) küçük yanıtlar sıkıştırılmaz
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '860'))
+# brotli paketi kuruluysa br tercih edilir
+COMPRESSION_BROTLI = os.environ.get('COMPRESSION_BROTLI', '1') == '1'
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '5'))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6'))
+# Medya dosyalarını Django sunar (Range + önbellek başlıkları, core.media).
+# Önde CDN/nginx varsa kapatılabilir.
+MEDIA_SERVE = os.environ.get('MEDIA_SERVE', '1') == '1'
+# İçerik özeti taşımayan (eski) medya dosyaları için önbellek süresi (sn)
+MEDIA_CACHE_MAX_AGE = int(os.environ.get('MEDIA_CACHE_MAX_AGE', '3600'))
+
+
+# --- HIZ SINIRI ---
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', '1') == '1'
+# Worker'lar arası ortak sayım için CACHES içindeki ad (boşsa worker başına yerel)
+RATE_LIMIT_CACHE = os.environ.get('RATE_LIMIT_CACHE', '')
+# Yerel arka uçta tutulan en fazla anahtar
+RATE_LIMIT_LOCAL_MAX_KEYS = 100000
+# İstemci IP'si için X-Forwarded-For'a güvenilecek vekil sayısı (Render önünde bir vekil var)
+RATE_LIMIT_PROXY_COUNT = int(os.environ.get('RATE_LIMIT_PROXY_COUNT', '1' if IN_RENDER else '0'))
+
+
+# --- ADMIN ---
+# Admin listelerinde bu sayıya kadar tam sayım; üstünde filtresiz listede
+# Postgres tahmini, filtreli listede bu sayıda kesilmiş sayım (core.admin)
+ADMIN_EXACT_COUNT_LIMIT = int(os.environ.get('ADMIN_EXACT_COUNT_LIMIT', '10000'))
+
+
+# --- MODERASYON İSTATİSTİKLERİ ---
+# 'refresh_friend_stats' çalışma aralığı (sn) ve grup başına kaynak satır
+FRIEND_STATS_INTERVAL = int(os.environ.get('FRIEND_STATS_INTERVAL', '300'))
+FRIEND_STATS_BATCH_SIZE = int(os.environ.get('FRIEND_STATS_BATCH_SIZE', '50000'))
+# Commit sırası id sırasından sapabilir; bu kadar yeni satırlar sonraki tura kalır (sn).
+# Commit'i bundan uzun süren transaction'ların satırları sayılmayabilir
+FRIEND_STATS_LAG = int(os.environ.get('FRIEND_STATS_LAG', '60'))
+# Bekleyen kuyruk görüntülerinin saklama süresi (gün)
+FRIEND_STATS_SNAPSHOT_DAYS = 7
+# /api/friends/admin/stats/ en fazla pencere
+FRIEND_STATS_MAX_HOURS = 14 * 24
+FRIEND_STATS_MAX_DAYS = 365
@@ -0,0 +1,47 @@
+"""
+İçerik özetli medya depolama.
+
+Kaydedilen her dosyanın adına içeriğinin sha256 özeti eklenir
+(profile_photos/foto.jpg -> profile_photos/foto.3fa2c1d9e0b4.jpg). Aynı içerik
+aynı ada gider, dosya değişirse URL de değişir; bu sayede medya yanıtları
+süresiz önbelleklenebilir (core.media).
+"""
+import hashlib
+import os
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+HASH_LENGTH = 12
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{%d}(\.[^./]+)?$' % HASH_LENGTH)
+
+
+def is_hashed_name(name):
+    return bool(HASHED_NAME_RE.search(name))
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+class HashedMediaStorage(FileSystemStorage):
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        # Zaten özetli bir ad verildiyse eski özet atılır
+        root, ext = os.path.splitext(HASHED_NAME_RE.sub(r'\1', name))
+        name = f'{root}.{content_hash(content)}{ext}'
+        if self.exists(name):
+            # Aynı içerik zaten kayıtlı
+            return name
+        return super().save(name, content, max_length=max_length)
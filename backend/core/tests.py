@@ -0,0 +1,375 @@
+import asyncio
+import gzip
+import shutil
+import tempfile
+from importlib import import_module
+from pathlib import Path
+from unittest import mock, skipIf
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework.views import APIView
+
+from users.models import CustomUser
+
+from . import batch, media, ratelimit
+from .compression import CompressionMiddleware, brotli
+from .middleware import QueryCounter
+from .ratelimit import CacheBackend, LocalBackend, get_backend
+
+
+def reset_rate_limits():
+    backend = get_backend()
+    if hasattr(backend, 'tats'):
+        backend.tats.clear()
+
+
+class BatchTests(TransactionTestCase):
+    """POST /api/batch/: sıra, yazma bariyeri, hatalı yollar, hız sınırı ve sorgu sayaçları"""
+
+    def setUp(self):
+        cache.clear()
+        reset_rate_limits()
+        self.me = CustomUser.objects.create_user(username='me', email='me@example.com', password='x')
+        self.others = [
+            CustomUser.objects.create_user(username=f'other{i}', email=f'other{i}@example.com')
+            for i in range(6)
+        ]
+        self.client.force_login(self.me)
+
+    def post_batch(self, requests, parallel=False):
+        return self.client.post(
+            '/api/batch/', {'parallel': parallel, 'requests': requests}, content_type='application/json'
+        )
+
+    def relationship(self, user):
+        return {'method': 'GET', 'path': f'/api/friends/relationships/?ids={user.id}'}
+
+    def test_parallel_matches_sequential_order(self):
+        requests = [
+            {'method': 'GET', 'path': '/api/users/me/'},
+            {'method': 'GET', 'path': '/api/friends/my-friends/'},
+            self.relationship(self.others[0]),
+            {'method': 'GET', 'path': '/api/friends/blocked/'},
+        ]
+        # İlk istek last_seen'i tampona alır; karşılaştırılan iki yanıt aynı değeri görür
+        self.client.get('/api/users/me/')
+        sequential = self.post_batch(requests).json()['responses']
+        parallel = self.post_batch(requests, parallel=True).json()['responses']
+        self.assertEqual([r['status'] for r in parallel], [200] * 4)
+        self.assertEqual(parallel[0]['body']['id'], self.me.id)
+        self.assertEqual(parallel, sequential)
+
+    def test_reads_after_write_see_the_write(self):
+        other = self.others[0]
+        responses = self.post_batch([
+            self.relationship(other),
+            {'method': 'POST', 'path': '/api/friends/send-request/', 'body': {'receiver_id': other.id}},
+            self.relationship(other),
+            {'method': 'GET', 'path': '/api/users/me/'},
+        ], parallel=True).json()['responses']
+        self.assertEqual([r['status'] for r in responses], [200, 201, 200, 200])
+        self.assertEqual(responses[0]['body']['relationships'][str(other.id)], 'none')
+        self.assertEqual(responses[2]['body']['relationships'][str(other.id)], 'request_sent')
+
+    def test_unknown_and_disallowed_paths(self):
+        responses = self.post_batch([
+            {'method': 'GET', 'path': '/api/users/does-not-exist/'},
+            {'method': 'GET', 'path': '/api/users/me/'},
+        ]).json()['responses']
+        self.assertEqual([r['status'] for r in responses], [404, 200])
+
+        response = self.post_batch([{'method': 'GET', 'path': '/admin/'}])
+        self.assertEqual(response.status_code, 400)
+        response = self.post_batch([{'method': 'TRACE', 'path': '/api/users/me/'}])
+        self.assertEqual(response.status_code, 400)
+
+    def test_rate_limit_applies_per_subrequest(self):
+        # SendFriendRequestsBatchView: kullanıcı başına 5/m
+        responses = self.post_batch([
+            {'method': 'POST', 'path': '/api/friends/send-requests/', 'body': {'receiver_ids': [other.id]}}
+            for other in self.others
+        ]).json()['responses']
+        self.assertEqual([r['status'] for r in responses], [200] * 5 + [429])
+        self.assertIn('Retry-After', responses[-1]['headers'])
+
+    def test_thread_queries_added_to_parent_counters(self):
+        parent = RequestFactory().get('/api/batch/')
+        parent.user = self.me
+        parent.session = import_module(settings.SESSION_ENGINE).SessionStore(self.client.session.session_key)
+        parent._budget_queries = QueryCounter()
+        parent._metrics_queries = QueryCounter()
+
+        subs = batch.parse({'requests': [
+            {'method': 'GET', 'path': '/api/friends/my-friends/'},
+            {'method': 'GET', 'path': '/api/friends/blocked/'},
+        ]})
+        results = batch.run(parent, subs, parallel=True)
+        self.assertEqual([r['status'] for r in results], [200, 200])
+        self.assertGreater(parent._budget_queries.count, 0)
+        self.assertEqual(parent._budget_queries.count, parent._metrics_queries.count)
+        self.assertLessEqual(parent._budget_queries.count, batch.query_budget(subs))
+
+
+class AddQueriesTests(TestCase):
+
+    def test_accumulates_into_installed_counters(self):
+        parent = RequestFactory().get('/')
+        parent._budget_queries = QueryCounter()
+        counter = QueryCounter()
+        counter.count, counter.duration = 3, 0.5
+        batch.add_queries(parent, counter)
+        batch.add_queries(parent, counter)
+        self.assertEqual((parent._budget_queries.count, parent._budget_queries.duration), (6, 1.0))
+        self.assertFalse(hasattr(parent, '_metrics_queries'))
+
+
+class Clock:
+    """time.monotonic / time.time yerine elle ilerletilen saat"""
+
+    def __init__(self, now=6000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class RateLimitBackendTests(SimpleTestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        for name in ('monotonic', 'time'):
+            patcher = mock.patch(f'core.ratelimit.time.{name}', self.clock)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_local_burst_then_refill(self):
+        backend = LocalBackend(max_keys=10)
+        self.assertEqual([backend.hit('k', 3, 60) for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(backend.hit('k', 3, 60), 20)
+        self.clock.now += 20
+        self.assertEqual(backend.hit('k', 3, 60), 0)
+        self.assertAlmostEqual(backend.hit('k', 3, 60), 20)
+        # Tam periyot beklenince kova yeniden dolar
+        self.clock.now += 60
+        self.assertEqual([backend.hit('k', 3, 60) for _ in range(3)], [0, 0, 0])
+
+    def test_local_evicts_least_recently_used(self):
+        backend = LocalBackend(max_keys=2)
+        backend.hit('a', 1, 60)
+        backend.hit('b', 1, 60)
+        self.clock.now += 60
+        backend.hit('a', 1, 60)
+        backend.hit('c', 1, 60)
+        self.assertEqual(list(backend.tats), ['a', 'c'])
+        # 'a'nın sınırı eviction'dan sonra da geçerli
+        self.assertGreater(backend.hit('a', 1, 60), 0)
+
+    def test_cache_burst_and_rejections_not_counted(self):
+        cache.clear()
+        backend = CacheBackend('default')
+        self.clock.now = 6000.0  # pencere başı
+        self.assertEqual([backend.hit('k', 3, 60) for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(backend.hit('k', 3, 60), 60)
+        self.assertAlmostEqual(backend.hit('k', 3, 60), 60)
+        self.assertEqual(cache.get('rl:k:100'), 3)
+
+        # Sonraki pencerenin 1/3'ünde önceki pencere 3 × 2/3 = 2 istek sayılır
+        self.clock.now = 6080.0
+        self.assertEqual(backend.hit('k', 3, 60), 0)
+        self.assertAlmostEqual(backend.hit('k', 3, 60), 20)
+        self.clock.now = 6100.0
+        self.assertEqual(backend.hit('k', 3, 60), 0)
+
+
+class LimitedView(APIView):
+    rate_limits = [('ip', '3/m'), ('user', '1/m')]
+
+
+class RateLimitCheckTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = CustomUser.objects.create_user(username='alice', email='alice@example.com')
+        cls.bob = CustomUser.objects.create_user(username='bob', email='bob@example.com')
+
+    def setUp(self):
+        reset_rate_limits()
+        self.view = LimitedView.as_view()
+
+    def check(self, user, ip='10.0.0.1'):
+        request = RequestFactory().get('/', REMOTE_ADDR=ip)
+        request.user = user
+        return ratelimit.check(request, self.view)
+
+    def test_user_and_ip_scopes(self):
+        with self.assertLogs('core.ratelimit', 'WARNING') as logs:
+            self.assertIsNone(self.check(self.alice))
+            response = self.check(self.alice)
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response['Retry-After'], '60')
+
+            # Aynı IP'den başka kullanıcı: kullanıcı kovası ayrı, IP kovası ortak
+            self.assertIsNone(self.check(self.bob))
+            response = self.check(AnonymousUser())
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response['Retry-After'], '20')
+            self.assertIsNone(self.check(AnonymousUser(), ip='10.0.0.2'))
+        self.assertEqual([record.scope for record in logs.records], ['user', 'ip'])
+
+    @override_settings(RATE_LIMIT_ENABLED=False)
+    def test_disabled(self):
+        for _ in range(5):
+            self.assertIsNone(self.check(self.alice))
+
+
+class MediaServeTests(SimpleTestCase):
+    """core.media.serve: aralıklar, koşullu istekler ve önceden sıkıştırılmış kardeşler"""
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        (self.root / 'file.txt').write_bytes(b'0123456789')
+
+    def get(self, path='file.txt', **headers):
+        response = media.serve(RequestFactory().get('/', headers=headers), path, document_root=self.root)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_full_and_ranges(self):
+        response, body = self.get()
+        self.assertEqual((response.status_code, body), (200, b'0123456789'))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertNotIn('Vary', response)
+
+        for header, content, content_range in (
+            ('bytes=2-5', b'2345', 'bytes 2-5/10'),
+            ('bytes=7-', b'789', 'bytes 7-9/10'),
+            ('bytes=-3', b'789', 'bytes 7-9/10'),
+            ('bytes=8-100', b'89', 'bytes 8-9/10'),
+        ):
+            with self.subTest(range=header):
+                response, body = self.get(Range=header)
+                self.assertEqual((response.status_code, body), (206, content))
+                self.assertEqual(response['Content-Range'], content_range)
+
+    def test_invalid_range_is_ignored(self):
+        for header in ('bytes=5-3', 'bytes=0-1,4-5', 'items=0-1'):
+            with self.subTest(range=header):
+                response, body = self.get(Range=header)
+                self.assertEqual((response.status_code, body), (200, b'0123456789'))
+
+    def test_unsatisfiable_range(self):
+        for header in ('bytes=10-', 'bytes=-0'):
+            with self.subTest(range=header):
+                response, _ = self.get(Range=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response['Content-Range'], 'bytes */10')
+
+    def test_conditional_requests(self):
+        etag = self.get()[0]['ETag']
+        self.assertEqual(self.get(If_None_Match=etag)[0].status_code, 304)
+        self.assertEqual(self.get(If_Range=etag, Range='bytes=0-1')[0].status_code, 206)
+        # Dosya değişmişse (eşleşmeyen If-Range) tam dosya
+        response, body = self.get(If_Range='"eski"', Range='bytes=0-1')
+        self.assertEqual((response.status_code, body), (200, b'0123456789'))
+
+    def test_precompressed_siblings(self):
+        source = b'console.log(1);' * 100
+        (self.root / 'app.js').write_bytes(source)
+        (self.root / 'app.js.gz').write_bytes(gzip.compress(source))
+        (self.root / 'app.js.br').write_bytes(b'brotli')
+
+        response, body = self.get('app.js', Accept_Encoding='gzip, br')
+        self.assertEqual((response['Content-Encoding'], body), ('br', b'brotli'))
+        self.assertIn('javascript', response['Content-Type'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+        br_etag = response['ETag']
+
+        response, body = self.get('app.js', Accept_Encoding='gzip, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(body), source)
+        self.assertNotEqual(response['ETag'], br_etag)
+
+        response, body = self.get('app.js')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(body, source)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+        # ETag ve aralıklar seçilen temsile göre
+        self.assertEqual(self.get('app.js', Accept_Encoding='br', If_None_Match=br_etag)[0].status_code, 304)
+        self.assertEqual(self.get('app.js', If_None_Match=br_etag)[0].status_code, 200)
+        response, body = self.get('app.js', Accept_Encoding='br', Range='bytes=0-1')
+        self.assertEqual((response.status_code, body, response['Content-Encoding']), (206, b'br', 'br'))
+
+
+@override_settings(COMPRESSION_MIN_SIZE=100, COMPRESSION_BROTLI=False)
+class CompressionMiddlewareTests(SimpleTestCase):
+
+    body = b'{"items": [' + b'"x", ' * 200 + b'"y"]}'
+
+    def process(self, response, accept='gzip'):
+        request = RequestFactory().get('/', headers={'Accept-Encoding': accept} if accept else {})
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def json(self, body=None, headers=None):
+        return HttpResponse(body or self.body, content_type='application/json', headers=headers)
+
+    def test_compresses_large_json(self):
+        response = self.process(self.json(headers={'ETag': '"abc"'}))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.body)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_thresholds_and_skips(self):
+        small = self.process(self.json(b'{"a": 1}'))
+        self.assertNotIn('Content-Encoding', small)
+        self.assertNotIn('Vary', small)
+
+        image = self.process(HttpResponse(self.body, content_type='image/png'))
+        self.assertNotIn('Content-Encoding', image)
+
+        encoded = self.process(self.json(headers={'Content-Encoding': 'br'}))
+        self.assertEqual(encoded.content, self.body)
+
+        partial = self.json()
+        partial.status_code = 206
+        self.assertNotIn('Content-Encoding', self.process(partial))
+
+        # Kabul edilmeyen kodlama: sıkıştırılmaz ama önbellekler için Vary eklenir
+        identity = self.process(self.json(), accept='')
+        self.assertNotIn('Content-Encoding', identity)
+        self.assertIn('Accept-Encoding', identity['Vary'])
+
+    def test_streaming(self):
+        chunks = [self.body[i:i + 50] for i in range(0, len(self.body), 50)]
+        response = StreamingHttpResponse(iter(chunks), content_type='application/json')
+        response['Content-Length'] = str(len(self.body))
+        response = self.process(response)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Length', response)
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), self.body)
+
+    def test_async_streaming(self):
+        async def chunks():
+            for i in range(0, len(self.body), 50):
+                yield self.body[i:i + 50]
+
+        async def collect(response):
+            return b''.join([chunk async for chunk in response])
+
+        response = self.process(StreamingHttpResponse(chunks(), content_type='application/json'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(asyncio.run(collect(response))), self.body)
+
+    @skipIf(brotli is None, 'brotli kurulu değil')
+    @override_settings(COMPRESSION_BROTLI=True)
+    def test_brotli_preferred(self):
+        response = self.process(self.json(), accept='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), self.body)
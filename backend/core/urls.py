@@ -1,13 +1,27 @@
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 
+from . import media
+from .views import metrics_view, BatchView, ProfileListView, ProfileTokenView, ProfileDownloadView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/users/', include('users.urls')),
     path('api/friends/', include('friends.urls')),
+    path('api/batch/', BatchView.as_view(), name='batch'),
+    path('metrics', metrics_view, name='metrics'),
+
+    # Profilleme (sadece admin)
+    path('api/profiling/', ProfileListView.as_view(), name='profile-list'),
+    path('api/profiling/token/', ProfileTokenView.as_view(), name='profile-token'),
+    path('api/profiling/<str:profile_id>/', ProfileDownloadView.as_view(), name='profile-download'),
 ]
 
-if settings.DEBUG:
+if settings.MEDIA_SERVE:
+    urlpatterns += [re_path(r'^%s(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')), media.serve, name='media')]
+elif settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,98 @@
+import hmac
+import os
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from users.views import IsAdminUser
+
+from . import batch, metrics
+from .profiling import TOKEN_HEADER, ProfileStore, make_profile_token
+
+
+def metrics_allowed(request):
+    token = settings.METRICS_TOKEN
+    if token:
+        provided = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if hmac.compare_digest(provided, token):
+            return True
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated and (user.is_staff or user.is_admin_user):
+        return True
+    return settings.DEBUG and not token
+
+
+def metrics_view(request):
+    """
+    Prometheus metrikleri.
+    'Authorization: Bearer <METRICS_TOKEN>' veya admin oturumu gerekir; token
+    ayarlanmamışsa yalnızca DEBUG'da herkese açıktır.
+    """
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        metrics.render_prometheus(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
+class ProfileListView(APIView):
+    """Kayıtlı profilleri listele (sadece admin)"""
+    permission_classes = [IsAdminUser]
+    query_budget = 3
+
+    def get(self, request):
+        return Response(ProfileStore().list())
+
+
+class ProfileTokenView(APIView):
+    """Profilleme başlığı için imzalı token üret (sadece admin)"""
+    permission_classes = [IsAdminUser]
+    query_budget = 3
+
+    def post(self, request):
+        return Response({
+            'header': TOKEN_HEADER,
+            'token': make_profile_token(request.user),
+            'expires_in': settings.PROFILING_TOKEN_MAX_AGE,
+        })
+
+
+class ProfileDownloadView(APIView):
+    """
+    Tek bir profili indir (sadece admin).
+    Varsayılan .prof (pstats/snakeviz), ?format=json ile SQL ve özet.
+    """
+    permission_classes = [IsAdminUser]
+    query_budget = 3
+
+    def get(self, request, profile_id):
+        ext = 'json' if request.query_params.get('format') == 'json' else 'prof'
+        try:
+            path = ProfileStore().path(profile_id, ext)
+        except ValueError:
+            raise Http404
+        if not os.path.exists(path):
+            raise Http404
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=os.path.basename(path))
+
+
+class BatchView(APIView):
+    """
+    Birden çok users/friends çağrısını tek istekte çalıştır (ayrıntılar: core.batch).
+    Mobil açılışta me/, my-friends/, blocked/ ... için tek gidiş-dönüş.
+    """
+    # Kendi bütçesi; alt view'ların bütçeleri istek başına eklenir
+    query_budget = 3
+
+    def post(self, request):
+        try:
+            subs = batch.parse(request.data)
+        except batch.BatchError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        request._request.query_budget = self.query_budget + batch.query_budget(subs)
+        parallel = request.data.get('parallel') is True
+        return Response({'responses': batch.run(request._request, subs, parallel)})
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
+
+# last_seen tamponunu arka planda yaz (yalnızca sunucu süreçleri)
+from users.activity import tracker  # noqa: E402
+
+tracker.enable()
@@ -1,39 +1,207 @@
+from collections import defaultdict
+
 from django.contrib import admin
-from .models import FriendRequest, BlockedUser, Friendship
+from django.db import transaction
+from django.db.models import Q
+
+from core.admin import LargeTableAdmin
+from users import search
+from users.models import CustomUser
+
+from . import events, relationships
+from .models import FriendRequest, BlockedUser, Friendship, FriendEvent, ArchivedFriendRequest, Relationship
+
+
+class UserPairAdmin(LargeTableAdmin):
+    """
+    İki kullanıcı FK'lı tablolar: kullanıcılar liste satırlarıyla tek sorguda
+    gelir, formda autocomplete kullanılır. Arama join'li icontains yerine
+    users.search ile eşleşen kullanıcı id'leri üzerinden yapılır.
+    
+    Formdan ekleme/değiştirme/silme ve "seçilenleri sil" de view'lar gibi aynı
+    transaction'da olay yazar ve Relationship'i yeniler.
+    """
+    user_fields = ()
+    # (eklenince, silinince) olay türleri
+    created_event = deleted_event = None
+    
+    def pair_of(self, obj):
+        return tuple(getattr(obj, f'{field}_id') for field in self.user_fields)
+    
+    def record(self, request, type, pairs):
+        """pairs: [(pk, (kaynak, hedef)), ...]"""
+        is_request = self.model is FriendRequest
+        events.record_many([
+            events.build(type, source_id, target_id, actor=request.user,
+                         request_id=pk if is_request else None, source='admin')
+            for pk, (source_id, target_id) in pairs
+        ])
+    
+    def refresh(self, pairs):
+        others = defaultdict(set)
+        for source_id, target_id in pairs:
+            others[source_id].add(target_id)
+        for user_id, other_ids in others.items():
+            relationships.refresh(user_id, other_ids)
+    
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            old = None
+            if change:
+                old = self.model.objects.select_for_update().values_list(
+                    *(f'{field}_id' for field in self.user_fields)
+                ).get(pk=obj.pk)
+            super().save_model(request, obj, form, change)
+            new = self.pair_of(obj)
+            if old != new:
+                if old is not None:
+                    self.record(request, self.deleted_event, [(obj.pk, old)])
+                self.record(request, self.created_event, [(obj.pk, new)])
+                self.refresh([pair for pair in (old, new) if pair is not None])
+    
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            pk, pair = obj.pk, self.pair_of(obj)
+            super().delete_model(request, obj)
+            self.record(request, self.deleted_event, [(pk, pair)])
+            self.refresh([pair])
+    
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            rows = [
+                (pk, tuple(pair)) for pk, *pair in queryset.select_for_update().values_list(
+                    'pk', *(f'{field}_id' for field in self.user_fields)
+                )
+            ]
+            super().delete_queryset(request, queryset)
+            self.record(request, self.deleted_event, rows)
+            self.refresh([pair for _, pair in rows])
+    
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        users = CustomUser.objects.filter(search.admin_q(search_term)).values('id')
+        q = Q()
+        for field in self.user_fields:
+            q |= Q(**{f'{field}__in': users})
+        return queryset.filter(q), False
 
 
 @admin.register(FriendRequest)
-class FriendRequestAdmin(admin.ModelAdmin):
+class FriendRequestAdmin(UserPairAdmin, admin.ModelAdmin):
     list_display = ['sender', 'receiver', 'status', 'created_at']
     list_filter = ['status', 'created_at']
-    search_fields = ['sender__username', 'sender__first_name', 'receiver__username', 'receiver__first_name']
+    user_fields = ('sender', 'receiver')
+    # search_fields arama kutusunu açar; arama UserPairAdmin.get_search_results'ta
+    list_select_related = autocomplete_fields = search_fields = user_fields
+    search_help_text = 'Ad, kullanıcı adı, e-posta veya kullanıcı id'
     readonly_fields = ['created_at', 'updated_at']
+    created_event, deleted_event = 'request_sent', 'request_deleted'
+    # Formdan durum değişikliği aksiyonlarla aynı yoldan geçer (onay arkadaşlığı da oluşturur)
+    status_events = {'approved': 'request_approved', 'rejected': 'request_rejected', 'pending': 'request_resent'}
     
     actions = ['approve_requests', 'reject_requests']
     
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            if 'status' in form.changed_data:
+                if obj.status == 'approved':
+                    Friendship.objects.get_or_create(user1_id=obj.sender_id, user2_id=obj.receiver_id)
+                pair = self.pair_of(obj)
+                self.record(request, self.status_events[obj.status], [(obj.pk, pair)])
+                self.refresh([pair])
+    
     def approve_requests(self, request, queryset):
-        for obj in queryset.filter(status='pending'):
-            obj.status = 'approved'
-            obj.save()
-            Friendship.objects.get_or_create(user1=obj.sender, user2=obj.receiver)
+        with transaction.atomic():
+            for obj in queryset.filter(status='pending').select_for_update():
+                obj.status = 'approved'
+                obj.save()
+                Friendship.objects.get_or_create(user1_id=obj.sender_id, user2_id=obj.receiver_id)
+                events.record('request_approved', obj.sender_id, obj.receiver_id,
+                              actor=request.user, request_id=obj.id, source='admin')
+                relationships.refresh(obj.sender_id, [obj.receiver_id])
         self.message_user(request, f"{queryset.count()} istek onaylandı.")
     approve_requests.short_description = "Seçili istekleri onayla"
     
     def reject_requests(self, request, queryset):
-        queryset.filter(status='pending').update(status='rejected')
+        with transaction.atomic():
+            pending = list(
+                queryset.filter(status='pending').select_for_update()
+                .values_list('id', 'sender_id', 'receiver_id')
+            )
+            FriendRequest.objects.filter(id__in=[pk for pk, _, _ in pending]).update(status='rejected')
+            events.record_many([
+                events.build('request_rejected', sender_id, receiver_id,
+                             actor=request.user, request_id=pk, source='admin')
+                for pk, sender_id, receiver_id in pending
+            ])
+            for _, sender_id, receiver_id in pending:
+                relationships.refresh(sender_id, [receiver_id])
         self.message_user(request, f"{queryset.count()} istek reddedildi.")
     reject_requests.short_description = "Seçili istekleri reddet"
 
 
 @admin.register(BlockedUser)
-class BlockedUserAdmin(admin.ModelAdmin):
+class BlockedUserAdmin(UserPairAdmin, admin.ModelAdmin):
     list_display = ['blocker', 'blocked', 'created_at']
-    search_fields = ['blocker__username', 'blocked__username']
+    user_fields = ('blocker', 'blocked')
+    list_select_related = autocomplete_fields = search_fields = user_fields
+    search_help_text = FriendRequestAdmin.search_help_text
     readonly_fields = ['created_at']
+    created_event, deleted_event = 'user_blocked', 'user_unblocked'
 
 
 @admin.register(Friendship)
-class FriendshipAdmin(admin.ModelAdmin):
+class FriendshipAdmin(UserPairAdmin, admin.ModelAdmin):
     list_display = ['user1', 'user2', 'created_at']
-    search_fields = ['user1__username', 'user2__username']
+    user_fields = ('user1', 'user2')
+    list_select_related = autocomplete_fields = search_fields = user_fields
+    search_help_text = FriendRequestAdmin.search_help_text
     readonly_fields = ['created_at']
+    created_event, deleted_event = 'friendship_created', 'friendship_deleted'
+
+
+@admin.register(FriendEvent)
+class FriendEventAdmin(LargeTableAdmin, admin.ModelAdmin):
+    """Sadece okunur denetim kaydı"""
+    list_display = ['id', 'type', 'actor_id', 'source_id', 'target_id', 'request_id', 'created_at', 'relayed_at']
+    list_filter = ['type', 'created_at']
+    search_fields = ['=source_id', '=target_id', '=actor_id', '=request_id']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedFriendRequest)
+class ArchivedFriendRequestAdmin(LargeTableAdmin, admin.ModelAdmin):
+    """Sadece okunur arşiv"""
+    list_display = ['original_id', 'sender_id', 'receiver_id', 'status', 'created_at', 'archived_at']
+    list_filter = ['status']
+    search_fields = ['=original_id', '=sender_id', '=receiver_id']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Relationship)
+class RelationshipAdmin(LargeTableAdmin, admin.ModelAdmin):
+    """Türetilmiş tablo; sadece okunur (düzeltme için 'backfill_relationships')"""
+    list_display = ['user_a_id', 'user_b_id', 'state', 'updated_at']
+    list_filter = ['state']
+    search_fields = ['=user_a_id', '=user_b_id']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,81 @@
+"""
+Sonuçlanmış arkadaşlık isteklerinin arşivlenmesi.
+
+Onaylanan isteğin bilgisi zaten Friendship'te, reddedilen isteğinki ise
+sadece tekrar gönderme için tutuluyor. Belirli bir süreden eski bu satırlar
+küçük gruplar halinde ArchivedFriendRequest tablosuna ya da gzip'li NDJSON
+dosyasına taşınır ve FriendRequest'ten silinir.
+
+Silinen satır (sender, receiver) unique kısıtını boşaltır; tekrar gönderme
+SendFriendRequestView'da yeni bir istek olarak oluşturulur. Onaylanmış bir
+çift için yeni istek Friendship kontrolüne takılır.
+"""
+import gzip
+import json
+import os
+
+from django.db import transaction
+
+from .models import ArchivedFriendRequest, FriendRequest
+
+TERMINAL_STATUSES = ('approved', 'rejected')
+
+ARCHIVE_FIELDS = ('id', 'sender_id', 'receiver_id', 'note', 'status', 'created_at', 'updated_at')
+
+
+class NdjsonArchiveWriter:
+    """Grupları tek bir .ndjson.gz dosyasına ekler (her grup ayrı gzip üyesi)"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def write(self, rows):
+        with open(self.path, 'ab') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='ab') as f:
+                for row in rows:
+                    record = dict(row, created_at=row['created_at'].isoformat(), updated_at=row['updated_at'].isoformat())
+                    f.write(json.dumps(record, ensure_ascii=False).encode() + b'\n')
+            raw.flush()
+            os.fsync(raw.fileno())
+
+
+class TableArchiveWriter:
+    """Grupları ArchivedFriendRequest tablosuna yazar"""
+
+    def write(self, rows):
+        ArchivedFriendRequest.objects.bulk_create([
+            ArchivedFriendRequest(
+                original_id=row['id'],
+                sender_id=row['sender_id'],
+                receiver_id=row['receiver_id'],
+                note=row['note'],
+                status=row['status'],
+                created_at=row['created_at'],
+                updated_at=row['updated_at'],
+            )
+            for row in rows
+        ], ignore_conflicts=True)
+
+
+def archivable(cutoff, statuses=TERMINAL_STATUSES):
+    return FriendRequest.objects.filter(status__in=statuses, updated_at__lt=cutoff)
+
+
+def archive_batch(cutoff, writer, batch_size, statuses=TERMINAL_STATUSES):
+    """
+    En eski batch_size satırı kilitle, arşive yaz ve sil; taşınan sayıyı döndür.
+    Kilitli (o anda güncellenen) satırlar atlanır, sonraki grupta tekrar denenir.
+    """
+    with transaction.atomic():
+        rows = list(
+            archivable(cutoff, statuses)
+            .select_for_update(skip_locked=True)
+            .order_by('id')
+            .values(*ARCHIVE_FIELDS)[:batch_size]
+        )
+        if not rows:
+            return 0
+        writer.write(rows)
+        FriendRequest.objects.filter(id__in=[row['id'] for row in rows]).delete()
+    return len(rows)
@@ -0,0 +1,217 @@
+"""
+Arkadaşlık olayları: transactional outbox ve aktarım (relay).
+
+View'lar durum değişikliğini yaptıkları transaction içinde record() ile
+FriendEvent yazar; böylece ya ikisi birden kalıcı olur ya hiçbiri.
+'relay_events' komutu aktarılmamış olayları id sırasıyla gruplar halinde
+yapılandırılmış sink'lere gönderir ve relayed_at ile işaretler.
+
+Sıranın korunması için aynı anda tek relay çalışır: Postgres'te her tur
+oturum düzeyinde advisory lock alır (alamayan tur boş döner); diğer
+veritabanlarında tek 'relay_events' süreci çalıştırılmalıdır. Satır kilidi
+tutulmaz ve sink'lere gönderim (webhook dahil) transaction dışında yapılır.
+
+Teslimat en az bir kezdir: bir sink başarısız olursa grup tekrar gönderilir,
+tüketiciler olay id'si ile tekrarları ayıklamalıdır.
+
+    from friends.events import subscribe
+
+    @subscribe('request_approved')
+    def notify(event): ...
+"""
+import hashlib
+import json
+import logging
+import os
+import urllib.request
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Max
+from django.utils import timezone
+
+from core.metrics import registry
+
+from .models import FriendEvent
+
+logger = logging.getLogger(__name__)
+
+# Sıkıştırmada aynı çift için ayrı tutulan olay grupları
+EVENT_GROUPS = {
+    'request': ['request_sent', 'request_resent', 'request_approved', 'request_rejected', 'request_deleted'],
+    'block': ['user_blocked', 'user_unblocked'],
+    'friendship': ['friendship_created', 'friendship_deleted'],
+}
+
+
+def build(type, source_id, target_id, actor=None, request_id=None, **payload):
+    """Kaydedilmemiş olay (record_many ile toplu yazmak için)"""
+    return FriendEvent(
+        type=type,
+        actor_id=actor.id if actor is not None else None,
+        source_id=source_id,
+        target_id=target_id,
+        request_id=request_id,
+        payload=payload,
+    )
+
+
+def record(type, source_id, target_id, actor=None, request_id=None, **payload):
+    """Olayı yaz; çağıran transaction.atomic() içinde olmalı"""
+    event = build(type, source_id, target_id, actor, request_id, **payload)
+    event.save()
+    return event
+
+
+def record_many(events):
+    return FriendEvent.objects.bulk_create(events)
+
+
+# ============== Sink'ler ==============
+
+_subscribers = defaultdict(list)
+
+
+def subscribe(*types):
+    """Süreç içi abone: @subscribe('request_approved') veya tüm olaylar için @subscribe()"""
+    def decorator(func):
+        for event_type in types or ('*',):
+            _subscribers[event_type].append(func)
+        return func
+    return decorator
+
+
+class SubscriberSink:
+    """Olayları @subscribe ile kaydolmuş fonksiyonlara iletir"""
+
+    def send(self, events):
+        for event in events:
+            for func in _subscribers[event['type']] + _subscribers['*']:
+                func(event)
+
+
+class FileSink:
+    """Olayları NDJSON olarak dosyaya ekler"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, events):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(event, ensure_ascii=False) + '\n' for event in events))
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class WebhookSink:
+    """Grubu tek bir JSON POST isteğiyle gönderir; 2xx dışı yanıt hatadır"""
+
+    def __init__(self, url, token=None, timeout=5):
+        self.url = url
+        self.token = token
+        self.timeout = timeout
+
+    def send(self, events):
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        request = urllib.request.Request(
+            self.url, data=json.dumps({'events': events}).encode(), headers=headers, method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+def build_sinks():
+    sinks = [SubscriberSink()]
+    if settings.FRIEND_EVENTS_FILE:
+        sinks.append(FileSink(settings.FRIEND_EVENTS_FILE))
+    if settings.FRIEND_EVENTS_WEBHOOK_URL:
+        sinks.append(WebhookSink(settings.FRIEND_EVENTS_WEBHOOK_URL, settings.FRIEND_EVENTS_WEBHOOK_TOKEN))
+    return sinks
+
+
+# ============== Relay, sıkıştırma, saklama ==============
+
+RELAY_LOCK_KEY = int.from_bytes(hashlib.blake2b(b'friends.events.relay', digest_size=8).digest(), 'big', signed=True)
+
+
+@contextmanager
+def relay_lock():
+    """Tek relay kilidi; alındıysa True. Postgres dışında her zaman True (tek süreç varsayılır)"""
+    connection = connections[FriendEvent.objects.db]
+    if connection.vendor != 'postgresql':
+        yield True
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_lock(%s)', [RELAY_LOCK_KEY])
+        acquired = cursor.fetchone()[0]
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [RELAY_LOCK_KEY])
+
+
+def relay(batch_size, sinks):
+    """
+    Aktarılmamış en eski batch_size olayı tüm sink'lere gönder.
+    Bir sink hata verirse hiçbir olay işaretlenmez ve hata yükseltilir.
+    Başka bir relay çalışıyorsa 0 döner.
+    """
+    with relay_lock() as acquired:
+        if not acquired:
+            return 0
+        events = list(FriendEvent.objects.filter(relayed_at__isnull=True).order_by('id')[:batch_size])
+        if not events:
+            return 0
+        payload = [event.as_dict() for event in events]
+        for sink in sinks:
+            sink.send(payload)
+        FriendEvent.objects.filter(id__in=[event.id for event in events]).update(relayed_at=timezone.now())
+
+    for event in events:
+        registry.inc('friend_events_relayed_total', {'type': event.type})
+    registry.maybe_flush()
+    return len(events)
+
+
+def _delete_in_batches(queryset, batch_size):
+    total = 0
+    while True:
+        ids = list(queryset.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return total
+        total += FriendEvent.objects.filter(id__in=ids).delete()[0]
+
+
+def compact(days, batch_size=1000):
+    """
+    `days` günden eski aktarılmış olaylardan, aynı çift ve grup için daha yeni
+    bir olayı olanları sil (her çiftin son durumu kalır).
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    total = 0
+    for types in EVENT_GROUPS.values():
+        latest = (
+            FriendEvent.objects.filter(type__in=types)
+            .values('source_id', 'target_id')
+            .annotate(last_id=Max('id'))
+            .values('last_id')
+        )
+        total += _delete_in_batches(
+            FriendEvent.objects.filter(type__in=types, relayed_at__lt=cutoff).exclude(id__in=latest),
+            batch_size,
+        )
+    return total
+
+
+def purge(days, batch_size=1000):
+    """`days` günden eski aktarılmış tüm olayları sil"""
+    cutoff = timezone.now() - timedelta(days=days)
+    return _delete_in_batches(FriendEvent.objects.filter(relayed_at__lt=cutoff), batch_size)
@@ -0,0 +1,69 @@
+"""
+Eski onaylanmış/reddedilmiş arkadaşlık isteklerini arşivle.
+
+Satırlar küçük gruplar halinde taşınır, gruplar arasında beklenir; böylece
+canlı trafikle birlikte çalıştırılabilir.
+
+Örnek:
+    python manage.py archive_friend_requests --days 90
+    python manage.py archive_friend_requests --status rejected --to-file /var/archive
+    python manage.py archive_friend_requests --dry-run
+"""
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from friends.archive import (
+    TERMINAL_STATUSES, NdjsonArchiveWriter, TableArchiveWriter, archivable, archive_batch
+)
+
+
+class Command(BaseCommand):
+    help = 'Sonuçlanmış eski arkadaşlık isteklerini arşiv tablosuna veya NDJSON dosyasına taşır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.FRIEND_REQUEST_ARCHIVE_DAYS,
+                            help='Bu günden uzun süredir değişmeyen istekler arşivlenir')
+        parser.add_argument('--status', choices=TERMINAL_STATUSES, action='append',
+                            help='Sadece bu durum (tekrarlanabilir, varsayılan: hepsi)')
+        parser.add_argument('--batch', type=int, default=1000)
+        parser.add_argument('--sleep', type=float, default=0.2, help='Gruplar arası bekleme (sn)')
+        parser.add_argument('--limit', type=int, default=None, help='En fazla bu kadar satır taşı')
+        parser.add_argument('--to-file', metavar='DIR', help='Tablo yerine DIR içine .ndjson.gz yaz')
+        parser.add_argument('--dry-run', action='store_true', help='Sadece sayıyı göster')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        statuses = tuple(options['status'] or TERMINAL_STATUSES)
+
+        if options['dry_run']:
+            count = archivable(cutoff, statuses).count()
+            self.stdout.write(f'{count} istek arşivlenecek ({cutoff:%Y-%m-%d} öncesi, {", ".join(statuses)})')
+            return
+
+        if options['to_file']:
+            path = os.path.join(options['to_file'], f'friend_requests-{timezone.now():%Y%m%d-%H%M%S}.ndjson.gz')
+            writer = NdjsonArchiveWriter(path)
+            self.stdout.write(f'Arşiv dosyası: {path}')
+        else:
+            writer = TableArchiveWriter()
+
+        moved = 0
+        started = time.monotonic()
+        while options['limit'] is None or moved < options['limit']:
+            batch_size = options['batch']
+            if options['limit'] is not None:
+                batch_size = min(batch_size, options['limit'] - moved)
+            count = archive_batch(cutoff, writer, batch_size, statuses)
+            if count == 0:
+                break
+            moved += count
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f'{moved} istek arşivlendi ({elapsed:.1f} sn)'))
@@ -0,0 +1,56 @@
+"""
+Relationship tablosunu Friendship, FriendRequest ve BlockedUser'dan yeniden kur.
+
+Kullanıcılar id sırasıyla gruplar halinde işlenir (grup başına bir
+transaction), gruplar arasında beklenir; canlı trafikle birlikte
+çalıştırılabilir. Yalnızca farklı olan satırlar yazılır/silinir, tekrar
+çalıştırmak güvenlidir.
+
+Örnek:
+    python manage.py backfill_relationships
+    python manage.py backfill_relationships --batch 500 --sleep 0.5
+    python manage.py backfill_relationships --dry-run   # sadece farkları say
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from friends.relationships import backfill_range
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = 'İlişki özet tablosunu kaynak tablolardan doldurur ve farkları düzeltir'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=1000, help='Grup başına kullanıcı sayısı')
+        parser.add_argument('--sleep', type=float, default=0.1, help='Gruplar arası bekleme (sn)')
+        parser.add_argument('--dry-run', action='store_true', help='Yazmadan farkları say')
+
+    def handle(self, *args, **options):
+        written = deleted = 0
+        last_id = 0
+        started = time.monotonic()
+        while True:
+            ids = list(
+                CustomUser.objects.filter(id__gt=last_id).order_by('id')
+                .values_list('id', flat=True)[:options['batch']]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                changed, stale = backfill_range(ids[0], ids[-1] + 1, dry_run=options['dry_run'])
+            written += changed
+            deleted += stale
+            last_id = ids[-1]
+            if options['sleep'] and not options['dry_run']:
+                time.sleep(options['sleep'])
+
+        elapsed = time.monotonic() - started
+        if options['dry_run']:
+            self.stdout.write(f'{written} çift yazılacak, {deleted} çift silinecek')
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'{written} çift yazıldı, {deleted} çift silindi ({elapsed:.1f} sn)'
+            ))
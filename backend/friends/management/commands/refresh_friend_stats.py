@@ -0,0 +1,56 @@
+"""
+Moderasyon paneli özet tablolarını güncelle (friends/stats.py).
+
+Varsayılan olarak FRIEND_STATS_INTERVAL aralıkla sürekli çalışır; cron'dan
+çağrılacaksa --once kullanılır. İlk çalıştırma mevcut tüm satırları gruplar
+halinde işler.
+
+Örnek:
+    python manage.py refresh_friend_stats
+    python manage.py refresh_friend_stats --once
+"""
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from friends.stats import refresh
+
+
+class Command(BaseCommand):
+    help = 'Moderasyon istatistiklerini (saatlik/günlük sayaçlar, bekleyen kuyruk) günceller'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=settings.FRIEND_STATS_INTERVAL,
+                            help='Turlar arası bekleme (sn)')
+        parser.add_argument('--batch', type=int, default=settings.FRIEND_STATS_BATCH_SIZE)
+        parser.add_argument('--once', action='store_true', help='Tek tur çalışıp çık')
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        while not self.stopping:
+            close_old_connections()
+            started = time.monotonic()
+            try:
+                processed = refresh(options['batch'])
+            except Exception as e:
+                # Geçici veritabanı hatası; imleçler ilerlemediği için sonraki tur tekrar dener
+                self.stderr.write(f'Güncelleme hatası: {e}')
+                if options['once']:
+                    raise
+            else:
+                summary = ', '.join(f'{name}: {count}' for name, count in processed.items())
+                self.stdout.write(f'{summary} ({time.monotonic() - started:.1f} sn)')
+            if options['once']:
+                break
+            deadline = time.monotonic() + options['interval']
+            while not self.stopping and time.monotonic() < deadline:
+                time.sleep(min(1, options['interval']))
+
+    def stop(self, signum, frame):
+        self.stopping = True
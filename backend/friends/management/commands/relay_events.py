@@ -0,0 +1,78 @@
+"""
+Arkadaşlık olaylarını (FriendEvent) sink'lere aktaran worker.
+
+Sink'ler ayarlardan kurulur: süreç içi aboneler her zaman, FRIEND_EVENTS_FILE
+(NDJSON) ve FRIEND_EVENTS_WEBHOOK_URL tanımlıysa. Sıralamanın korunması için
+Postgres'te aynı anda yalnızca bir süreç aktarır (advisory lock; diğerleri
+bekler); başka veritabanlarında tek bir relay süreci çalıştırılmalıdır.
+
+Örnek:
+    python manage.py relay_events
+    python manage.py relay_events --once --compact --purge
+"""
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from friends.events import build_sinks, compact, purge, relay
+
+# Sıkıştırma/temizlik en fazla bu aralıkla yapılır (saniye)
+MAINTENANCE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = 'Arkadaşlık olaylarını yapılandırılmış sink\'lere aktarır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=settings.FRIEND_EVENTS_BATCH_SIZE)
+        parser.add_argument('--sleep', type=float, default=settings.FRIEND_EVENTS_POLL_INTERVAL, help='Olay yokken bekleme (sn)')
+        parser.add_argument('--once', action='store_true', help='Bekleyen olaylar bitince çık')
+        parser.add_argument('--compact', action='store_true', help='Çıkmadan önce sıkıştırma yap')
+        parser.add_argument('--purge', action='store_true', help='Çıkmadan önce eski olayları sil')
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        sinks = build_sinks()
+        relayed = 0
+        last_maintenance = time.monotonic()
+        while not self.stopping:
+            close_old_connections()
+            try:
+                count = relay(options['batch'], sinks)
+            except Exception as e:
+                # Sink geçici olarak erişilemez; aynı grup bir sonraki turda tekrar denenir
+                self.stderr.write(f'Aktarım hatası: {e}')
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+            relayed += count
+
+            if not options['once'] and time.monotonic() - last_maintenance > MAINTENANCE_INTERVAL:
+                last_maintenance = time.monotonic()
+                self.maintenance(compact_events=True, purge_events=True)
+
+            if count == 0:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+
+        self.maintenance(options['compact'], options['purge'])
+        self.stdout.write(self.style.SUCCESS(f'{relayed} olay aktarıldı'))
+
+    def maintenance(self, compact_events, purge_events):
+        if compact_events:
+            removed = compact(settings.FRIEND_EVENTS_COMPACT_AFTER_DAYS)
+            self.stdout.write(f'Sıkıştırma: {removed} olay silindi')
+        if purge_events:
+            removed = purge(settings.FRIEND_EVENTS_RETENTION_DAYS)
+            self.stdout.write(f'Saklama: {removed} olay silindi')
+
+    def stop(self, signum, frame):
+        self.stopping = True
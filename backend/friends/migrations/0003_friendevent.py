@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('friends', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FriendEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('request_sent', 'İstek Gönderildi'), ('request_resent', 'İstek Tekrar Gönderildi'), ('request_approved', 'İstek Onaylandı'), ('request_rejected', 'İstek Reddedildi'), ('user_blocked', 'Kullanıcı Engellendi'), ('user_unblocked', 'Engel Kaldırıldı')], max_length=20, verbose_name='Olay')),
+                ('actor_id', models.BigIntegerField(blank=True, null=True, verbose_name='İşlemi Yapan')),
+                ('source_id', models.BigIntegerField(verbose_name='Kaynak Kullanıcı')),
+                ('target_id', models.BigIntegerField(verbose_name='Hedef Kullanıcı')),
+                ('request_id', models.BigIntegerField(blank=True, null=True, verbose_name='İstek')),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')),
+                ('relayed_at', models.DateTimeField(blank=True, null=True, verbose_name='Aktarılma Tarihi')),
+            ],
+            options={
+                'verbose_name': 'Arkadaşlık Olayı',
+                'verbose_name_plural': 'Arkadaşlık Olayları',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['relayed_at', 'id'], name='friends_event_relay_idx'), models.Index(fields=['source_id', 'target_id', 'id'], name='friends_event_pair_idx')],
+            },
+        ),
+    ]
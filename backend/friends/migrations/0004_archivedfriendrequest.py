@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('friends', '0003_friendevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedFriendRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(unique=True, verbose_name='İstek')),
+                ('sender_id', models.BigIntegerField(verbose_name='Gönderen')),
+                ('receiver_id', models.BigIntegerField(verbose_name='Alıcı')),
+                ('note', models.TextField(blank=True, verbose_name='Not')),
+                ('status', models.CharField(choices=[('pending', 'Beklemede'), ('approved', 'Onaylandı'), ('rejected', 'Reddedildi')], max_length=10, verbose_name='Durum')),
+                ('created_at', models.DateTimeField(verbose_name='Oluşturulma Tarihi')),
+                ('updated_at', models.DateTimeField(verbose_name='Güncellenme Tarihi')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Arşivlenme Tarihi')),
+            ],
+            options={
+                'verbose_name': 'Arşivlenmiş Arkadaşlık İsteği',
+                'verbose_name_plural': 'Arşivlenmiş Arkadaşlık İstekleri',
+                'ordering': ['-original_id'],
+                'indexes': [models.Index(fields=['sender_id', 'receiver_id'], name='friends_archive_pair_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-19 19:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('friends', '0004_archivedfriendrequest'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Relationship',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', models.CharField(choices=[('friends', 'Arkadaş'), ('a_requested', 'A istek gönderdi'), ('b_requested', 'B istek gönderdi'), ('both_requested', 'Karşılıklı istek'), ('a_blocked', 'A engelledi'), ('b_blocked', 'B engelledi'), ('both_blocked', 'Karşılıklı engel')], max_length=16, verbose_name='Durum')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Güncellenme Tarihi')),
+                ('user_a', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Kullanıcı A')),
+                ('user_b', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Kullanıcı B')),
+            ],
+            options={
+                'verbose_name': 'İlişki',
+                'verbose_name_plural': 'İlişkiler',
+                'indexes': [models.Index(fields=['user_b', 'user_a'], name='friends_relationship_b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user_a', 'user_b'), name='friends_relationship_pair_uniq'), models.CheckConstraint(condition=models.Q(('user_a__lt', models.F('user_b'))), name='friends_relationship_canonical')],
+            },
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 6.0.1 on 2026-10-19 21:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('friends', '0005_relationship'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GrowthDayStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True, verbose_name='Gün')),
+                ('new_users', models.PositiveIntegerField(default=0, verbose_name='Yeni Kullanıcı')),
+                ('new_friendships', models.PositiveIntegerField(default=0, verbose_name='Yeni Arkadaşlık')),
+            ],
+            options={
+                'verbose_name': 'Günlük Büyüme İstatistiği',
+                'verbose_name_plural': 'Günlük Büyüme İstatistikleri',
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ModerationHourStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(unique=True, verbose_name='Saat')),
+                ('requests_sent', models.PositiveIntegerField(default=0, verbose_name='Gönderilen')),
+                ('approved', models.PositiveIntegerField(default=0, verbose_name='Onaylanan')),
+                ('rejected', models.PositiveIntegerField(default=0, verbose_name='Reddedilen')),
+            ],
+            options={
+                'verbose_name': 'Saatlik Moderasyon İstatistiği',
+                'verbose_name_plural': 'Saatlik Moderasyon İstatistikleri',
+                'ordering': ['-hour'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PendingQueueSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Zaman')),
+                ('depth', models.PositiveIntegerField(verbose_name='Bekleyen')),
+                ('age_p50', models.PositiveIntegerField(default=0)),
+                ('age_p90', models.PositiveIntegerField(default=0)),
+                ('age_p99', models.PositiveIntegerField(default=0)),
+                ('age_max', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Bekleyen Kuyruk Görüntüsü',
+                'verbose_name_plural': 'Bekleyen Kuyruk Görüntüleri',
+                'ordering': ['-taken_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StatsCursor',
+            fields=[
+                ('name', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'İstatistik İmleci',
+                'verbose_name_plural': 'İstatistik İmleçleri',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='friendrequest',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['updated_at'], name='friends_request_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 23:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('friends', '0006_moderation_stats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='friendevent',
+            name='type',
+            field=models.CharField(choices=[('request_sent', 'İstek Gönderildi'), ('request_resent', 'İstek Tekrar Gönderildi'), ('request_approved', 'İstek Onaylandı'), ('request_rejected', 'İstek Reddedildi'), ('user_blocked', 'Kullanıcı Engellendi'), ('user_unblocked', 'Engel Kaldırıldı'), ('request_deleted', 'İstek Silindi'), ('friendship_created', 'Arkadaşlık Oluşturuldu'), ('friendship_deleted', 'Arkadaşlık Silindi')], max_length=20, verbose_name='Olay'),
+        ),
+    ]
@@ -40,6 +40,11 @@ class FriendRequest(models.Model):
         verbose_name_plural = "Arkadaşlık İstekleri"
         unique_together = ['sender', 'receiver']
         ordering = ['-created_at']
+        indexes = [
+            # Bekleyen kuyruk (derinlik, yaş yüzdelikleri); sadece bekleyen satırlar
+            models.Index(fields=['updated_at'], condition=models.Q(status='pending'),
+                         name='friends_request_pending_idx'),
+        ]
     
     def __str__(self):
         return f"{self.sender} -> {self.receiver} ({self.get_status_display()})"
@@ -101,3 +106,208 @@ class Friendship(models.Model):
     
     def __str__(self):
         return f"{self.user1} <-> {self.user2}"
+
+
+class FriendEvent(models.Model):
+    """
+    Arkadaşlık geçişlerinin sadece eklenen olay kaydı (outbox + denetim).
+    Durum değişikliğiyle aynı transaction'da yazılır, 'relay_events' komutu
+    id sırasıyla sink'lere aktarır. Kullanıcılar silinse de kayıt kalsın diye
+    FK yerine düz id tutulur.
+    """
+    TYPE_CHOICES = [
+        ('request_sent', 'İstek Gönderildi'),
+        ('request_resent', 'İstek Tekrar Gönderildi'),
+        ('request_approved', 'İstek Onaylandı'),
+        ('request_rejected', 'İstek Reddedildi'),
+        ('user_blocked', 'Kullanıcı Engellendi'),
+        ('user_unblocked', 'Engel Kaldırıldı'),
+        # Yalnızca admin panelinden yapılan ekleme/silmeler
+        ('request_deleted', 'İstek Silindi'),
+        ('friendship_created', 'Arkadaşlık Oluşturuldu'),
+        ('friendship_deleted', 'Arkadaşlık Silindi'),
+    ]
+    
+    type = models.CharField(max_length=20, choices=TYPE_CHOICES, verbose_name="Olay")
+    actor_id = models.BigIntegerField(null=True, blank=True, verbose_name="İşlemi Yapan")
+    # İstekler için gönderen/alıcı, engellemeler için engelleyen/engellenen
+    source_id = models.BigIntegerField(verbose_name="Kaynak Kullanıcı")
+    target_id = models.BigIntegerField(verbose_name="Hedef Kullanıcı")
+    request_id = models.BigIntegerField(null=True, blank=True, verbose_name="İstek")
+    payload = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma Tarihi")
+    relayed_at = models.DateTimeField(null=True, blank=True, verbose_name="Aktarılma Tarihi")
+    
+    class Meta:
+        verbose_name = "Arkadaşlık Olayı"
+        verbose_name_plural = "Arkadaşlık Olayları"
+        ordering = ['id']
+        indexes = [
+            # Relay'in "aktarılmamış olaylar" sorgusu
+            models.Index(fields=['relayed_at', 'id'], name='friends_event_relay_idx'),
+            # Sıkıştırma: çift başına en son olay
+            models.Index(fields=['source_id', 'target_id', 'id'], name='friends_event_pair_idx'),
+        ]
+    
+    def __str__(self):
+        return f"#{self.id} {self.get_type_display()} {self.source_id} -> {self.target_id}"
+    
+    def as_dict(self):
+        return {
+            'id': self.id,
+            'type': self.type,
+            'actor_id': self.actor_id,
+            'source_id': self.source_id,
+            'target_id': self.target_id,
+            'request_id': self.request_id,
+            'payload': self.payload,
+            'created_at': self.created_at.isoformat(),
+        }
+
+
+class ArchivedFriendRequest(models.Model):
+    """
+    Arşivlenmiş (onaylanmış/reddedilmiş ve eski) arkadaşlık isteği.
+    'archive_friend_requests' komutu FriendRequest'ten taşır; ana tablo ve
+    indeksleri sadece canlı isteklerle küçük kalır.
+    """
+    original_id = models.BigIntegerField(unique=True, verbose_name="İstek")
+    sender_id = models.BigIntegerField(verbose_name="Gönderen")
+    receiver_id = models.BigIntegerField(verbose_name="Alıcı")
+    note = models.TextField(blank=True, verbose_name="Not")
+    status = models.CharField(
+        max_length=10,
+        choices=FriendRequest.STATUS_CHOICES,
+        verbose_name="Durum"
+    )
+    created_at = models.DateTimeField(verbose_name="Oluşturulma Tarihi")
+    updated_at = models.DateTimeField(verbose_name="Güncellenme Tarihi")
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name="Arşivlenme Tarihi")
+    
+    class Meta:
+        verbose_name = "Arşivlenmiş Arkadaşlık İsteği"
+        verbose_name_plural = "Arşivlenmiş Arkadaşlık İstekleri"
+        ordering = ['-original_id']
+        indexes = [
+            models.Index(fields=['sender_id', 'receiver_id'], name='friends_archive_pair_idx'),
+        ]
+    
+    def __str__(self):
+        return f"#{self.original_id} {self.sender_id} -> {self.receiver_id} ({self.get_status_display()})"
+
+
+class Relationship(models.Model):
+    """
+    İki kullanıcı arasındaki ilişkinin tek satırlık özeti (türetilmiş tablo).
+    Friendship, FriendRequest (bekleyen) ve BlockedUser'dan hesaplanır; çift
+    her zaman user_a < user_b olacak şekilde saklanır. Yazma yolları aynı
+    transaction'da friends.relationships.refresh() ile günceller, ilişkisi
+    olmayan çiftin satırı yoktur. 'backfill_relationships' komutu yeniden kurar.
+    """
+    STATE_CHOICES = [
+        ('friends', 'Arkadaş'),
+        ('a_requested', 'A istek gönderdi'),
+        ('b_requested', 'B istek gönderdi'),
+        ('both_requested', 'Karşılıklı istek'),
+        ('a_blocked', 'A engelledi'),
+        ('b_blocked', 'B engelledi'),
+        ('both_blocked', 'Karşılıklı engel'),
+    ]
+    
+    # İndeksler: (user_a, user_b) unique kısıtı ve (user_b, user_a)
+    user_a = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False,
+        verbose_name="Kullanıcı A"
+    )
+    user_b = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False,
+        verbose_name="Kullanıcı B"
+    )
+    state = models.CharField(max_length=16, choices=STATE_CHOICES, verbose_name="Durum")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Güncellenme Tarihi")
+    
+    class Meta:
+        verbose_name = "İlişki"
+        verbose_name_plural = "İlişkiler"
+        constraints = [
+            models.UniqueConstraint(fields=['user_a', 'user_b'], name='friends_relationship_pair_uniq'),
+            models.CheckConstraint(condition=models.Q(user_a__lt=models.F('user_b')),
+                                   name='friends_relationship_canonical'),
+        ]
+        indexes = [
+            models.Index(fields=['user_b', 'user_a'], name='friends_relationship_b_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_a_id} <-> {self.user_b_id} ({self.get_state_display()})"
+
+
+# ============== Moderasyon istatistikleri (friends/stats.py doldurur) ==============
+
+class ModerationHourStat(models.Model):
+    """Saat başına gönderilen/onaylanan/reddedilen istek sayısı (FriendEvent'ten)"""
+    hour = models.DateTimeField(unique=True, verbose_name="Saat")
+    requests_sent = models.PositiveIntegerField(default=0, verbose_name="Gönderilen")
+    approved = models.PositiveIntegerField(default=0, verbose_name="Onaylanan")
+    rejected = models.PositiveIntegerField(default=0, verbose_name="Reddedilen")
+    
+    class Meta:
+        verbose_name = "Saatlik Moderasyon İstatistiği"
+        verbose_name_plural = "Saatlik Moderasyon İstatistikleri"
+        ordering = ['-hour']
+    
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H}:00 +{self.approved} -{self.rejected}"
+
+
+class GrowthDayStat(models.Model):
+    """Gün başına yeni kullanıcı ve arkadaşlık sayısı"""
+    day = models.DateField(unique=True, verbose_name="Gün")
+    new_users = models.PositiveIntegerField(default=0, verbose_name="Yeni Kullanıcı")
+    new_friendships = models.PositiveIntegerField(default=0, verbose_name="Yeni Arkadaşlık")
+    
+    class Meta:
+        verbose_name = "Günlük Büyüme İstatistiği"
+        verbose_name_plural = "Günlük Büyüme İstatistikleri"
+        ordering = ['-day']
+    
+    def __str__(self):
+        return f"{self.day} +{self.new_users} kullanıcı, +{self.new_friendships} arkadaşlık"
+
+
+class PendingQueueSnapshot(models.Model):
+    """Bekleyen istek kuyruğunun anlık görüntüsü; yaşlar saniye cinsinden"""
+    taken_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Zaman")
+    depth = models.PositiveIntegerField(verbose_name="Bekleyen")
+    age_p50 = models.PositiveIntegerField(default=0)
+    age_p90 = models.PositiveIntegerField(default=0)
+    age_p99 = models.PositiveIntegerField(default=0)
+    age_max = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = "Bekleyen Kuyruk Görüntüsü"
+        verbose_name_plural = "Bekleyen Kuyruk Görüntüleri"
+        ordering = ['-taken_at']
+    
+    def __str__(self):
+        return f"{self.taken_at:%Y-%m-%d %H:%M} {self.depth} bekleyen"
+
+
+class StatsCursor(models.Model):
+    """İstatistik toplayıcının kaynak tablo başına işlediği son id"""
+    name = models.CharField(max_length=32, primary_key=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "İstatistik İmleci"
+        verbose_name_plural = "İstatistik İmleçleri"
+    
+    def __str__(self):
+        return f"{self.name}: {self.last_id}"
@@ -0,0 +1,221 @@
+"""
+İki kullanıcı arasındaki ilişki: Relationship tablosunun bakımı ve okunması.
+
+İlişki üç tablodan hesaplanır; öncelik sırası engel > arkadaşlık > bekleyen
+istek. Reddedilmiş ve arşivlenmiş istekler ilişki sayılmaz.
+
+Yazma yolları durum değişikliğiyle aynı transaction'da refresh(user_id,
+other_ids) çağırır: çiftler kilitlenir (aynı çifti yenileyen eşzamanlı
+işlemler birbirinin sonucunu görerek sırayla çalışır), kaynak satırlar ve
+mevcut özet tek UNION sorgusuyla okunur, yalnızca değişen çiftler yazılır.
+Okuma tarafında bir kullanıcının istenen kullanıcılarla ilişkisi tek indeks
+sorgusudur:
+
+    relationships.among(me.id, [3, 7, 12])  # {3: 'friends', 7: 'none', 12: 'request_sent'}
+
+Dönen durumlar bakan kullanıcıya göredir (VIEWER_STATES). Karşı tarafın
+engeli, engelleme view'larıyla tutarlı olarak yalnızca 'unavailable' olarak
+gösterilir.
+"""
+import hashlib
+from collections import defaultdict
+
+from django.db import connections, models
+from django.db.models import F, Q, Value
+
+from .models import BlockedUser, Friendship, FriendRequest, Relationship
+
+NONE = 'none'
+# Kaynak tablolardan gelen satırların türleri (UNION'da Relationship.state sütununa denk gelir)
+SOURCE_KINDS = ('block', 'friendship', 'request')
+
+# Saklanan durum -> (user_a için, user_b için)
+VIEWER_STATES = {
+    'friends': ('friends', 'friends'),
+    'a_requested': ('request_sent', 'request_received'),
+    'b_requested': ('request_received', 'request_sent'),
+    'both_requested': ('requests_mutual', 'requests_mutual'),
+    'a_blocked': ('blocking', 'unavailable'),
+    'b_blocked': ('unavailable', 'blocking'),
+    'both_blocked': ('blocking', 'blocking'),
+}
+
+
+def canonical(user_id, other_id):
+    return (user_id, other_id) if user_id < other_id else (other_id, user_id)
+
+
+def viewer_state(state, user_id, pair):
+    return VIEWER_STATES[state][0 if user_id == pair[0] else 1]
+
+
+def pair_q(user_id, other_ids):
+    """Relationship'te user_id'nin other_ids ile çiftleri (iki indeksin her biri bir dalı karşılar)"""
+    return (
+        Q(user_a_id=user_id, user_b_id__in=[other_id for other_id in other_ids if other_id > user_id]) |
+        Q(user_b_id=user_id, user_a_id__in=[other_id for other_id in other_ids if other_id < user_id])
+    )
+
+
+def edge_q(user_id, other_ids, source, target):
+    """Kaynak tablolarda user_id ile other_ids arasındaki satırlar (iki yönde)"""
+    return Q(**{source: user_id, f'{target}__in': other_ids}) | Q(**{f'{source}__in': other_ids, target: user_id})
+
+
+def state_of(edges):
+    """Bir çiftin kaynak satırlarından ((tür, taraf), ...) saklanan durum; taraf 'a' veya 'b'"""
+    sides = defaultdict(set)
+    for kind, side in edges:
+        sides[kind].add(side)
+    for kind, suffix in (('block', 'blocked'), ('friendship', None), ('request', 'requested')):
+        if kind in sides:
+            if suffix is None:
+                return 'friends'
+            return f'both_{suffix}' if len(sides[kind]) == 2 else f'{sides[kind].pop()}_{suffix}'
+    return None
+
+
+def compute(rows):
+    """(kaynak, hedef, tür) satırlarından {çift: durum}"""
+    edges = defaultdict(list)
+    for source_id, target_id, kind in rows:
+        pair = canonical(source_id, target_id)
+        edges[pair].append((kind, 'a' if source_id == pair[0] else 'b'))
+    return {pair: state_of(pair_edges) for pair, pair_edges in edges.items()}
+
+
+def kind_value(name):
+    return Value(name, output_field=models.CharField())
+
+
+def source_querysets(blocks, friendships, requests):
+    """Üç kaynak tablodan (kaynak, hedef, tür) sütunlu, UNION'a uygun sorgular"""
+    return [
+        BlockedUser.objects.filter(blocks).order_by()
+        .annotate(kind=kind_value('block')).values_list('blocker_id', 'blocked_id', 'kind'),
+        Friendship.objects.filter(friendships).order_by()
+        .annotate(kind=kind_value('friendship')).values_list('user1_id', 'user2_id', 'kind'),
+        FriendRequest.objects.filter(requests, status='pending').order_by()
+        .annotate(kind=kind_value('request')).values_list('sender_id', 'receiver_id', 'kind'),
+    ]
+
+
+def diff(states, current):
+    """Hesaplanan {çift: durum} ile mevcut {çift: durum} farkı: (değişenler, silinecek çiftler)"""
+    changed = {pair: state for pair, state in states.items() if state is not None and current.get(pair) != state}
+    stale = [pair for pair in current if states.get(pair) is None]
+    return changed, stale
+
+
+def write(changed):
+    if changed:
+        Relationship.objects.bulk_create(
+            [Relationship(user_a_id=a, user_b_id=b, state=state) for (a, b), state in changed.items()],
+            update_conflicts=True, unique_fields=['user_a', 'user_b'], update_fields=['state', 'updated_at'],
+        )
+
+
+def lock_key(pair):
+    """Çiftin advisory lock anahtarı (işaretli 64 bit)"""
+    digest = hashlib.blake2b(f'friends.relationship:{pair[0]}:{pair[1]}'.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def lock_pairs(user_id, other_ids):
+    """
+    Çiftleri transaction sonuna kadar kilitle; her veritabanında en fazla bir
+    sorgu (view bütçeleri buna göre). Postgres'te advisory lock (anahtar
+    sırasıyla alınır, kilitlenme döngüsü olmaz). Satır kilidi olan diğer
+    veritabanlarında yalnızca mevcut Relationship satırları FOR UPDATE ile
+    kilitlenir; henüz satırı olmayan bir çiftin eşzamanlı ilk yazımı
+    sıralanmaz (sonuç 'backfill_relationships' ile düzelir). SQLite'ta
+    yazarlar zaten veritabanı kilidiyle sıralandığından sorgu atılmaz.
+    """
+    connection = connections[Relationship.objects.db]
+    if connection.vendor == 'postgresql':
+        keys = sorted({lock_key(canonical(user_id, other_id)) for other_id in other_ids})
+        with connection.cursor() as cursor:
+            # unnest dizinin sırasını korur; kilitler sıralı anahtarlarla tek tek alınır
+            cursor.execute('SELECT pg_advisory_xact_lock(k) FROM unnest(%s::bigint[]) AS k', [keys])
+    elif connection.features.has_select_for_update:
+        list(
+            Relationship.objects.select_for_update().filter(pair_q(user_id, other_ids))
+            .order_by('user_a_id', 'user_b_id').values_list('id', flat=True)
+        )
+
+
+def refresh(user_id, other_ids):
+    """user_id ile other_ids arasındaki çiftleri yeniden hesapla; transaction içinde çağrılmalı"""
+    other_ids = {other_id for other_id in other_ids if other_id != user_id}
+    if not other_ids:
+        return
+    lock_pairs(user_id, other_ids)
+    sources = source_querysets(
+        edge_q(user_id, other_ids, 'blocker_id', 'blocked_id'),
+        edge_q(user_id, other_ids, 'user1_id', 'user2_id'),
+        edge_q(user_id, other_ids, 'sender_id', 'receiver_id'),
+    )
+    summary = Relationship.objects.filter(pair_q(user_id, other_ids)).values_list('user_a_id', 'user_b_id', 'state')
+    rows = list(summary.union(*sources, all=True))
+
+    current = {(a, b): state for a, b, state in rows if state not in SOURCE_KINDS}
+    states = compute(row for row in rows if row[2] in SOURCE_KINDS)
+    changed, stale = diff(states, current)
+    write(changed)
+    if stale:
+        Relationship.objects.filter(
+            pair_q(user_id, [b if a == user_id else a for a, b in stale])
+        ).delete()
+
+
+def among(user_id, other_ids):
+    """{other_id: bakan kullanıcıya göre durum}; ilişki yoksa 'none'"""
+    result = dict.fromkeys(other_ids, NONE)
+    for a, b, state in Relationship.objects.filter(pair_q(user_id, result)).values_list(
+        'user_a_id', 'user_b_id', 'state'
+    ):
+        result[b if a == user_id else a] = viewer_state(state, user_id, (a, b))
+    return result
+
+
+def get(user_id, other_id):
+    return among(user_id, [other_id])[other_id]
+
+
+# ============== Yeniden kurma ==============
+
+def range_q(lo, hi, a, b):
+    """Kanonik user_a'sı [lo, hi) aralığında olan satırlar (a, b kaynak sütunları)"""
+    return (
+        Q(**{f'{a}__gte': lo, f'{a}__lt': hi, f'{b}__gt': F(a)}) |
+        Q(**{f'{b}__gte': lo, f'{b}__lt': hi, f'{a}__gt': F(b)})
+    )
+
+
+def backfill_range(lo, hi, dry_run=False):
+    """
+    user_a'sı [lo, hi) aralığındaki tüm çiftleri kaynak tablolardan yeniden
+    kur; (yazılan, silinen) sayısını döndür. Tekrar çalıştırmak güvenlidir.
+    """
+    sources = source_querysets(
+        range_q(lo, hi, 'blocker_id', 'blocked_id'),
+        range_q(lo, hi, 'user1_id', 'user2_id'),
+        range_q(lo, hi, 'sender_id', 'receiver_id'),
+    )
+    existing = Relationship.objects.filter(user_a_id__gte=lo, user_a_id__lt=hi)
+    current = {(a, b): state for a, b, state in existing.values_list('user_a_id', 'user_b_id', 'state')}
+    states = compute(sources[0].union(*sources[1:], all=True))
+    changed, stale = diff(states, current)
+    if dry_run:
+        return len(changed), len(stale)
+
+    write(changed)
+    if stale:
+        stale_users = defaultdict(list)
+        for a, b in stale:
+            stale_users[a].append(b)
+        query = Q()
+        for a, others in stale_users.items():
+            query |= Q(user_a_id=a, user_b_id__in=others)
+        existing.filter(query).delete()
+    return len(changed), len(stale)
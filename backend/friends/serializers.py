@@ -1,12 +1,17 @@
+from django.conf import settings
 from rest_framework import serializers
+from core.fieldsets import SparseFieldsMixin, fieldset_from_context
+from core.rows import datetime_field
 from .models import FriendRequest, BlockedUser, Friendship
-from users.serializers import UserSerializer, UserSearchSerializer
+from users.serializers import (
+    CardRowSerializer, UserCardField, card_field, photo_size_from_context, user_card_data, user_field
+)
 
 
-class FriendRequestSerializer(serializers.ModelSerializer):
+class FriendRequestSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Arkadaşlık isteği serializer"""
-    sender = UserSearchSerializer(read_only=True)
-    receiver = UserSearchSerializer(read_only=True)
+    sender = UserCardField(source='sender_id')
+    receiver = UserCardField(source='receiver_id')
     receiver_id = serializers.IntegerField(write_only=True)
     status_display = serializers.SerializerMethodField()
     
@@ -29,10 +34,20 @@ class FriendRequestCreateSerializer(serializers.ModelSerializer):
         fields = ['receiver_id', 'note']
 
 
-class FriendRequestAdminSerializer(serializers.ModelSerializer):
+class FriendRequestBatchSerializer(serializers.Serializer):
+    """Toplu arkadaşlık isteği gönderme için"""
+    receiver_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=settings.FRIEND_REQUEST_BATCH_MAX,
+    )
+    note = serializers.CharField(required=False, allow_blank=True, default='')
+
+
+class FriendRequestAdminSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Admin panel için arkadaşlık isteği serializer"""
-    sender = UserSearchSerializer(read_only=True)
-    receiver = UserSearchSerializer(read_only=True)
+    sender = UserCardField(source='sender_id')
+    receiver = UserCardField(source='receiver_id')
     
     class Meta:
         model = FriendRequest
@@ -40,9 +55,21 @@ class FriendRequestAdminSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'sender', 'receiver', 'note', 'created_at']
 
 
-class BlockedUserSerializer(serializers.ModelSerializer):
+class FriendRequestAdminRowSerializer(CardRowSerializer):
+    """FriendRequestAdminSerializer'ın .values() satırları için hızlı karşılığı"""
+    fields = [
+        ('id', 'id'),
+        ('sender', card_field('sender_id')),
+        ('receiver', card_field('receiver_id')),
+        ('note', 'note'),
+        ('status', 'status'),
+        ('created_at', datetime_field('created_at')),
+    ]
+
+
+class BlockedUserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Engellenen kullanıcı serializer"""
-    blocked = UserSearchSerializer(read_only=True)
+    blocked = UserCardField(source='blocked_id')
     blocked_id = serializers.IntegerField(write_only=True)
     
     class Meta:
@@ -51,7 +78,16 @@ class BlockedUserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'blocked', 'created_at']
 
 
-class FriendshipSerializer(serializers.ModelSerializer):
+class BlockedUserRowSerializer(CardRowSerializer):
+    """BlockedUserSerializer'ın .values() satırları için hızlı karşılığı"""
+    fields = [
+        ('id', 'id'),
+        ('blocked', card_field('blocked_id')),
+        ('created_at', datetime_field('created_at')),
+    ]
+
+
+class FriendshipSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Arkadaşlık serializer"""
     friend = serializers.SerializerMethodField()
     
@@ -62,8 +98,32 @@ class FriendshipSerializer(serializers.ModelSerializer):
     def get_friend(self, obj):
         request = self.context.get('request')
         if request and request.user:
-            # Karşı tarafın bilgisini döndür
-            if obj.user1 == request.user:
-                return UserSearchSerializer(obj.user2).data
-            return UserSearchSerializer(obj.user1).data
+            # Karşı tarafın kartını döndür (photo_size context'ten gelir)
+            friend_id = obj.user2_id if obj.user1_id == request.user.id else obj.user1_id
+            fieldset = fieldset_from_context(self.context)
+            if not fieldset.expanded('friend'):
+                return friend_id
+            size = photo_size_from_context(self.context, settings.PROFILE_PHOTO_LIST_SIZE)
+            return fieldset.pick('friend', user_card_data(self.context, friend_id, size))
         return None
+
+
+class FriendshipRowSerializer(CardRowSerializer):
+    """FriendshipSerializer'ın .values() satırları için hızlı karşılığı"""
+    
+    def __init__(self, context=None):
+        super().__init__(context)
+        request = self.context.get('request')
+        self.user_id = request.user.id if request and request.user else None
+    
+    @user_field('user1_id', 'user2_id')
+    def get_friend(self, row):
+        if self.user_id is None:
+            return None
+        return row['user2_id'] if row['user1_id'] == self.user_id else row['user1_id']
+    
+    fields = [
+        ('id', 'id'),
+        ('friend', get_friend),
+        ('created_at', datetime_field('created_at')),
+    ]
@@ -0,0 +1,183 @@
+"""
+Moderasyon paneli istatistikleri: özet tablolar ve artımlı güncelleme.
+
+'refresh_friend_stats' komutu periyodik olarak refresh() çağırır:
+- FriendEvent, CustomUser ve Friendship'in yeni satırları StatsCursor'daki
+  son id'den itibaren gruplar halinde okunur ve ModerationHourStat /
+  GrowthDayStat sayaçlarına eklenir (her satır bir kez sayılır).
+- Bekleyen kuyruk (derinlik ve yaş yüzdelikleri) kısmi indeksten
+  (friends_request_pending_idx) okunup PendingQueueSnapshot'a yazılır.
+
+Farklı transaction'larda yazılan satırlar id sırasıyla commit olmayabilir;
+son FRIEND_STATS_LAG saniyede oluşan satırlar bir sonraki tura bırakılır.
+Bilinen sınır: id'si aldıktan sonra commit'i FRIEND_STATS_LAG'den uzun süren
+bir transaction'ın satırı, imleç onu geçtiyse hiç sayılmaz (boşluk yeniden
+taranmaz; geri alınan insert'lerin bıraktığı boşluklardan ayırt edilemez).
+Yazma yolları kısa transaction'lar olduğundan bu sayaçlarda küçük bir eksik
+sayım olarak kalır; uzun süren toplu yazmalar varsa FRIEND_STATS_LAG en uzun
+transaction süresinden büyük tutulmalıdır.
+Olay sıkıştırma/silme (relay_events) çok daha eski olaylara dokunduğu için
+sayaçları etkilemez.
+
+/api/friends/admin/stats/ yalnızca bu tabloları okur (üç indeksli sorgu).
+"""
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+
+from users.models import CustomUser
+
+from .models import (
+    FriendEvent, FriendRequest, Friendship, GrowthDayStat, ModerationHourStat,
+    PendingQueueSnapshot, StatsCursor
+)
+
+# Olay türü -> ModerationHourStat sayacı
+EVENT_COUNTERS = {
+    'request_sent': 'requests_sent',
+    'request_resent': 'requests_sent',
+    'request_approved': 'approved',
+    'request_rejected': 'rejected',
+}
+PERCENTILES = (50, 90, 99)
+
+
+def add_counts(model, key, counts):
+    """{bucket: {sayaç: n}} sayaçlarını ekle; eksik satırlar önce boş oluşturulur"""
+    if not counts:
+        return
+    model.objects.bulk_create([model(**{key: bucket}) for bucket in counts], ignore_conflicts=True)
+    for bucket, fields in counts.items():
+        model.objects.filter(**{key: bucket}).update(**{name: F(name) + n for name, n in fields.items()})
+
+
+def advance(name, queryset, time_field, collect, batch_size):
+    """
+    queryset'in imleçten sonraki satırlarını batch_size'lık gruplar halinde
+    collect(satırlar) ile say; işlenen satır sayısını döndür. İmleç ilerledikten
+    sonra commit olan daha küçük id'li satırlar sayılmaz (bkz. modül açıklaması).
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.FRIEND_STATS_LAG)
+    total = 0
+    while True:
+        with transaction.atomic():
+            # Aynı anda çalışan iki toplayıcı aynı satırları saymasın
+            cursor, _ = StatsCursor.objects.select_for_update().get_or_create(name=name)
+            upper = (
+                queryset.filter(id__gt=cursor.last_id, **{f'{time_field}__lt': cutoff})
+                .order_by('id')[:batch_size].aggregate(upper=Max('id'))['upper']
+            )
+            if upper is None:
+                return total
+            total += collect(queryset.filter(id__gt=cursor.last_id, id__lte=upper).order_by())
+            cursor.last_id = upper
+            cursor.save(update_fields=['last_id', 'updated_at'])
+
+
+def collect_events(rows):
+    counts = {}
+    total = 0
+    for row in rows.filter(type__in=list(EVENT_COUNTERS)).annotate(hour=TruncHour('created_at')).values(
+        'hour', 'type'
+    ).annotate(n=Count('id')):
+        field = EVENT_COUNTERS[row['type']]
+        hour = counts.setdefault(row['hour'], {})
+        hour[field] = hour.get(field, 0) + row['n']
+        total += row['n']
+    add_counts(ModerationHourStat, 'hour', counts)
+    return total
+
+
+def day_counter(field, time_field):
+    def collect(rows):
+        counts = {
+            row['day']: {field: row['n']}
+            for row in rows.annotate(day=TruncDate(time_field)).values('day').annotate(n=Count('id'))
+        }
+        add_counts(GrowthDayStat, 'day', counts)
+        return sum(fields[field] for fields in counts.values())
+    return collect
+
+
+def snapshot_pending():
+    """Bekleyen isteklerin sayısı ve yaş yüzdelikleri (yalnızca kısmi indeks okunur)"""
+    now = timezone.now()
+    pending = FriendRequest.objects.filter(status='pending').order_by()
+    depth = pending.count()
+    ages = {}
+    if depth:
+        # Yaşa göre artan sıra = updated_at'e göre azalan; p. yüzdelik ceil(p/100 * n). satır
+        newest_first = pending.order_by('-updated_at').values_list('updated_at', flat=True)
+        for p in PERCENTILES:
+            ages[f'age_p{p}'] = newest_first[math.ceil(p / 100 * depth) - 1]
+        ages['age_max'] = pending.order_by('updated_at').values_list('updated_at', flat=True)[0]
+    return PendingQueueSnapshot.objects.create(
+        depth=depth, **{name: max(int((now - value).total_seconds()), 0) for name, value in ages.items()}
+    )
+
+
+def refresh(batch_size=None):
+    """Tüm özetleri güncelle; {kaynak: işlenen satır} döndür"""
+    batch_size = batch_size or settings.FRIEND_STATS_BATCH_SIZE
+    processed = {
+        'events': advance('events', FriendEvent.objects.all(), 'created_at', collect_events, batch_size),
+        'users': advance('users', CustomUser.objects.all(), 'date_joined',
+                         day_counter('new_users', 'date_joined'), batch_size),
+        'friendships': advance('friendships', Friendship.objects.all(), 'created_at',
+                               day_counter('new_friendships', 'created_at'), batch_size),
+    }
+    snapshot_pending()
+    PendingQueueSnapshot.objects.filter(
+        taken_at__lt=timezone.now() - timedelta(days=settings.FRIEND_STATS_SNAPSHOT_DAYS)
+    ).delete()
+    return processed
+
+
+# ============== Okuma ==============
+
+def dashboard(hours, days):
+    """Panel verisi; eksik saat/günler sıfırla doldurulur"""
+    now = timezone.localtime()
+    first_hour = now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=hours - 1)
+    first_day = now.date() - timedelta(days=days - 1)
+
+    snapshot = PendingQueueSnapshot.objects.order_by('-taken_at').first()
+    by_hour = {row.hour: row for row in ModerationHourStat.objects.filter(hour__gte=first_hour)}
+    by_day = {row.day: row for row in GrowthDayStat.objects.filter(day__gte=first_day)}
+
+    moderation = []
+    for i in range(hours):
+        hour = first_hour + timedelta(hours=i)
+        row = by_hour.get(hour)
+        moderation.append({
+            'hour': hour.isoformat(),
+            'requests_sent': row.requests_sent if row else 0,
+            'approved': row.approved if row else 0,
+            'rejected': row.rejected if row else 0,
+        })
+    growth = []
+    for i in range(days):
+        day = first_day + timedelta(days=i)
+        row = by_day.get(day)
+        growth.append({
+            'day': day.isoformat(),
+            'new_users': row.new_users if row else 0,
+            'new_friendships': row.new_friendships if row else 0,
+        })
+
+    pending = None
+    if snapshot is not None:
+        pending = {
+            'depth': snapshot.depth,
+            'age_seconds': {
+                **{f'p{p}': getattr(snapshot, f'age_p{p}') for p in PERCENTILES},
+                'max': snapshot.age_max,
+            },
+            'as_of': timezone.localtime(snapshot.taken_at).isoformat(),
+        }
+    return {'pending': pending, 'moderation_per_hour': moderation, 'growth_per_day': growth}
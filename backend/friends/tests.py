@@ -1,3 +1,565 @@
-from django.test import TestCase
+import random
+from contextlib import nullcontext
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from core.querybudget import QueryBudgetTestMixin
+from core.ratelimit import get_backend
+from users.cards import user_cards
+from users.models import CustomUser
+
+from . import events, relationships, stats
+from .models import (
+    BlockedUser, FriendEvent, FriendRequest, Friendship, GrowthDayStat, ModerationHourStat, Relationship,
+)
+from .serializers import (
+    BlockedUserRowSerializer, BlockedUserSerializer, FriendRequestAdminRowSerializer,
+    FriendRequestAdminSerializer, FriendshipRowSerializer, FriendshipSerializer,
+)
+
+N = 5
+
+
+def make_users(prefix, count):
+    CustomUser.objects.bulk_create([
+        CustomUser(username=f'{prefix}{i}', first_name=f'{prefix.title()}{i}', email=f'{prefix}{i}@example.com')
+        for i in range(count)
+    ])
+    return list(CustomUser.objects.filter(username__startswith=prefix).order_by('id'))
+
+
+class FriendsQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """Liste endpoint'lerinin sorgu sayısı satır sayısıyla büyümemeli (N ve 10×N satır)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username='me', email='me@example.com', password='x')
+        cls.admin = CustomUser.objects.create_user(
+            username='moderator', email='moderator@example.com', password='x', is_admin_user=True
+        )
+
+    def setUp(self):
+        cache.clear()
+        backend = get_backend()
+        if hasattr(backend, 'tats'):
+            backend.tats.clear()
+
+    def seed(self, prefix, count):
+        others = make_users(prefix, count)
+        Friendship.objects.bulk_create([Friendship(user1=self.user, user2=other) for other in others])
+        FriendRequest.objects.bulk_create([FriendRequest(sender=other, receiver=self.user) for other in others])
+        BlockedUser.objects.bulk_create([BlockedUser(blocker=self.user, blocked=other) for other in others])
+
+    def assertListWithinBudget(self, user, path, key=None):
+        self.client.force_login(user)
+        for prefix, count in (('small', N), ('large', 10 * N)):
+            self.seed(prefix, count)
+            cache.clear()
+            response = self.assertWithinQueryBudget('get', path)
+            self.assertEqual(response.status_code, 200)
+            rows = response.json()
+            if key:
+                rows = rows[key]
+            self.assertGreaterEqual(len(rows), count)
+
+    def test_budgets_declared(self):
+        self.assertAllViewsHaveBudgets()
+
+    def test_my_friends(self):
+        self.assertListWithinBudget(self.user, '/api/friends/my-friends/')
+
+    def test_pending_requests(self):
+        self.assertListWithinBudget(self.admin, '/api/friends/admin/pending/')
+
+    def test_blocked_users(self):
+        self.assertListWithinBudget(self.user, '/api/friends/blocked/')
+
+
+def make_photo_users(count):
+    """Fotoğraf türlerinin karışımı: yok, harici URL, dosya, dosya + varyantlar"""
+    users = []
+    for i in range(count):
+        user = CustomUser(username=f'photo{i}', first_name=f'Ad{i}' if i % 5 else '',
+                          last_name='Soyad' if i % 5 else '', email=f'photo{i}@example.com')
+        if i % 4 == 1:
+            user.profile_photo = f'https://example.com/p/{i}.jpg'
+        elif i % 4 == 2:
+            user.profile_photo_file = f'profile_photos/photo{i}.jpg'
+        elif i % 4 == 3:
+            user.profile_photo_file = f'profile_photos/photo{i}.jpg'
+            user.profile_photo_variants = {
+                str(size): f'profile_photos/variants/{i}/x_{size}.webp' for size in settings.PROFILE_PHOTO_SIZES
+            }
+        users.append(user)
+    CustomUser.objects.bulk_create(users)
+    return list(CustomUser.objects.filter(username__startswith='photo').order_by('id'))
+
+
+class RowSerializerEquivalenceTests(TestCase):
+    """.values() satır serializer'ları DRF serializer'larıyla byte byte aynı JSON üretmeli"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.me, *others = make_photo_users(12)
+        Friendship.objects.bulk_create([
+            Friendship(user1=cls.me, user2=other) if i % 2 else Friendship(user1=other, user2=cls.me)
+            for i, other in enumerate(others)
+        ])
+        FriendRequest.objects.bulk_create([
+            FriendRequest(sender=other, receiver=cls.me, note=f'not {i}' if i % 3 else '')
+            for i, other in enumerate(others)
+        ])
+        BlockedUser.objects.bulk_create([BlockedUser(blocker=cls.me, blocked=other) for other in others])
+
+    def assertSameOutput(self, queryset, drf_class, row_class, params):
+        request = RequestFactory().get('/', params)
+        request.user = self.me
+        row_serializer = row_class({'request': request})
+        rows = list(queryset.values(*row_serializer.values_fields))
+        context = {'request': request, 'user_cards': user_cards.get_many(row_serializer.card_ids(rows))}
+
+        renderer = JSONRenderer()
+        expected = renderer.render(drf_class(list(queryset), many=True, context=context).data)
+        self.assertEqual(renderer.render(row_class(context).serialize(rows)), expected)
+
+    def check(self, queryset, drf_class, row_class, extra_params=()):
+        for params in ({}, {'photo_size': '256'}, {'photo_size': 'original'}, *extra_params):
+            with self.subTest(params=params):
+                self.assertSameOutput(queryset, drf_class, row_class, params)
+
+    def test_friendships(self):
+        self.check(
+            Friendship.objects.filter(user1=self.me) | Friendship.objects.filter(user2=self.me),
+            FriendshipSerializer, FriendshipRowSerializer,
+            [{'fields': 'id,friend.full_name,friend.profile_photo_url'}, {'fields': 'id,friend'}],
+        )
+
+    def test_pending_requests(self):
+        self.check(
+            FriendRequest.objects.filter(status='pending'),
+            FriendRequestAdminSerializer, FriendRequestAdminRowSerializer,
+            [{'fields': 'id,sender', 'expand': 'sender'}, {'fields': 'id,note,receiver'}],
+        )
+
+    def test_blocked_users(self):
+        self.check(
+            BlockedUser.objects.filter(blocker=self.me),
+            BlockedUserSerializer, BlockedUserRowSerializer,
+        )
+
+
+def reset_rate_limits():
+    backend = get_backend()
+    if hasattr(backend, 'tats'):
+        backend.tats.clear()
+
+
+class RelationshipTests(QueryBudgetTestMixin, TestCase):
+    """Relationship özeti: view ve admin yazma yolları, bakan kullanıcıya göre durumlar, backfill"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice, cls.bob, cls.carol, cls.dave = make_users('rel', 4)
+        cls.admin = CustomUser.objects.create_superuser(
+            username='root', email='root@example.com', password='x', is_admin_user=True
+        )
+
+    def setUp(self):
+        cache.clear()
+        reset_rate_limits()
+
+    def states(self, user, *others):
+        return list(relationships.among(user.id, [other.id for other in others]).values())
+
+    def test_view_transitions(self):
+        alice, bob = self.alice, self.bob
+        self.client.force_login(alice)
+        response = self.assertWithinQueryBudget('post', '/api/friends/send-request/', {'receiver_id': bob.id})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((self.states(alice, bob), self.states(bob, alice)), (['request_sent'], ['request_received']))
+
+        self.client.force_login(self.admin)
+        pk = FriendRequest.objects.get(sender=alice, receiver=bob).id
+        response = self.assertWithinQueryBudget('post', f'/api/friends/admin/approve/{pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((self.states(alice, bob), self.states(bob, alice)), (['friends'], ['friends']))
+
+        self.client.force_login(bob)
+        response = self.assertWithinQueryBudget('post', '/api/friends/block/', {'user_id': alice.id})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((self.states(alice, bob), self.states(bob, alice)), (['unavailable'], ['blocking']))
+        self.assertFalse(Friendship.objects.exists())
+
+        pk = BlockedUser.objects.get(blocker=bob).id
+        response = self.assertWithinQueryBudget('post', f'/api/friends/unblock/{pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((self.states(alice, bob), self.states(bob, alice)), (['none'], ['none']))
+        self.assertFalse(Relationship.objects.exists())
+
+    def test_reject_clears_pending(self):
+        FriendRequest.objects.create(sender=self.alice, receiver=self.bob)
+        with transaction.atomic():
+            relationships.refresh(self.alice.id, [self.bob.id])
+        self.client.force_login(self.admin)
+        pk = FriendRequest.objects.get().id
+        response = self.assertWithinQueryBudget('post', f'/api/friends/admin/reject/{pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.states(self.alice, self.bob), ['none'])
+
+    def test_among_is_viewer_relative(self):
+        alice, bob, carol, dave = self.alice, self.bob, self.carol, self.dave
+        FriendRequest.objects.bulk_create([
+            FriendRequest(sender=alice, receiver=bob), FriendRequest(sender=bob, receiver=alice),
+            FriendRequest(sender=carol, receiver=alice),
+        ])
+        BlockedUser.objects.bulk_create([
+            BlockedUser(blocker=alice, blocked=dave), BlockedUser(blocker=dave, blocked=alice),
+            BlockedUser(blocker=carol, blocked=bob),
+        ])
+        Friendship.objects.create(user1=dave, user2=bob)
+        with transaction.atomic():
+            for user in (alice, bob):
+                relationships.refresh(user.id, [alice.id, bob.id, carol.id, dave.id])
+
+        self.assertEqual(self.states(alice, bob, carol, dave), ['requests_mutual', 'request_received', 'blocking'])
+        self.assertEqual(self.states(bob, carol, dave), ['unavailable', 'friends'])
+        self.assertEqual(self.states(carol, alice, bob), ['request_sent', 'blocking'])
+        self.assertEqual(self.states(dave, alice, carol), ['blocking', 'none'])
+        self.assertEqual(relationships.get(alice.id, self.admin.id), 'none')
+
+    def test_backfill_agrees_with_incremental(self):
+        users = [self.alice, self.bob, self.carol, self.dave, *make_users('bulk', 8)]
+        rng = random.Random(48)
+        pairs = [(a, b) for a in users for b in users if a.id < b.id]
+        for a, b in rng.sample(pairs, 30):
+            a, b = rng.sample([a, b], 2)
+            kind = rng.choice(['request', 'request_rejected', 'friendship', 'block', 'mutual_block'])
+            if kind.startswith('request'):
+                FriendRequest.objects.create(sender=a, receiver=b, status='rejected' if kind.endswith('rejected') else 'pending')
+            elif kind == 'friendship':
+                Friendship.objects.create(user1=a, user2=b)
+            else:
+                BlockedUser.objects.create(blocker=a, blocked=b)
+                if kind == 'mutual_block':
+                    BlockedUser.objects.create(blocker=b, blocked=a)
+            with transaction.atomic():
+                relationships.refresh(a.id, [b.id])
+        incremental = set(Relationship.objects.values_list('user_a_id', 'user_b_id', 'state'))
+        self.assertTrue(incremental)
+
+        Relationship.objects.all().delete()
+        call_command('backfill_relationships', batch=5, sleep=0, stdout=open('/dev/null', 'w'))
+        self.assertEqual(set(Relationship.objects.values_list('user_a_id', 'user_b_id', 'state')), incremental)
+
+    def test_admin_status_change_goes_through_events(self):
+        self.client.force_login(self.admin)
+        friend_request = FriendRequest.objects.create(sender=self.alice, receiver=self.bob)
+        url = f'/admin/friends/friendrequest/{friend_request.id}/change/'
+        form = {'sender': self.alice.id, 'receiver': self.bob.id, 'note': ''}
+
+        for status, event, state in (
+            ('approved', 'request_approved', 'friends'),
+            ('rejected', 'request_rejected', 'friends'),
+        ):
+            with self.subTest(status=status):
+                response = self.client.post(url, {**form, 'status': status})
+                self.assertEqual(response.status_code, 302)
+                self.assertEqual(FriendEvent.objects.latest('id').type, event)
+                self.assertEqual(self.states(self.alice, self.bob), [state])
+        self.assertEqual(Friendship.objects.count(), 1)
+
+        Friendship.objects.all().delete()
+        response = self.client.post(url, {**form, 'status': 'pending'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(FriendEvent.objects.latest('id').type, 'request_resent')
+        self.assertEqual(self.states(self.alice, self.bob), ['request_sent'])
+
+
+class ListSink:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def send(self, payload):
+        if self.fail:
+            raise ConnectionError('sink kapalı')
+        self.batches.append([event['id'] for event in payload])
+
+
+class FriendEventTests(TestCase):
+    """Outbox: view transaction'ında yazım, relay, sıkıştırma ve saklama"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice, cls.bob, cls.carol = make_users('event', 3)
+
+    def setUp(self):
+        cache.clear()
+        reset_rate_limits()
+
+    def make_events(self, count, pair=None):
+        source, target = pair or (self.alice, self.bob)
+        return events.record_many([
+            events.build('request_sent', source.id, target.id) for _ in range(count)
+        ])
+
+    def age(self, queryset, days):
+        queryset.update(relayed_at=timezone.now() - timedelta(days=days))
+
+    def test_view_records_event_in_its_transaction(self):
+        self.client.force_login(self.alice)
+        response = self.client.post(
+            '/api/friends/send-request/', {'receiver_id': self.bob.id}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+        event = FriendEvent.objects.get()
+        self.assertEqual((event.type, event.source_id, event.target_id, event.actor_id),
+                         ('request_sent', self.alice.id, self.bob.id, self.alice.id))
+        self.assertEqual(event.request_id, FriendRequest.objects.get().id)
+
+        # Aynı transaction'da sonradan hata: istek de olay da geri alınır
+        with mock.patch('friends.views.relationships.refresh', side_effect=RuntimeError), \
+                self.assertLogs('friends.views', 'ERROR'):
+            response = self.client.post(
+                '/api/friends/send-request/', {'receiver_id': self.carol.id}, content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(FriendEvent.objects.count(), 1)
+        self.assertFalse(FriendRequest.objects.filter(receiver=self.carol).exists())
+
+    def test_relay_in_id_order_and_marks(self):
+        created = self.make_events(5)
+        sink = ListSink()
+        self.assertEqual(events.relay(3, [sink]), 3)
+        self.assertEqual(events.relay(3, [sink]), 2)
+        self.assertEqual(events.relay(3, [sink]), 0)
+        ids = [event.id for event in created]
+        self.assertEqual(sink.batches, [ids[:3], ids[3:]])
+        self.assertFalse(FriendEvent.objects.filter(relayed_at__isnull=True).exists())
+
+    def test_relay_failure_marks_nothing(self):
+        created = self.make_events(2)
+        good = ListSink()
+        with self.assertRaises(ConnectionError):
+            events.relay(10, [good, ListSink(fail=True)])
+        self.assertEqual(FriendEvent.objects.filter(relayed_at__isnull=True).count(), 2)
+
+        # Sonraki tur aynı grubu tekrar gönderir (en az bir kez)
+        self.assertEqual(events.relay(10, [good]), 2)
+        self.assertEqual(good.batches, [[event.id for event in created]] * 2)
+
+    def test_relay_skips_when_another_relay_holds_the_lock(self):
+        self.make_events(1)
+        sink = ListSink()
+        with mock.patch('friends.events.relay_lock', lambda: nullcontext(False)):
+            self.assertEqual(events.relay(10, [sink]), 0)
+        self.assertEqual(sink.batches, [])
+
+    def test_compact_keeps_latest_per_pair_and_group(self):
+        old = self.make_events(3)
+        events.record('user_blocked', self.alice.id, self.bob.id)
+        other_pair = self.make_events(2, pair=(self.bob, self.alice))
+        self.age(FriendEvent.objects.all(), 40)
+        fresh = self.make_events(1, pair=(self.alice, self.carol))
+        self.make_events(1, pair=(self.alice, self.carol))
+
+        self.assertEqual(events.compact(30, batch_size=2), 3)
+        remaining = set(FriendEvent.objects.values_list('type', 'source_id', 'target_id'))
+        self.assertEqual(remaining, {
+            ('request_sent', self.alice.id, self.bob.id), ('user_blocked', self.alice.id, self.bob.id),
+            ('request_sent', self.bob.id, self.alice.id), ('request_sent', self.alice.id, self.carol.id),
+        })
+        self.assertTrue(FriendEvent.objects.filter(id=old[-1].id).exists())
+        self.assertTrue(FriendEvent.objects.filter(id=other_pair[-1].id).exists())
+        # Aktarılmamış olaylar sıkıştırılmaz
+        self.assertTrue(FriendEvent.objects.filter(id=fresh[0].id).exists())
+
+    def test_purge_deletes_only_old_relayed(self):
+        self.make_events(3)
+        self.age(FriendEvent.objects.all(), 400)
+        self.make_events(1)
+        recent = self.make_events(1)
+        FriendEvent.objects.filter(id=recent[0].id).update(relayed_at=timezone.now())
+        self.assertEqual(events.purge(365, batch_size=2), 3)
+        self.assertEqual(FriendEvent.objects.count(), 2)
+
+
+class ModerationStatsTests(TestCase):
+    """Özet tablolar: artımlı sayım, imleç, bekleyen kuyruk yüzdelikleri ve panel"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = make_users('stat', 11)
+        cls.now = timezone.localtime()
+        cls.hour = cls.now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=2)
+
+    def add_events(self, types, at):
+        created = events.record_many([
+            events.build(type, self.users[0].id, self.users[1].id) for type in types
+        ])
+        FriendEvent.objects.filter(id__in=[event.id for event in created]).update(created_at=at)
+
+    def hour_counts(self):
+        return list(ModerationHourStat.objects.values_list('hour', 'requests_sent', 'approved', 'rejected'))
+
+    def test_rollup_counts_each_row_once(self):
+        at = self.hour + timedelta(minutes=10)
+        self.add_events(['request_sent', 'request_resent', 'request_approved', 'user_blocked'], at)
+        # FRIEND_STATS_LAG içindeki olay bu turda sayılmaz
+        self.add_events(['request_rejected'], timezone.now())
+        CustomUser.objects.filter(id__in=[user.id for user in self.users[:3]]).update(date_joined=at)
+        Friendship.objects.create(user1=self.users[0], user2=self.users[1])
+        Friendship.objects.update(created_at=at)
+
+        processed = stats.refresh(batch_size=2)
+        self.assertEqual(processed, {'events': 3, 'users': 3, 'friendships': 1})
+        self.assertEqual(self.hour_counts(), [(self.hour, 2, 1, 0)])
+        self.assertEqual(list(GrowthDayStat.objects.values_list('day', 'new_users', 'new_friendships')),
+                         [(at.date(), 3, 1)])
+
+        # İkinci tur aynı satırları tekrar saymaz
+        self.assertEqual(stats.refresh(), {'events': 0, 'users': 0, 'friendships': 0})
+        self.assertEqual(self.hour_counts(), [(self.hour, 2, 1, 0)])
+
+        # Gecikme penceresinden çıkan olay bir sonraki turda mevcut satıra eklenir
+        FriendEvent.objects.filter(type='request_rejected').update(created_at=at)
+        self.add_events(['request_sent'], at)
+        self.assertEqual(stats.refresh()['events'], 2)
+        self.assertEqual(self.hour_counts(), [(self.hour, 3, 1, 1)])
+
+    def test_snapshot_pending_percentiles(self):
+        receiver, *senders = self.users
+        FriendRequest.objects.bulk_create([FriendRequest(sender=sender, receiver=receiver) for sender in senders])
+        for minutes, friend_request in enumerate(FriendRequest.objects.order_by('id'), start=1):
+            FriendRequest.objects.filter(id=friend_request.id).update(
+                updated_at=timezone.now() - timedelta(minutes=minutes)
+            )
+        # Bekleyen olmayanlar kuyrukta sayılmaz
+        FriendRequest.objects.filter(sender=senders[-1]).update(status='rejected')
+
+        snapshot = stats.snapshot_pending()
+        self.assertEqual(snapshot.depth, 9)
+        # Yaşa göre sıralı 1..9 dk: p50 -> 5., p90 -> 9. (ceil(8.1)), p99 -> 9.
+        for field, minutes in (('age_p50', 5), ('age_p90', 9), ('age_p99', 9), ('age_max', 9)):
+            with self.subTest(field=field):
+                self.assertAlmostEqual(getattr(snapshot, field), minutes * 60, delta=5)
+
+        FriendRequest.objects.update(status='approved')
+        empty = stats.snapshot_pending()
+        self.assertEqual((empty.depth, empty.age_p50, empty.age_max), (0, 0, 0))
+
+    def test_dashboard_fills_missing_buckets(self):
+        data = stats.dashboard(hours=4, days=3)
+        self.assertIsNone(data['pending'])
+        self.assertEqual(len(data['moderation_per_hour']), 4)
+        self.assertEqual(len(data['growth_per_day']), 3)
+        self.assertTrue(all(row['approved'] == 0 for row in data['moderation_per_hour']))
+
+        ModerationHourStat.objects.create(hour=self.hour, approved=4)
+        GrowthDayStat.objects.create(day=self.now.date(), new_users=7)
+        stats.snapshot_pending()
+        data = stats.dashboard(hours=4, days=3)
+        self.assertEqual([row['approved'] for row in data['moderation_per_hour']], [0, 4, 0, 0])
+        self.assertEqual(data['moderation_per_hour'][1]['hour'], self.hour.isoformat())
+        self.assertEqual([row['new_users'] for row in data['growth_per_day']], [0, 0, 7])
+        self.assertEqual(data['pending']['depth'], 0)
+
+
+class SendFriendRequestsBatchTests(QueryBudgetTestMixin, TestCase):
+    """POST /api/friends/send-requests/: alıcı başına sonuçlar, kilit altında yeniden açma, 409"""
+
+    path = '/api/friends/send-requests/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.me = CustomUser.objects.create_user(username='sender', email='sender@example.com')
+        cls.users = make_users('recv', 8)
+
+    def setUp(self):
+        cache.clear()
+        reset_rate_limits()
+        self.client.force_login(self.me)
+
+    def send(self, receiver_ids):
+        response = self.assertWithinQueryBudget('post', self.path, {'receiver_ids': receiver_ids, 'note': 'selam'})
+        return response, {item['receiver_id']: item['result'] for item in response.json().get('results', [])}
+
+    def request_to(self, user, status):
+        return FriendRequest.objects.create(sender=self.me, receiver=user, status=status)
+
+    def atomic_after(self, change):
+        """View'ın transaction'ı açılmadan hemen önce (okumalardan sonra) change() çalışır"""
+        real_atomic = transaction.atomic
+
+        def atomic(*args, **kwargs):
+            change()
+            return real_atomic(*args, **kwargs)
+        return mock.patch('friends.views.transaction', mock.Mock(atomic=atomic))
+
+    def test_results_per_receiver(self):
+        fresh, pending, rejected, approved, blocked, blocking, friend, _ = self.users
+        self.request_to(pending, 'pending')
+        old = self.request_to(rejected, 'rejected')
+        self.request_to(approved, 'approved')
+        BlockedUser.objects.create(blocker=self.me, blocked=blocked)
+        BlockedUser.objects.create(blocker=blocking, blocked=self.me)
+        Friendship.objects.create(user1=friend, user2=self.me)
+
+        ids = [fresh.id, pending.id, rejected.id, approved.id, blocked.id, blocking.id, friend.id,
+               self.me.id, 999999, fresh.id]
+        response, results = self.send(ids)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(results, {
+            fresh.id: 'sent', pending.id: 'already_pending', rejected.id: 'resent',
+            approved.id: 'already_friends', blocked.id: 'blocked', blocking.id: 'blocked',
+            friend.id: 'already_friends', self.me.id: 'self', 999999: 'not_found',
+        })
+        # Tekrarlanan alıcı bir kez, istek sırasıyla döner
+        self.assertEqual([item['receiver_id'] for item in response.json()['results']], ids[:-1])
+
+        old.refresh_from_db()
+        self.assertEqual((old.status, old.note), ('pending', 'selam'))
+        self.assertEqual(
+            sorted(FriendEvent.objects.values_list('type', 'target_id')),
+            sorted([('request_sent', fresh.id), ('request_resent', rejected.id)]),
+        )
+        self.assertEqual(
+            relationships.among(self.me.id, [fresh.id, rejected.id]),
+            {fresh.id: 'request_sent', rejected.id: 'request_sent'},
+        )
+
+    def test_reopen_decides_on_locked_rows(self):
+        to_pending, to_deleted, to_approved, still_rejected = self.users[:4]
+        rows = {user: self.request_to(user, 'rejected') for user in self.users[:4]}
+
+        def change():
+            FriendRequest.objects.filter(id=rows[to_pending].id).update(status='pending')
+            FriendRequest.objects.filter(id=rows[to_approved].id).update(status='approved')
+            # Arşivlenip ana tablodan silinmiş
+            FriendRequest.objects.filter(id=rows[to_deleted].id).delete()
+
+        with self.atomic_after(change):
+            _, results = self.send([user.id for user in self.users[:4]])
+        self.assertEqual(results, {
+            to_pending.id: 'already_pending', to_deleted.id: 'sent',
+            to_approved.id: 'already_friends', still_rejected.id: 'resent',
+        })
+        self.assertEqual(FriendRequest.objects.get(receiver=to_deleted).status, 'pending')
+        self.assertEqual(FriendRequest.objects.get(receiver=still_rejected).id, rows[still_rejected].id)
+
+    def test_concurrent_insert_maps_to_409(self):
+        fresh = self.users[0]
+        # Okumadan sonra başka bir istek aynı alıcıya gönderildi: unique kısıt
+        with self.atomic_after(lambda: self.request_to(fresh, 'pending')):
+            response, _ = self.send([fresh.id, self.users[1].id])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(FriendRequest.objects.count(), 1)
+        self.assertFalse(FriendEvent.objects.exists())
@@ -1,22 +1,27 @@
 from django.urls import path
 from .views import (
-    SendFriendRequestView, MyFriendsView,
-    PendingRequestsView, ApproveRequestView, RejectRequestView,
-    BlockUserView, UnblockUserView, BlockedUsersListView
+    SendFriendRequestView, SendFriendRequestsBatchView, MyFriendsView,
+    PendingRequestsView, ApproveRequestView, RejectRequestView, ModerationStatsView,
+    BlockUserView, UnblockUserView, BlockedUsersListView, RelationshipsView
 )
 
 urlpatterns = [
     # Arkadaşlık
     path('send-request/', SendFriendRequestView.as_view(), name='send-friend-request'),
+    path('send-requests/', SendFriendRequestsBatchView.as_view(), name='send-friend-requests'),
     path('my-friends/', MyFriendsView.as_view(), name='my-friends'),
     
     # Admin endpoints
     path('admin/pending/', PendingRequestsView.as_view(), name='pending-requests'),
     path('admin/approve/<int:pk>/', ApproveRequestView.as_view(), name='approve-request'),
     path('admin/reject/<int:pk>/', RejectRequestView.as_view(), name='reject-request'),
+    path('admin/stats/', ModerationStatsView.as_view(), name='moderation-stats'),
     
     # Engelleme
     path('block/', BlockUserView.as_view(), name='block-user'),
     path('unblock/<int:pk>/', UnblockUserView.as_view(), name='unblock-user'),
     path('blocked/', BlockedUsersListView.as_view(), name='blocked-users'),
+    
+    # İlişki durumu
+    path('relationships/', RelationshipsView.as_view(), name='relationships'),
 ]
@@ -1,16 +1,26 @@
+import logging
+
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.db.models import Q
+from django.utils import timezone
 
+from . import events, relationships, stats
 from .models import FriendRequest, BlockedUser, Friendship
 from .serializers import (
-    FriendRequestSerializer, FriendRequestCreateSerializer,
-    FriendRequestAdminSerializer, BlockedUserSerializer, FriendshipSerializer
+    FriendRequestSerializer, FriendRequestCreateSerializer, FriendRequestBatchSerializer,
+    FriendRequestAdminSerializer, BlockedUserSerializer, FriendshipSerializer,
+    FriendRequestAdminRowSerializer, BlockedUserRowSerializer, FriendshipRowSerializer
 )
+from users.cards import user_cards
 from users.models import CustomUser
 
+logger = logging.getLogger(__name__)
+
 
 class IsAdminUser(permissions.BasePermission):
     """Admin kullanıcı kontrolü"""
@@ -18,18 +28,50 @@ class IsAdminUser(permissions.BasePermission):
         return request.user.is_authenticated and request.user.is_admin_user
 
 
+class UserCardsMixin:
+    """
+    Liste view'ları için: sayfadaki nesnelerin card_fields'taki kullanıcı
+    id'lerinin kartlarını tek get_many ile doldurup serializer context'ine verir.
+    """
+    card_fields = ()
+    # Tanımlıysa liste .values() satırlarından bu serializer ile üretilir (DRF'siz);
+    # ?fields= seçimi sorgudaki sütunlara kadar iner
+    row_serializer_class = None
+    
+    def list(self, request, *args, **kwargs):
+        if self.row_serializer_class is None or self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+        row_serializer = self.row_serializer_class(self.get_serializer_context())
+        rows = list(self.filter_queryset(self.get_queryset()).values(*row_serializer.values_fields))
+        user_ids = row_serializer.card_ids(rows)
+        if user_ids:
+            row_serializer.context['user_cards'] = user_cards.get_many(user_ids)
+        return Response(row_serializer.serialize(rows))
+    
+    def get_serializer(self, *args, **kwargs):
+        if args and kwargs.get('many'):
+            objects = list(args[0])
+            user_ids = {getattr(obj, field) for obj in objects for field in self.card_fields}
+            kwargs['context'] = dict(self.get_serializer_context(), user_cards=user_cards.get_many(user_ids))
+            args = (objects,) + args[1:]
+        return super().get_serializer(*args, **kwargs)
+
+
 # ============== Arkadaşlık İsteği Views ==============
 
 class SendFriendRequestView(APIView):
     """Arkadaşlık isteği gönderme"""
+    rate_limits = [('ip', '120/m'), ('user', '20/m')]
+    query_budget = 15
     
     def post(self, request):
-        import traceback
         try:
             receiver_id = request.data.get('receiver_id')
             note = request.data.get('note', '')
             
-            print(f"DEBUG: receiver_id={receiver_id}, note={note}, user={request.user}")
+            logger.info('friend_request.send', extra={
+                'sender_id': request.user.id, 'receiver_id': receiver_id,
+            })
             
             # Alıcı kontrol
             try:
@@ -86,20 +128,28 @@ class SendFriendRequestView(APIView):
                     )
                 elif existing.status == 'rejected':
                     # Reddedilmiş isteği yeniden gönder (güncelle)
-                    existing.status = 'pending'
-                    existing.note = note
-                    existing.save()
+                    with transaction.atomic():
+                        existing.status = 'pending'
+                        existing.note = note
+                        existing.save()
+                        events.record('request_resent', request.user.id, receiver.id,
+                                      actor=request.user, request_id=existing.id)
+                        relationships.refresh(request.user.id, [receiver.id])
                     return Response({
                         'message': 'Arkadaşlık isteği tekrar gönderildi. Admin onayına sunuldu.',
                         'request': FriendRequestSerializer(existing).data
                     }, status=status.HTTP_201_CREATED)
             
             # Yeni istek oluştur
-            friend_request = FriendRequest.objects.create(
-                sender=request.user,
-                receiver=receiver,
-                note=note
-            )
+            with transaction.atomic():
+                friend_request = FriendRequest.objects.create(
+                    sender=request.user,
+                    receiver=receiver,
+                    note=note
+                )
+                events.record('request_sent', request.user.id, receiver.id,
+                              actor=request.user, request_id=friend_request.id)
+                relationships.refresh(request.user.id, [receiver.id])
             
             return Response({
                 'message': 'Arkadaşlık isteği gönderildi. Admin onayına sunuldu.',
@@ -107,17 +157,143 @@ class SendFriendRequestView(APIView):
             }, status=status.HTTP_201_CREATED)
         
         except Exception as e:
-            print(f"ERROR in SendFriendRequestView: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception('friend_request.send_failed', extra={
+                'sender_id': request.user.id, 'receiver_id': request.data.get('receiver_id'),
+            })
             return Response(
                 {'error': f'Sunucu hatası: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
 
-class MyFriendsView(generics.ListAPIView):
+class SendFriendRequestsBatchView(APIView):
+    """
+    Toplu arkadaşlık isteği gönderme.
+    Tüm alıcılar küme sorgularıyla kontrol edilir; alıcı sayısından bağımsız
+    olarak sabit sayıda sorgu çalışır. Her alıcı için ayrı sonuç döner.
+    """
+    rate_limits = [('ip', '30/m'), ('user', '5/m')]
+    query_budget = 17
+
+    def post(self, request):
+        serializer = FriendRequestBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        me = request.user
+        note = serializer.validated_data['note']
+        receiver_ids = list(dict.fromkeys(serializer.validated_data['receiver_ids']))
+
+        existing_users = set(
+            CustomUser.objects.filter(id__in=receiver_ids).values_list('id', flat=True)
+        )
+        blocked = set()
+        for blocker_id, blocked_id in BlockedUser.objects.filter(
+            Q(blocker=me, blocked_id__in=receiver_ids) |
+            Q(blocker_id__in=receiver_ids, blocked=me)
+        ).values_list('blocker_id', 'blocked_id'):
+            blocked.add(blocked_id if blocker_id == me.id else blocker_id)
+        friends = set()
+        for user1_id, user2_id in Friendship.objects.filter(
+            Q(user1=me, user2_id__in=receiver_ids) |
+            Q(user1_id__in=receiver_ids, user2=me)
+        ).values_list('user1_id', 'user2_id'):
+            friends.add(user2_id if user1_id == me.id else user1_id)
+        existing_requests = {
+            receiver_id: (pk, request_status)
+            for pk, receiver_id, request_status in FriendRequest.objects.filter(
+                sender=me, receiver_id__in=receiver_ids
+            ).values_list('id', 'receiver_id', 'status')
+        }
+
+        results = {}
+        to_create = []
+        to_reopen = {}
+        for receiver_id in receiver_ids:
+            existing = existing_requests.get(receiver_id)
+            if receiver_id not in existing_users:
+                results[receiver_id] = ('not_found', 'Kullanıcı bulunamadı')
+            elif receiver_id == me.id:
+                results[receiver_id] = ('self', 'Kendinize arkadaşlık isteği gönderemezsiniz')
+            elif receiver_id in blocked:
+                results[receiver_id] = ('blocked', 'Bu kullanıcıyla işlem yapılamaz')
+            elif receiver_id in friends or (existing and existing[1] == 'approved'):
+                results[receiver_id] = ('already_friends', 'Bu kullanıcı zaten arkadaşınız')
+            elif existing and existing[1] == 'pending':
+                results[receiver_id] = ('already_pending', 'Bu kullanıcıya zaten bekleyen bir isteğiniz var')
+            elif existing:
+                to_reopen[receiver_id] = existing[0]
+            else:
+                to_create.append(FriendRequest(sender=me, receiver_id=receiver_id, note=note))
+
+        try:
+            with transaction.atomic():
+                reopened = {}
+                if to_reopen:
+                    # Okumadan sonra durumu değişmiş olabilir; kilitli satırların güncel
+                    # durumuna göre karar verilir, arşivlenmiş (silinmiş) olanlar yeniden oluşturulur
+                    current = dict(
+                        FriendRequest.objects.select_for_update()
+                        .filter(id__in=list(to_reopen.values())).values_list('id', 'status')
+                    )
+                    for receiver_id, pk in to_reopen.items():
+                        request_status = current.get(pk)
+                        if request_status is None:
+                            to_create.append(FriendRequest(sender=me, receiver_id=receiver_id, note=note))
+                        elif request_status == 'rejected':
+                            reopened[receiver_id] = pk
+                        elif request_status == 'pending':
+                            results[receiver_id] = ('already_pending', 'Bu kullanıcıya zaten bekleyen bir isteğiniz var')
+                        else:
+                            results[receiver_id] = ('already_friends', 'Bu kullanıcı zaten arkadaşınız')
+                if reopened:
+                    # auto_now update() ile çalışmaz, elle verilir
+                    FriendRequest.objects.filter(id__in=list(reopened.values())).update(
+                        status='pending', note=note, updated_at=timezone.now()
+                    )
+                created = FriendRequest.objects.bulk_create(to_create)
+                events.record_many(
+                    [events.build('request_sent', me.id, fr.receiver_id, actor=me, request_id=fr.id)
+                     for fr in created] +
+                    [events.build('request_resent', me.id, receiver_id, actor=me, request_id=pk)
+                     for receiver_id, pk in reopened.items()]
+                )
+                relationships.refresh(me.id, [fr.receiver_id for fr in created] + list(reopened))
+        except IntegrityError:
+            # Aynı alıcılara eşzamanlı gönderim; istemci tekrar deneyebilir
+            return Response(
+                {'error': 'İstekler eşzamanlı olarak değişti, lütfen tekrar deneyin'},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        for fr in created:
+            results[fr.receiver_id] = ('sent', fr.id)
+        for receiver_id, pk in reopened.items():
+            results[receiver_id] = ('resent', pk)
+
+        logger.info('friend_request.send_batch', extra={
+            'sender_id': me.id, 'requested': len(receiver_ids),
+            'sent': len(created), 'resent': len(reopened),
+        })
+
+        response = []
+        for receiver_id in receiver_ids:
+            result, detail = results[receiver_id]
+            item = {'receiver_id': receiver_id, 'result': result}
+            item['request_id' if result in ('sent', 'resent') else 'error'] = detail
+            response.append(item)
+        return Response({
+            'message': f'{len(created) + len(reopened)} arkadaşlık isteği gönderildi. Admin onayına sunuldu.',
+            'results': response,
+        }, status=status.HTTP_200_OK)
+
+
+class MyFriendsView(UserCardsMixin, generics.ListAPIView):
     """Onaylanmış arkadaş listesi"""
     serializer_class = FriendshipSerializer
+    row_serializer_class = FriendshipRowSerializer
+    card_fields = ('user1_id', 'user2_id')
+    query_budget = 4
     
     def get_queryset(self):
         return Friendship.objects.filter(
@@ -127,10 +303,13 @@ class MyFriendsView(generics.ListAPIView):
 
 # ============== Admin Views ==============
 
-class PendingRequestsView(generics.ListAPIView):
+class PendingRequestsView(UserCardsMixin, generics.ListAPIView):
     """Admin için bekleyen arkadaşlık istekleri"""
     serializer_class = FriendRequestAdminSerializer
+    row_serializer_class = FriendRequestAdminRowSerializer
     permission_classes = [IsAdminUser]
+    card_fields = ('sender_id', 'receiver_id')
+    query_budget = 4
     
     def get_queryset(self):
         return FriendRequest.objects.filter(status='pending')
@@ -139,25 +318,32 @@ class PendingRequestsView(generics.ListAPIView):
 class ApproveRequestView(APIView):
     """Arkadaşlık isteğini onayla"""
     permission_classes = [IsAdminUser]
+    query_budget = 19
     
     def post(self, request, pk):
-        try:
-            friend_request = FriendRequest.objects.get(id=pk, status='pending')
-        except FriendRequest.DoesNotExist:
-            return Response(
-                {'error': 'İstek bulunamadı'},
-                status=status.HTTP_404_NOT_FOUND
+        with transaction.atomic():
+            # Satır kilitlenir: aynı isteği eşzamanlı onaylayan/reddeden ikinci admin beklerken
+            # durum değişir ve 404 alır
+            try:
+                friend_request = FriendRequest.objects.select_for_update().get(id=pk, status='pending')
+            except FriendRequest.DoesNotExist:
+                return Response(
+                    {'error': 'İstek bulunamadı'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+            # İsteği onayla
+            friend_request.status = 'approved'
+            friend_request.save()
+            
+            # Arkadaşlık oluştur
+            Friendship.objects.get_or_create(
+                user1=friend_request.sender,
+                user2=friend_request.receiver
             )
-        
-        # İsteği onayla
-        friend_request.status = 'approved'
-        friend_request.save()
-        
-        # Arkadaşlık oluştur
-        Friendship.objects.get_or_create(
-            user1=friend_request.sender,
-            user2=friend_request.receiver
-        )
+            events.record('request_approved', friend_request.sender_id, friend_request.receiver_id,
+                          actor=request.user, request_id=friend_request.id)
+            relationships.refresh(friend_request.sender_id, [friend_request.receiver_id])
         
         return Response({
             'message': 'Arkadaşlık isteği onaylandı',
@@ -168,18 +354,23 @@ class ApproveRequestView(APIView):
 class RejectRequestView(APIView):
     """Arkadaşlık isteğini reddet"""
     permission_classes = [IsAdminUser]
+    query_budget = 14
     
     def post(self, request, pk):
-        try:
-            friend_request = FriendRequest.objects.get(id=pk, status='pending')
-        except FriendRequest.DoesNotExist:
-            return Response(
-                {'error': 'İstek bulunamadı'},
-                status=status.HTTP_404_NOT_FOUND
-            )
-        
-        friend_request.status = 'rejected'
-        friend_request.save()
+        with transaction.atomic():
+            try:
+                friend_request = FriendRequest.objects.select_for_update().get(id=pk, status='pending')
+            except FriendRequest.DoesNotExist:
+                return Response(
+                    {'error': 'İstek bulunamadı'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            
+            friend_request.status = 'rejected'
+            friend_request.save()
+            events.record('request_rejected', friend_request.sender_id, friend_request.receiver_id,
+                          actor=request.user, request_id=friend_request.id)
+            relationships.refresh(friend_request.sender_id, [friend_request.receiver_id])
         
         return Response({
             'message': 'Arkadaşlık isteği reddedildi',
@@ -187,10 +378,35 @@ class RejectRequestView(APIView):
         })
 
 
+class ModerationStatsView(APIView):
+    """
+    Admin paneli: bekleyen kuyruk, saatlik onay/red ve günlük büyüme.
+    Sadece 'refresh_friend_stats'in doldurduğu özet tablolar okunur.
+    GET ?hours=48&days=30
+    """
+    permission_classes = [IsAdminUser]
+    query_budget = 5
+    
+    def get(self, request):
+        try:
+            hours = int(request.query_params.get('hours', 48))
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            return Response({'error': 'hours ve days tam sayı olmalı'}, status=status.HTTP_400_BAD_REQUEST)
+        if not (1 <= hours <= settings.FRIEND_STATS_MAX_HOURS and 1 <= days <= settings.FRIEND_STATS_MAX_DAYS):
+            return Response(
+                {'error': f'hours 1-{settings.FRIEND_STATS_MAX_HOURS}, days 1-{settings.FRIEND_STATS_MAX_DAYS} arasında olmalı'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(stats.dashboard(hours, days), headers={'Cache-Control': 'private, max-age=60'})
+
+
 # ============== Engelleme Views ==============
 
 class BlockUserView(APIView):
     """Kullanıcı engelle"""
+    rate_limits = [('ip', '120/m'), ('user', '30/m')]
+    query_budget = 20
     
     def post(self, request):
         blocked_id = request.data.get('user_id')
@@ -209,23 +425,28 @@ class BlockUserView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Arkadaşlık varsa sil
-        Friendship.objects.filter(
-            Q(user1=request.user, user2=blocked_user) |
-            Q(user1=blocked_user, user2=request.user)
-        ).delete()
-        
-        # Arkadaşlık isteklerini de sil (her iki yönde)
-        FriendRequest.objects.filter(
-            Q(sender=request.user, receiver=blocked_user) |
-            Q(sender=blocked_user, receiver=request.user)
-        ).delete()
-        
-        # Engelle
-        blocked, created = BlockedUser.objects.get_or_create(
-            blocker=request.user,
-            blocked=blocked_user
-        )
+        with transaction.atomic():
+            # Arkadaşlık varsa sil
+            friendships_deleted, _ = Friendship.objects.filter(
+                Q(user1=request.user, user2=blocked_user) |
+                Q(user1=blocked_user, user2=request.user)
+            ).delete()
+            
+            # Arkadaşlık isteklerini de sil (her iki yönde)
+            requests_deleted, _ = FriendRequest.objects.filter(
+                Q(sender=request.user, receiver=blocked_user) |
+                Q(sender=blocked_user, receiver=request.user)
+            ).delete()
+            
+            # Engelle
+            blocked, created = BlockedUser.objects.get_or_create(
+                blocker=request.user,
+                blocked=blocked_user
+            )
+            if created or friendships_deleted or requests_deleted:
+                events.record('user_blocked', request.user.id, blocked_user.id, actor=request.user,
+                              friendships_deleted=friendships_deleted, requests_deleted=requests_deleted)
+                relationships.refresh(request.user.id, [blocked_user.id])
         
         if not created:
             return Response(
@@ -241,6 +462,8 @@ class BlockUserView(APIView):
 
 class UnblockUserView(APIView):
     """Engeli kaldır"""
+    rate_limits = [('ip', '120/m'), ('user', '30/m')]
+    query_budget = 12
     
     def post(self, request, pk):
         try:
@@ -251,13 +474,48 @@ class UnblockUserView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        blocked.delete()
+        with transaction.atomic():
+            blocked.delete()
+            events.record('user_unblocked', request.user.id, blocked.blocked_id, actor=request.user)
+            relationships.refresh(request.user.id, [blocked.blocked_id])
         return Response({'message': 'Engel kaldırıldı'})
 
 
-class BlockedUsersListView(generics.ListAPIView):
+class BlockedUsersListView(UserCardsMixin, generics.ListAPIView):
     """Engellenmiş kullanıcılar listesi"""
     serializer_class = BlockedUserSerializer
+    row_serializer_class = BlockedUserRowSerializer
+    card_fields = ('blocked_id',)
+    query_budget = 4
     
     def get_queryset(self):
         return BlockedUser.objects.filter(blocker=self.request.user)
+
+
+# ============== İlişki Views ==============
+
+class RelationshipsView(APIView):
+    """
+    Oturumdaki kullanıcının verilen kullanıcılarla ilişkisi (Relationship
+    tablosundan tek sorgu). GET ?ids=1,2,3 -> {"relationships": {"1": "friends", ...}}
+    Durumlar: none, friends, request_sent, request_received, requests_mutual,
+    blocking, unavailable.
+    """
+    query_budget = 3
+    
+    def get(self, request):
+        try:
+            ids = list(dict.fromkeys(
+                int(part) for value in request.query_params.getlist('ids') for part in value.split(',') if part
+            ))
+        except ValueError:
+            return Response({'error': 'ids tam sayı olmalı'}, status=status.HTTP_400_BAD_REQUEST)
+        if not ids:
+            return Response({'error': 'ids gerekli'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > settings.USER_BULK_MAX:
+            return Response(
+                {'error': f'En fazla {settings.USER_BULK_MAX} kullanıcı istenebilir'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        states = relationships.among(request.user.id, ids)
+        return Response({'relationships': {str(user_id): state for user_id, state in states.items()}})
@@ -0,0 +1,21 @@
+"""
+Gunicorn ayarları.
+backend/ dizininden 'gunicorn core.wsgi' ile çalıştırıldığında otomatik okunur.
+Arka plan görevleri gunicorn içinde çalışmaz; 'python manage.py run_tasks'
+ayrı bir süreç olarak başlatılmalıdır (bkz. settings TASKS_EAGER).
+"""
+
+
+def post_worker_init(worker):
+    """
+    Uygulama worker'a yüklendikten sonra auth sağlayıcılarını (Firebase/Google SDK)
+    ısıt, böylece ilk giriş isteği SDK import maliyetini ödemez.
+    """
+    from users.auth_providers import warm_up
+    warm_up()
+
+
+def worker_exit(server, worker):
+    """Worker kapanırken tampondaki last_seen değerlerini yaz"""
+    from users.activity import tracker
+    tracker.flush()
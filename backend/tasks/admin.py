@@ -0,0 +1,20 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'status', 'attempts', 'run_at', 'created_at', 'finished_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name', 'last_error']
+    readonly_fields = ['created_at', 'finished_at', 'locked_by', 'locked_at', 'last_error']
+    
+    actions = ['requeue_tasks']
+    
+    def requeue_tasks(self, request, queryset):
+        count = queryset.exclude(status='running').update(
+            status='queued', run_at=timezone.now(), attempts=0, last_error=''
+        )
+        self.message_user(request, f"{count} görev tekrar sıraya alındı.")
+    requeue_tasks.short_description = "Seçili görevleri tekrar sıraya al"
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class TasksConfig(AppConfig):
+    name = 'tasks'
+
+    def ready(self):
+        # Her uygulamanın tasks.py modülündeki @task fonksiyonlarını kaydet
+        autodiscover_modules('tasks')
@@ -0,0 +1,58 @@
+"""
+Görev kuyruğu worker'ı.
+
+Örnek:
+    python manage.py run_tasks                 # sürekli çalışır
+    python manage.py run_tasks --once          # kuyruk boşalınca çıkar
+    python manage.py run_tasks --batch 50 --sleep 0.5
+
+SIGTERM/SIGINT alındığında elindeki grubu bitirip çıkar.
+"""
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from tasks.queue import purge_finished, run_batch, worker_id
+
+# Tamamlanmış görev temizliği en fazla bu aralıkla yapılır (saniye)
+PURGE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = 'Veritabanı kuyruğundaki arka plan görevlerini çalıştırır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=settings.TASKS_BATCH_SIZE, help='Tek seferde alınacak görev sayısı')
+        parser.add_argument('--sleep', type=float, default=settings.TASKS_POLL_INTERVAL, help='Kuyruk boşken bekleme (sn)')
+        parser.add_argument('--once', action='store_true', help='Kuyruk boşalınca çık')
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        worker = worker_id()
+        self.stdout.write(f'Worker {worker} başladı (batch={options["batch"]})')
+        processed = 0
+        last_purge = 0.0
+        while not self.stopping:
+            close_old_connections()
+            count = run_batch(options['batch'], worker)
+            processed += count
+
+            if time.monotonic() - last_purge > PURGE_INTERVAL:
+                last_purge = time.monotonic()
+                purge_finished(settings.TASKS_RETENTION_DAYS)
+
+            if count == 0:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f'{processed} görev işlendi'))
+
+    def stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.1 on 2026-10-19 11:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Görev')),
+                ('args', models.JSONField(blank=True, default=list)),
+                ('kwargs', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('queued', 'Sırada'), ('running', 'Çalışıyor'), ('done', 'Tamamlandı'), ('failed', 'Başarısız')], default='queued', max_length=10, verbose_name='Durum')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Çalışma Zamanı')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Deneme')),
+                ('max_attempts', models.PositiveIntegerField(default=5, verbose_name='En Fazla Deneme')),
+                ('last_error', models.TextField(blank=True, verbose_name='Son Hata')),
+                ('locked_by', models.CharField(blank=True, max_length=100)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Bitiş Tarihi')),
+            ],
+            options={
+                'verbose_name': 'Görev',
+                'verbose_name_plural': 'Görevler',
+                'indexes': [models.Index(fields=['status', 'run_at'], name='tasks_status_run_at_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """
+    Veritabanında bekleyen arka plan işi.
+    tasks.queue.enqueue() oluşturur, 'run_tasks' komutu çalıştırır.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Sırada'),
+        ('running', 'Çalışıyor'),
+        ('done', 'Tamamlandı'),
+        ('failed', 'Başarısız'),
+    ]
+    
+    name = models.CharField(max_length=100, verbose_name="Görev")
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='queued',
+        verbose_name="Durum"
+    )
+    run_at = models.DateTimeField(default=timezone.now, verbose_name="Çalışma Zamanı")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Deneme")
+    max_attempts = models.PositiveIntegerField(default=5, verbose_name="En Fazla Deneme")
+    last_error = models.TextField(blank=True, verbose_name="Son Hata")
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma Tarihi")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Bitiş Tarihi")
+    
+    class Meta:
+        verbose_name = "Görev"
+        verbose_name_plural = "Görevler"
+        indexes = [
+            # Worker'ın "sıradaki işler" sorgusu
+            models.Index(fields=['status', 'run_at'], name='tasks_status_run_at_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} #{self.id} ({self.get_status_display()})"
@@ -0,0 +1,209 @@
+"""
+Veritabanı tabanlı görev kuyruğu.
+
+Harici bir broker gerektirmez: enqueue() çağıran işlemle aynı transaction'da
+bir Task satırı yazar (işlem geri alınırsa görev de kaybolur). 'run_tasks'
+worker'ları işleri SELECT ... FOR UPDATE SKIP LOCKED ile gruplar halinde
+alır, böylece birden fazla worker aynı işi almaz.
+
+    # users/tasks.py
+    @task('users.generate_photo_variants')
+    def generate_photo_variants(user_id): ...
+
+    generate_photo_variants.enqueue(user.id)
+"""
+import logging
+import os
+import random
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.metrics import COUNT_BUCKETS, registry
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+class TaskNotRegistered(KeyError):
+    pass
+
+
+def task(name, max_attempts=None):
+    """Fonksiyonu kuyruk görevi olarak kaydet; func.enqueue(*args, **kwargs) ekler"""
+    def decorator(func):
+        if name in _registry and _registry[name] is not func:
+            raise ValueError(f'Görev adı zaten kayıtlı: {name}')
+        _registry[name] = func
+        func.task_name = name
+        func.max_attempts = max_attempts
+        func.enqueue = lambda *args, **kwargs: enqueue(name, args=args, kwargs=kwargs)
+        return func
+    return decorator
+
+
+def get_task(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise TaskNotRegistered(name) from None
+
+
+def enqueue(name, args=(), kwargs=None, delay=0, max_attempts=None):
+    """
+    Görevi sıraya al. Argümanlar JSON'a çevrilebilir olmalı.
+    TASKS_EAGER açıksa (worker çalıştırmadan geliştirme) commit sonrası hemen çalışır.
+    """
+    func = get_task(name)
+    if settings.TASKS_EAGER:
+        transaction.on_commit(lambda: func(*args, **(kwargs or {})))
+        return None
+    return Task.objects.create(
+        name=name,
+        args=list(args),
+        kwargs=kwargs or {},
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or func.max_attempts or settings.TASKS_MAX_ATTEMPTS,
+    )
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim(batch_size, worker):
+    """
+    Çalışma zamanı gelmiş en fazla batch_size görevi kilitle ve 'running' yap.
+    Süresi dolmuş 'running' görevler (ölü worker) tekrar alınabilir; deneme
+    hakkı bitmiş olanlar yeniden çalıştırılmaz, 'failed' olarak kapatılır.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.TASKS_LOCK_TIMEOUT)
+    with transaction.atomic():
+        rows = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(Q(status='queued', run_at__lte=now) | Q(status='running', locked_at__lt=stale))
+            .order_by('run_at')
+            .values_list('id', 'name', 'status', 'attempts', 'max_attempts', 'locked_by')[:batch_size]
+        )
+        exhausted = [row for row in rows if row[2] == 'running' and row[3] >= row[4]]
+        if exhausted:
+            fail_exhausted(exhausted, now)
+        ids = [row[0] for row in rows if row not in exhausted]
+        if not ids:
+            return []
+        Task.objects.filter(id__in=ids).update(
+            status='running', locked_by=worker, locked_at=now, attempts=F('attempts') + 1
+        )
+    return list(Task.objects.filter(id__in=ids).order_by('run_at'))
+
+
+def fail_exhausted(rows, now):
+    """Deneme hakkı bittiği halde worker'ı ölmüş görevleri 'failed' yap"""
+    for task_id, name, _, attempts, _, locked_by in rows:
+        logger.warning('task.lock_expired', extra={
+            'task': name, 'task_id': task_id, 'attempt': attempts, 'worker': locked_by, 'outcome': 'failed',
+        })
+        registry.inc('tasks_total', {'task': name, 'outcome': 'failed'})
+    Task.objects.filter(id__in=[row[0] for row in rows]).update(
+        status='failed', locked_by='', locked_at=None, finished_at=now,
+        last_error=f'Worker {settings.TASKS_LOCK_TIMEOUT} sn içinde bitirmedi, deneme hakkı kalmadı',
+    )
+
+
+def backoff(attempts):
+    """Üstel bekleme (saniye): base * 2^(n-1), üst sınırlı, ±%20 jitter"""
+    delay = min(settings.TASKS_RETRY_MAX_DELAY, settings.TASKS_RETRY_BASE_DELAY * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def execute(task_obj):
+    """Tek görevi çalıştır; 'done', 'retry' veya 'failed' döndür"""
+    labels = {'task': task_obj.name}
+    registry.observe(
+        'task_queue_delay_seconds', labels,
+        max(0.0, (timezone.now() - task_obj.run_at).total_seconds()),
+    )
+    started = time.monotonic()
+    try:
+        get_task(task_obj.name)(*task_obj.args, **task_obj.kwargs)
+    except Exception as e:
+        retryable = task_obj.attempts < task_obj.max_attempts and not isinstance(e, TaskNotRegistered)
+        outcome = 'retry' if retryable else 'failed'
+        task_obj.last_error = traceback.format_exc()[-4000:]
+        logger.warning('task.error', extra={
+            'task': task_obj.name, 'task_id': task_obj.id,
+            'attempt': task_obj.attempts, 'outcome': outcome,
+        })
+    else:
+        outcome = 'done'
+    finally:
+        registry.observe('task_duration_seconds', labels, time.monotonic() - started)
+
+    registry.inc('tasks_total', dict(labels, outcome=outcome))
+    return outcome
+
+
+def finish(task_obj, outcome, worker):
+    """
+    Sonucu yaz. Görev bu arada kilidi dolup başka bir worker'a geçtiyse
+    (locked_by değişti) hiçbir şey yazılmaz; False döner.
+    """
+    now = timezone.now()
+    if outcome == 'done':
+        fields = {'status': 'done', 'finished_at': now}
+    elif outcome == 'retry':
+        fields = {
+            'status': 'queued', 'last_error': task_obj.last_error,
+            'run_at': now + timedelta(seconds=backoff(task_obj.attempts)),
+        }
+    else:
+        fields = {'status': 'failed', 'last_error': task_obj.last_error, 'finished_at': now}
+    updated = Task.objects.filter(id=task_obj.id, status='running', locked_by=worker).update(
+        locked_by='', locked_at=None, **fields
+    )
+    if not updated:
+        logger.warning('task.lock_lost', extra={
+            'task': task_obj.name, 'task_id': task_obj.id, 'worker': worker, 'outcome': outcome,
+        })
+    return bool(updated)
+
+
+def run_batch(batch_size, worker=None):
+    """
+    Bir grup görevi al ve çalıştır; işlenen görev sayısını döndür.
+    Her görevden önce kilidi tazelenir ve sonucu hemen yazılır, böylece
+    TASKS_LOCK_TIMEOUT grubun değil tek görevin süresini sınırlar.
+    """
+    worker = worker or worker_id()
+    tasks = claim(batch_size, worker)
+    if not tasks:
+        return 0
+
+    for task_obj in tasks:
+        if not Task.objects.filter(id=task_obj.id, status='running', locked_by=worker).update(
+            locked_at=timezone.now()
+        ):
+            # Sıra gelmeden kilidi doldu ve başka bir worker aldı
+            continue
+        finish(task_obj, execute(task_obj), worker)
+
+    registry.observe('task_batch_size', {}, len(tasks), COUNT_BUCKETS)
+    registry.maybe_flush()
+    return len(tasks)
+
+
+def purge_finished(days):
+    """Belirtilen günden eski tamamlanmış görevleri sil"""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = Task.objects.filter(status='done', finished_at__lt=cutoff).delete()
+    return deleted
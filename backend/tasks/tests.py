@@ -0,0 +1,124 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Task
+from .queue import claim, enqueue, finish, run_batch, task
+
+calls = []
+
+
+@task('tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task('tests.fail', max_attempts=2)
+def fail():
+    raise RuntimeError('boom')
+
+
+@task('tests.snapshot')
+def snapshot(task_id):
+    """Çalışırken başka bir görevin durumunu kaydet"""
+    calls.append(Task.objects.get(id=task_id).status)
+
+
+@override_settings(TASKS_EAGER=False)
+class TaskQueueTests(TestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def stale(self, **fields):
+        expired = timezone.now() - timedelta(seconds=settings.TASKS_LOCK_TIMEOUT + 1)
+        return Task.objects.create(
+            name='tests.record', args=['stale'], status='running',
+            locked_by='dead:1', locked_at=expired, run_at=expired, **fields
+        )
+
+    def test_claim_takes_due_tasks_once(self):
+        due = enqueue('tests.record', args=['now'])
+        later = enqueue('tests.record', args=['later'], delay=60)
+
+        claimed = claim(10, 'w1')
+        self.assertEqual([t.id for t in claimed], [due.id])
+        self.assertEqual((claimed[0].status, claimed[0].locked_by, claimed[0].attempts), ('running', 'w1', 1))
+        # Kilitli (süresi dolmamış) görev ikinci worker'a verilmez
+        self.assertEqual(claim(10, 'w2'), [])
+        later.refresh_from_db()
+        self.assertEqual(later.status, 'queued')
+
+    def test_run_batch_marks_done(self):
+        enqueue('tests.record', args=[1])
+        enqueue('tests.record', kwargs={'value': 2})
+        self.assertEqual(run_batch(10, 'w1'), 2)
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual(set(Task.objects.values_list('status', 'locked_by')), {('done', '')})
+
+    def test_each_task_finishes_before_the_next_runs(self):
+        first = enqueue('tests.record', args=['first'])
+        Task.objects.filter(id=first.id).update(run_at=timezone.now() - timedelta(seconds=1))
+        enqueue('tests.snapshot', args=[first.id])
+        run_batch(10, 'w1')
+        self.assertEqual(calls, ['first', 'done'])
+
+    def test_retry_with_backoff_then_fail(self):
+        failing = enqueue('tests.fail')
+        before = timezone.now()
+        with self.assertLogs('tasks.queue', 'WARNING'):
+            run_batch(10, 'w1')
+        failing.refresh_from_db()
+        self.assertEqual((failing.status, failing.attempts, failing.locked_by), ('queued', 1, ''))
+        self.assertIn('RuntimeError', failing.last_error)
+        delay = (failing.run_at - before).total_seconds()
+        self.assertTrue(settings.TASKS_RETRY_BASE_DELAY * 0.8 <= delay <= settings.TASKS_RETRY_BASE_DELAY * 1.2 + 1)
+
+        Task.objects.filter(id=failing.id).update(run_at=timezone.now())
+        with self.assertLogs('tasks.queue', 'WARNING'):
+            run_batch(10, 'w1')
+        failing.refresh_from_db()
+        self.assertEqual((failing.status, failing.attempts), ('failed', 2))
+        self.assertIsNotNone(failing.finished_at)
+
+    def test_stale_running_task_is_reclaimed(self):
+        stale = self.stale(attempts=1, max_attempts=3)
+        self.assertEqual([t.id for t in claim(10, 'w2')], [stale.id])
+        stale.refresh_from_db()
+        self.assertEqual((stale.locked_by, stale.attempts), ('w2', 2))
+
+    def test_exhausted_stale_task_fails(self):
+        stale = self.stale(attempts=3, max_attempts=3)
+        with self.assertLogs('tasks.queue', 'WARNING') as logs:
+            self.assertEqual(claim(10, 'w2'), [])
+        self.assertIn('task.lock_expired', logs.output[0])
+        stale.refresh_from_db()
+        self.assertEqual((stale.status, stale.locked_by), ('failed', ''))
+        self.assertIsNotNone(stale.finished_at)
+        self.assertEqual(calls, [])
+
+    def test_stale_worker_does_not_overwrite_new_owner(self):
+        task_obj = enqueue('tests.record', args=['x'])
+        claimed, = claim(10, 'w1')
+        # Kilit doldu, görevi w2 aldı
+        Task.objects.filter(id=task_obj.id).update(locked_by='w2')
+        with self.assertLogs('tasks.queue', 'WARNING'):
+            self.assertFalse(finish(claimed, 'done', 'w1'))
+        task_obj.refresh_from_db()
+        self.assertEqual((task_obj.status, task_obj.locked_by), ('running', 'w2'))
+
+    def test_run_batch_skips_tasks_taken_over(self):
+        enqueue('tests.record', args=['x'])
+
+        def claim_then_lose(batch_size, worker):
+            tasks = claim(batch_size, worker)
+            Task.objects.update(locked_by='w2')
+            return tasks
+
+        with mock.patch('tasks.queue.claim', claim_then_lose):
+            run_batch(10, 'w1')
+        self.assertEqual(calls, [])
+        self.assertEqual(Task.objects.get().locked_by, 'w2')
@@ -0,0 +1,163 @@
+"""
+Son görülme (last_seen) takibi.
+
+Her istekte veritabanına yazmak yerine dokunuşlar süreç içi bir tamponda
+toplanır: aynı kullanıcı ACTIVITY_WINDOW saniye içinde tekrar görülürse
+yok sayılır, tampon her ACTIVITY_FLUSH_INTERVAL saniyede bir tek toplu
+UPDATE ile yazılır. Yazmayı süreç başına bir arka plan thread'i yapar,
+istek thread'i hiç yazmaz. Thread ve çıkışta son flush (atexit / gunicorn
+worker_exit) yalnızca sunucu süreçlerinde açılır: core/wsgi.py ve
+core/asgi.py tracker.enable() çağırır; testler ve yönetim komutları yazmaz.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import Case, DateTimeField, Q, Value, When
+from django.utils import timezone
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject, empty
+
+from .models import CustomUser
+
+logger = logging.getLogger(__name__)
+
+
+def write_last_seen(pending):
+    """{user_id: datetime} sözlüğünü tek UPDATE ile yaz (geriye gitmez)"""
+    if not pending:
+        return
+    if connection.vendor == 'postgresql':
+        qn = connection.ops.quote_name
+        table = qn(CustomUser._meta.db_table)
+        column = qn(CustomUser._meta.get_field('last_seen').column)
+        pk = qn(CustomUser._meta.pk.column)
+        values = ', '.join(['(%s, %s::timestamptz)'] * len(pending))
+        params = [item for pair in pending.items() for item in pair]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {table} AS u SET {column} = v.seen '
+                f'FROM (VALUES {values}) AS v(id, seen) '
+                f'WHERE u.{pk} = v.id AND (u.{column} IS NULL OR u.{column} < v.seen)',
+                params,
+            )
+        return
+    # Diğer veritabanları: CASE WHEN ile yine tek UPDATE; daha yeni değer korunur
+    newer = Q(last_seen__isnull=True)
+    for user_id, seen in pending.items():
+        newer |= Q(id=user_id, last_seen__lt=seen)
+    CustomUser.objects.filter(newer, id__in=list(pending)).update(last_seen=Case(
+        *[When(id=user_id, then=Value(seen)) for user_id, seen in pending.items()],
+        output_field=DateTimeField(),
+    ))
+
+
+class ActivityTracker:
+    """Thread-safe, yazmaları birleştiren last_seen tamponu"""
+
+    def __init__(self, window=None, flush_interval=None):
+        self.window = window if window is not None else settings.ACTIVITY_WINDOW
+        self.flush_interval = flush_interval if flush_interval is not None else settings.ACTIVITY_FLUSH_INTERVAL
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._recent = {}
+        self._last_flush = time.monotonic()
+        self._flusher_pid = None
+        self.enabled = False
+
+    def enable(self):
+        """Sunucu sürecinde arka plan yazmayı aç; thread ilk dokunuşta (fork sonrası) başlar"""
+        if not self.enabled:
+            self.enabled = True
+            atexit.register(self.flush)
+
+    def touch(self, user_id):
+        now = time.monotonic()
+        last = self._recent.get(user_id)
+        if last is not None and now - last < self.window:
+            return
+        with self._lock:
+            self._recent[user_id] = now
+            self._pending[user_id] = timezone.now()
+        if self.enabled:
+            self.start_flusher()
+
+    def start_flusher(self):
+        """Süreç başına bir kez periyodik flush thread'ini başlat (fork sonrası yeniden)"""
+        pid = os.getpid()
+        if self._flusher_pid == pid:
+            return
+        with self._lock:
+            if self._flusher_pid == pid:
+                return
+            self._flusher_pid = pid
+        threading.Thread(target=self._run_flusher, name='activity-flush', daemon=True).start()
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(max(self.flush_interval - (time.monotonic() - self._last_flush), 1))
+            if time.monotonic() - self._last_flush < self.flush_interval:
+                continue
+            # Thread'in kendi bağlantısı; CONN_MAX_AGE'i aşan/bozuk bağlantı yenilenir
+            close_old_connections()
+            self.flush()
+
+    def pending_for(self, user_id):
+        return self._pending.get(user_id)
+
+    def last_seen(self, user):
+        """Tampon + veritabanındaki değerin en yenisi"""
+        pending = self.pending_for(user.id)
+        if pending is None:
+            return user.last_seen
+        if user.last_seen is None:
+            return pending
+        return max(pending, user.last_seen)
+
+    def flush(self):
+        now = time.monotonic()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = now
+            self._recent = {
+                user_id: seen for user_id, seen in self._recent.items()
+                if now - seen < self.window
+            }
+        if not pending:
+            return 0
+        try:
+            write_last_seen(pending)
+        except Exception:
+            logger.exception('activity.flush_failed', extra={'users': len(pending)})
+            # Kaybetme, bir sonraki flush'ta tekrar dene
+            with self._lock:
+                for user_id, seen in pending.items():
+                    if user_id not in self._pending or self._pending[user_id] < seen:
+                        self._pending[user_id] = seen
+            return 0
+        return len(pending)
+
+
+tracker = ActivityTracker()
+
+
+class ActivityMiddleware(MiddlewareMixin):
+    """
+    Kimliği doğrulanmış istekleri tracker'a bildirir.
+    request.user henüz yüklenmemişse (ör. anonim statik istek) dokunmaz,
+    böylece ek oturum sorgusu yapılmaz.
+    """
+
+    def process_response(self, request, response):
+        user = request.__dict__.get('user')
+        if isinstance(user, SimpleLazyObject):
+            user = user._wrapped
+            if user is empty:
+                return response
+        if user is not None and user.is_authenticated:
+            tracker.touch(user.id)
+        return response
@@ -1,13 +1,19 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+
+from core.admin import LargeTableAdmin
+
+from . import search
 from .models import CustomUser
 
 
 @admin.register(CustomUser)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(LargeTableAdmin, UserAdmin):
     list_display = ['username', 'email', 'first_name', 'last_name', 'is_admin_user', 'is_active']
     list_filter = ['is_admin_user', 'is_active', 'is_staff']
+    # Arama kutusunu ve diğer admin'lerin autocomplete'ini açar; arama get_search_results'ta
     search_fields = ['username', 'email', 'first_name', 'last_name']
+    search_help_text = 'Ad, kullanıcı adı, e-posta (tam) veya id'
     
     fieldsets = UserAdmin.fieldsets + (
         ('Özel Alanlar', {'fields': ('google_id', 'profile_photo', 'is_admin_user')}),
@@ -16,3 +22,9 @@ class CustomUserAdmin(UserAdmin):
     add_fieldsets = UserAdmin.add_fieldsets + (
         ('Özel Alanlar', {'fields': ('google_id', 'profile_photo', 'is_admin_user')}),
     )
+    
+    def get_search_results(self, request, queryset, search_term):
+        # users.search: trigram indeksli ad alanları, email_hash ile tam e-posta
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(search.admin_q(search_term)), False
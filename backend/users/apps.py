@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class UsersConfig(AppConfig):
     name = 'users'
+
+    def ready(self):
+        # Kart önbelleğini geçersiz kılan sinyaller
+        from . import cards  # noqa: F401
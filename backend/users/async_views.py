@@ -0,0 +1,216 @@
+"""
+Kimlik doğrulama endpoint'lerinin async sürümleri.
+
+ASGI altında (core/asgi.py, ASYNC_AUTH_VIEWS=1) users/urls.py bu view'ları
+kullanır. Firebase/Google token doğrulaması (ağ + kripto) sınırlı bir
+thread havuzunda çalışır; böylece bir worker aynı anda yüzlerce girişi
+bekletebilir. Kullanıcı kaydı users/services.py'deki servislerle yapılır.
+
+Yanıtlar senkron view'larla (users/views.py) birebir aynıdır: gövde DRF'in
+parser'larıyla okunur, yanıt DRF'in içerik anlaşmasıyla (JSON veya
+Accept: application/msgpack ile MessagePack) aynı renderer'larla yazılır.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import alogin
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, NotAcceptable
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .auth_providers import get_provider
+from .serializers import FirebaseAuthSerializer, GoogleAuthSerializer, UserSerializer
+from .services import (
+    aupsert_firebase_login_user, aupsert_firebase_registered_user, aupsert_google_user
+)
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.AUTH_VERIFY_THREADS,
+    thread_name_prefix='auth-verify',
+)
+
+
+async def run_blocking(func, *args):
+    """Bloklayan SDK çağrısını sınırlı havuzda çalıştır"""
+    return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+
+
+_negotiator = api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS()
+_parsers = [parser() for parser in api_settings.DEFAULT_PARSER_CLASSES]
+# Gezilebilir API bir APIView gerektirir; tarayıcılar JSON alır
+_renderers = [
+    renderer() for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+    if not issubclass(renderer, BrowsableAPIRenderer)
+]
+
+
+def api_request(request, parsers=None):
+    """Gövdeyi DRF parser'larıyla okumak ve içerik anlaşması için sarmalayıcı (kimlik doğrulamasız)"""
+    return Request(request, parsers=parsers or _parsers, authenticators=(), negotiator=_negotiator)
+
+
+def render(request, data, status=200):
+    """APIView.finalize_response gibi: seçilen renderer ile yanıt, 'Vary: Accept'"""
+    try:
+        renderer, media_type = _negotiator.select_renderer(request, _renderers)
+    except NotAcceptable as exc:
+        renderer, media_type = _renderers[0], _renderers[0].media_type
+        data, status = {'detail': exc.detail}, exc.status_code
+    content = renderer.render(data, media_type, {'request': request})
+    if renderer.charset:
+        media_type = f'{media_type}; charset={renderer.charset}'
+    response = HttpResponse(content, status=status, content_type=media_type)
+    patch_vary_headers(response, ('Accept',))
+    return response
+
+
+def request_data(request):
+    """(veri, None) veya ayrıştırma hatasında (None, hata yanıtı)"""
+    try:
+        return request.data, None
+    except APIException as exc:
+        return None, render(request, {'detail': exc.detail}, exc.status_code)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncFirebaseLoginView(View):
+    """Firebase token ile giriş (async)"""
+    http_method_names = ['post']
+    rate_limits = [('ip', '10/m')]
+    query_budget = 14
+
+    async def post(self, request):
+        request = api_request(request)
+        firebase = get_provider('firebase')
+        if not await run_blocking(firebase.load):
+            return render(request, {
+                'error': 'Firebase authentication disabled',
+                'detail': 'Firebase Admin SDK not configured'
+            }, status=503)
+
+        data, error = request_data(request)
+        if error is not None:
+            return error
+        serializer = FirebaseAuthSerializer(data=data)
+        if not serializer.is_valid():
+            return render(request, serializer.errors, status=400)
+
+        try:
+            decoded_token = await run_blocking(firebase.verify, serializer.validated_data['firebase_token'])
+
+            user, created = await aupsert_firebase_login_user(decoded_token)
+
+            await alogin(request._request, user)
+
+            return render(request, {
+                'user': UserSerializer(user).data,
+                'is_new_user': created,
+                'message': 'Giriş başarılı'
+            }, status=200)
+
+        except Exception as e:
+            return render(request, {
+                'error': 'Geçersiz token',
+                'detail': str(e)
+            }, status=401)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncFirebaseRegisterView(View):
+    """Firebase ile kayıt (async), profil fotoğrafı yükleme destekler"""
+    http_method_names = ['post']
+    rate_limits = [('ip', '5/m')]
+    query_budget = 14
+
+    async def post(self, request):
+        request = api_request(request, [MultiPartParser(), FormParser()])
+        firebase = get_provider('firebase')
+        if not await run_blocking(firebase.load):
+            return render(request, {
+                'error': 'Firebase authentication disabled',
+                'detail': 'Firebase Admin SDK not configured'
+            }, status=503)
+
+        data, error = request_data(request)
+        if error is not None:
+            return error
+        firebase_token = data.get('firebase_token')
+        first_name = data.get('first_name', '')
+        last_name = data.get('last_name', '')
+        profile_photo = request.FILES.get('profile_photo')
+
+        if not firebase_token:
+            return render(request, {
+                'error': 'firebase_token gerekli'
+            }, status=400)
+
+        try:
+            decoded_token = await run_blocking(firebase.verify, firebase_token)
+
+            user, created = await aupsert_firebase_registered_user(
+                decoded_token, first_name, last_name, profile_photo
+            )
+
+            await alogin(request._request, user)
+
+            return render(request, {
+                'user': UserSerializer(user).data,
+                'is_new_user': created,
+                'message': 'Kayıt başarılı'
+            }, status=201 if created else 200)
+
+        except Exception as e:
+            return render(request, {
+                'error': 'Kayıt hatası',
+                'detail': str(e)
+            }, status=400)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncGoogleLoginView(View):
+    """Google ile giriş (async, geriye uyumluluk)"""
+    http_method_names = ['post']
+    rate_limits = [('ip', '10/m')]
+    query_budget = 14
+
+    async def post(self, request):
+        request = api_request(request)
+        google = get_provider('google')
+        if not await run_blocking(google.load):
+            return render(request, {
+                'error': 'Google authentication disabled',
+            }, status=503)
+
+        data, error = request_data(request)
+        if error is not None:
+            return error
+        serializer = GoogleAuthSerializer(data=data)
+        if not serializer.is_valid():
+            return render(request, serializer.errors, status=400)
+
+        try:
+            idinfo = await run_blocking(google.verify, serializer.validated_data['id_token'])
+
+            user, created = await aupsert_google_user(idinfo)
+
+            await alogin(request._request, user)
+
+            return render(request, {
+                'user': UserSerializer(user).data,
+                'is_new_user': created,
+                'message': 'Giriş başarılı'
+            }, status=200)
+
+        except ValueError as e:
+            return render(request, {
+                'error': 'Geçersiz token',
+                'detail': str(e)
+            }, status=401)
@@ -0,0 +1,120 @@
+"""
+Kimlik doğrulama sağlayıcıları (Firebase, Google) için tembel kayıt.
+
+firebase_admin ve google-auth modülleri grpc/protobuf/google-cloud
+yığınını da beraberinde yükler. Bu yüzden modül importunda değil,
+ilk kullanımda (veya gunicorn'un post_worker_init kancasında,
+bkz. gunicorn.conf.py) yüklenirler.
+"""
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class AuthProvider:
+    """İlk kullanımda bir kez yüklenen token doğrulayıcı"""
+    name = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._enabled = False
+
+    def load(self):
+        if self._loaded:
+            return self._enabled
+        with self._lock:
+            if not self._loaded:
+                self._enabled = self._load()
+                self._loaded = True
+        return self._enabled
+
+    @property
+    def available(self):
+        return self.load()
+
+    def _load(self):
+        """SDK'yı import et ve hazırla; kullanılabilirse True döndür"""
+        raise NotImplementedError
+
+    def verify(self, token):
+        """Token'ı doğrula, claim sözlüğünü döndür"""
+        raise NotImplementedError
+
+
+class FirebaseProvider(AuthProvider):
+    """
+    Firebase ID token doğrulama.
+    FIREBASE_TOKEN_VERIFIER tanımlıysa (ör. yük testi için sahte issuer) o kullanılır.
+    """
+    name = 'firebase'
+
+    def _load(self):
+        if settings.FIREBASE_TOKEN_VERIFIER:
+            self._verify = import_string(settings.FIREBASE_TOKEN_VERIFIER)
+            return True
+
+        try:
+            import firebase_admin
+            from firebase_admin import auth as firebase_auth, credentials
+        except ImportError:
+            logger.warning('firebase-admin not installed. Firebase authentication disabled.')
+            return False
+
+        # Firebase Admin SDK'yı başlat (henüz başlatılmamışsa)
+        if not firebase_admin._apps:
+            cred_path = os.path.join(settings.BASE_DIR, 'serviceAccountKey.json')
+            if not os.path.exists(cred_path):
+                logger.warning('serviceAccountKey.json not found. Firebase authentication disabled.')
+                return False
+            firebase_admin.initialize_app(credentials.Certificate(cred_path))
+
+        self._verify = firebase_auth.verify_id_token
+        return True
+
+    def verify(self, token):
+        return self._verify(token)
+
+
+class GoogleProvider(AuthProvider):
+    """Google ID token doğrulama (geriye uyumluluk)"""
+    name = 'google'
+
+    def _load(self):
+        try:
+            from google.oauth2 import id_token
+            from google.auth.transport import requests
+        except ImportError:
+            return False
+        self._id_token = id_token
+        self._request = requests.Request()
+        return True
+
+    def verify(self, token):
+        return self._id_token.verify_oauth2_token(token, self._request, settings.GOOGLE_CLIENT_ID)
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def get_provider(name):
+    """AUTH_PROVIDERS ayarındaki sağlayıcının tekil örneği (henüz yüklenmemiş olabilir)"""
+    provider = _registry.get(name)
+    if provider is None:
+        with _registry_lock:
+            provider = _registry.get(name)
+            if provider is None:
+                provider = _registry[name] = import_string(settings.AUTH_PROVIDERS[name])()
+    return provider
+
+
+def warm_up():
+    """Tüm sağlayıcıları şimdi yükle (worker fork'undan sonra çağrılır)"""
+    for name in settings.AUTH_PROVIDERS:
+        get_provider(name).load()
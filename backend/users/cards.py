@@ -0,0 +1,195 @@
+"""
+Kullanıcı kartı önbelleği.
+
+Kart, iç içe serializer'ların (arkadaşlar, istekler, engellenenler) her
+kullanıcı için ürettiği küçük sözlüktür: id, ad, soyad, tam ad ve fotoğraf.
+Kartlar boyuttan bağımsız saklanır, profile_photo_url okuma anında istenen
+boyuta göre üretilir.
+
+- Worker başına sınırlı, TTL'li bir LRU (USER_CARD_CACHE_SIZE/TTL)
+- İsteğe bağlı paylaşımlı katman: USER_CARD_SHARED_CACHE bir Django cache adı
+- CustomUser kaydedilince/silinince kart geçersiz kılınır (sinyaller). Diğer
+  worker'ların yerel kopyası en fazla USER_CARD_CACHE_TTL kadar eski kalır.
+
+get_many(ids) eksik kartları tek sorguda doldurur; liste view'ları bunu
+serializer context'ine 'user_cards' olarak verir.
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.storage import FileSystemStorage
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.metrics import registry
+
+from .images import pick_variant
+from .models import CustomUser
+
+# Kart yapısı değişirse artırılır; paylaşımlı önbellekteki eski kartlar okunmaz
+CARD_VERSION = 1
+
+CARD_FIELDS = ['id', 'username', 'first_name', 'last_name', 'profile_photo',
+               'profile_photo_file', 'profile_photo_variants']
+
+
+def build_card(user):
+    return {
+        'id': user.id,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'full_name': f"{user.first_name} {user.last_name}".strip() or user.username,
+        'profile_photo': user.profile_photo,
+        'photo_file': user.profile_photo_file.name or '',
+        'photo_variants': user.profile_photo_variants,
+    }
+
+
+@lru_cache(maxsize=10000)
+def _filesystem_url(base_url, name):
+    # FileSystemStorage.url saf bir fonksiyondur; urljoin maliyeti liste başına tekrarlanmasın
+    return FileSystemStorage(base_url=base_url).url(name)
+
+
+def storage_url(name):
+    storage = CustomUser._meta.get_field('profile_photo_file').storage
+    # default_storage bir LazyObject'tir; __class__ gerçek sınıfı verir
+    if isinstance(storage, FileSystemStorage) and storage.__class__.url is FileSystemStorage.url:
+        return _filesystem_url(storage.base_url, name)
+    return storage.url(name)
+
+
+def photo_url(photo_file, variants, profile_photo, size=None):
+    """CustomUser.get_profile_photo_url'in alan değerleriyle çalışan karşılığı"""
+    if photo_file:
+        return storage_url(pick_variant(variants, size) if size and variants else photo_file)
+    return profile_photo
+
+
+def render_card(card, size=None):
+    """UserSearchSerializer ile aynı çıktı"""
+    return {
+        'id': card['id'],
+        'first_name': card['first_name'],
+        'last_name': card['last_name'],
+        'full_name': card['full_name'],
+        'profile_photo': card['profile_photo'],
+        'profile_photo_url': photo_url(card['photo_file'], card['photo_variants'], card['profile_photo'], size),
+    }
+
+
+class LocalCardCache:
+    """Thread-safe, TTL'li LRU"""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get_many(self, ids):
+        now = time.monotonic()
+        found = {}
+        with self.lock:
+            for user_id in ids:
+                entry = self.entries.get(user_id)
+                if entry is None:
+                    continue
+                if entry[0] < now:
+                    del self.entries[user_id]
+                    continue
+                self.entries.move_to_end(user_id)
+                found[user_id] = entry[1]
+        return found
+
+    def set_many(self, cards):
+        expires = time.monotonic() + self.ttl
+        with self.lock:
+            for user_id, card in cards.items():
+                self.entries[user_id] = (expires, card)
+                self.entries.move_to_end(user_id)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class UserCardCache:
+    def __init__(self):
+        self.local = LocalCardCache(settings.USER_CARD_CACHE_SIZE, settings.USER_CARD_CACHE_TTL)
+
+    @property
+    def shared(self):
+        alias = settings.USER_CARD_SHARED_CACHE
+        return caches[alias] if alias else None
+
+    @staticmethod
+    def key(user_id):
+        return f'usercard:{CARD_VERSION}:{user_id}'
+
+    def get_many(self, ids):
+        """{id: kart}; var olmayan kullanıcılar sonuçta yer almaz"""
+        ids = set(ids)
+        cards = self.local.get_many(ids)
+        missing = ids - cards.keys()
+        local_hits = len(cards)
+
+        shared = self.shared
+        if missing and shared is not None:
+            shared_cards = {
+                card['id']: card
+                for card in shared.get_many([self.key(user_id) for user_id in missing]).values()
+            }
+            self.local.set_many(shared_cards)
+            cards.update(shared_cards)
+            missing -= shared_cards.keys()
+        shared_hits = len(cards) - local_hits
+
+        if missing:
+            loaded = {
+                user.id: build_card(user)
+                for user in CustomUser.objects.filter(id__in=missing).only(*CARD_FIELDS)
+            }
+            self.local.set_many(loaded)
+            if shared is not None and loaded:
+                shared.set_many(
+                    {self.key(user_id): card for user_id, card in loaded.items()},
+                    settings.USER_CARD_SHARED_TTL,
+                )
+            cards.update(loaded)
+
+        registry.inc('user_card_cache_total', {'result': 'local_hit'}, local_hits)
+        registry.inc('user_card_cache_total', {'result': 'shared_hit'}, shared_hits)
+        registry.inc('user_card_cache_total', {'result': 'miss'}, len(missing))
+        return cards
+
+    def get(self, user_id):
+        return self.get_many([user_id]).get(user_id)
+
+    def invalidate(self, user_id):
+        self.local.delete(user_id)
+        shared = self.shared
+        if shared is not None:
+            shared.delete(self.key(user_id))
+
+
+user_cards = UserCardCache()
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_user_card(sender, instance, update_fields=None, **kwargs):
+    # Sadece karta girmeyen alanlar (ör. last_login) kaydedildiyse dokunma
+    if update_fields and not set(update_fields) & set(CARD_FIELDS):
+        return
+    user_cards.invalidate(instance.id)
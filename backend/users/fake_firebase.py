@@ -0,0 +1,95 @@
+"""
+Yük testi için sahte Firebase token üreticisi.
+
+Firebase ID token'larıyla aynı yapıdaki JWT'leri yerel bir RSA anahtarıyla
+imzalar ve doğrular. Sadece FAKE_FIREBASE_AUTH açıkken kullanılır,
+Render ortamında hiçbir zaman devreye girmez.
+"""
+import os
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.conf import settings
+
+ALGORITHM = 'RS256'
+KEY_ID = 'fake-firebase-key'
+
+
+def _issuer(project_id):
+    return f'https://securetoken.google.com/{project_id}'
+
+
+@lru_cache(maxsize=1)
+def load_private_key():
+    """
+    Yerel imza anahtarını yükle, yoksa oluştur.
+    Sunucu ve yük testi sürücüsü aynı dosyayı paylaşır.
+    """
+    path = Path(settings.FAKE_FIREBASE_KEY_PATH)
+    if not path.exists():
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        pem = key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        )
+        # Birden fazla worker aynı anda oluşturabilir, atomik yaz
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        tmp_path.write_bytes(pem)
+        os.replace(tmp_path, path)
+    return serialization.load_pem_private_key(path.read_bytes(), password=None)
+
+
+class FakeFirebaseIssuer:
+    """Firebase ID token biçiminde test token'ları üretir"""
+
+    def __init__(self, project_id=None, private_key=None):
+        self.project_id = project_id or settings.FAKE_FIREBASE_PROJECT_ID
+        self.private_key = private_key or load_private_key()
+
+    def issue(self, uid, email='', name='', picture='', email_verified=True, lifetime=3600):
+        now = int(time.time())
+        claims = {
+            'iss': _issuer(self.project_id),
+            'aud': self.project_id,
+            'auth_time': now,
+            'user_id': uid,
+            'sub': uid,
+            'iat': now,
+            'exp': now + lifetime,
+            'email': email,
+            'email_verified': email_verified,
+            'firebase': {
+                'identities': {'email': [email]} if email else {},
+                'sign_in_provider': 'password',
+            },
+        }
+        if name:
+            claims['name'] = name
+        if picture:
+            claims['picture'] = picture
+        return jwt.encode(claims, self.private_key, algorithm=ALGORITHM, headers={'kid': KEY_ID})
+
+
+def verify_id_token(token):
+    """
+    firebase_admin.auth.verify_id_token ile aynı sözleşme:
+    doğrulanmış claim'leri 'uid' anahtarı eklenmiş olarak döndürür.
+    """
+    project_id = settings.FAKE_FIREBASE_PROJECT_ID
+    try:
+        claims = jwt.decode(
+            token,
+            load_private_key().public_key(),
+            algorithms=[ALGORITHM],
+            audience=project_id,
+            issuer=_issuer(project_id),
+        )
+    except jwt.PyJWTError as e:
+        raise ValueError(f'Geçersiz test token: {e}') from e
+    claims['uid'] = claims['sub']
+    return claims
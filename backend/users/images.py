@@ -0,0 +1,140 @@
+"""
+Profil fotoğrafı boyut varyantları.
+
+Yüklenen orijinal tam boyutunda ama yüklemede yeniden kodlanarak saklanır
+(strip_metadata): orijinalin URL'si de herkese açık döndüğü için EXIF yönü
+uygulanır, konum (GPS) dahil tüm metadata atılır. Görev kuyruğundaki
+users.generate_photo_variants görevi PROFILE_PHOTO_SIZES boyutlarında
+(ör. 64/256/1024) WebP (desteklenmiyorsa JPEG) kopyalar üretir; bunlar da
+metadata'sızdır. Üretilen dosya yolları CustomUser.profile_photo_variants'a
+{"64": "...", ...} olarak yazılır.
+"""
+import hashlib
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+from .models import CustomUser
+
+logger = logging.getLogger(__name__)
+
+
+def output_format():
+    """('WEBP', 'webp') veya Pillow WebP desteği yoksa ('JPEG', 'jpg')"""
+    if settings.PROFILE_PHOTO_FORMAT == 'WEBP' and features.check('webp'):
+        return 'WEBP', 'webp'
+    return 'JPEG', 'jpg'
+
+
+# Orijinalin biçimi korunur; diğerleri (GIF, BMP, TIFF...) JPEG'e çevrilir
+ORIGINAL_FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp'}
+
+
+def strip_metadata(upload):
+    """
+    Yüklenen dosyayı EXIF yönü uygulanmış, metadata'sız (EXIF, GPS, ICC) olarak
+    yeniden kodla. Boyut değişmez; aynı adla (uzantı biçime göre) ContentFile döner.
+    """
+    upload.seek(0)
+    image = Image.open(upload)
+    fmt = image.format if image.format in ORIGINAL_FORMATS else 'JPEG'
+    image = ImageOps.exif_transpose(image)
+    image.load()
+    # Kaydederken info'dan okunan exif/icc/xmp yazılmasın; saydamlık korunur
+    image.info = {key: value for key, value in image.info.items() if key == 'transparency'}
+    if fmt == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    buffer = io.BytesIO()
+    if fmt == 'JPEG':
+        image.save(buffer, fmt, quality=95, optimize=True)
+    elif fmt == 'WEBP':
+        image.save(buffer, fmt, quality=95, method=4)
+    else:
+        image.save(buffer, fmt, optimize=True)
+    stem = os.path.splitext(os.path.basename(upload.name or 'photo'))[0]
+    return ContentFile(buffer.getvalue(), name=f'{stem}.{ORIGINAL_FORMATS[fmt]}')
+
+
+def render_variant(image, size, fmt):
+    """Uzun kenarı en fazla `size` olan, metadata'sız kopyayı bayt olarak döndür"""
+    variant = image.copy()
+    # Büyütme yapılmaz, küçük orijinaller kendi boyutunda kalır
+    variant.thumbnail((size, size), Image.Resampling.LANCZOS)
+    if fmt == 'JPEG' and variant.mode != 'RGB':
+        variant = variant.convert('RGB')
+    buffer = io.BytesIO()
+    # exif/icc_profile verilmediği için metadata yazılmaz
+    if fmt == 'WEBP':
+        variant.save(buffer, fmt, quality=settings.PROFILE_PHOTO_QUALITY, method=4)
+    else:
+        variant.save(buffer, fmt, quality=settings.PROFILE_PHOTO_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def generate_variants(user_id):
+    """
+    Kullanıcının yüklediği fotoğraf için varyantları üret ve kaydet.
+    Bu sırada fotoğraf değiştiyse sonuç yazılmaz (yeni yükleme kendi işini yapar).
+    """
+    user = CustomUser.objects.filter(id=user_id).only(
+        'id', 'profile_photo_file', 'profile_photo_variants'
+    ).first()
+    if user is None or not user.profile_photo_file:
+        return None
+
+    source_name = user.profile_photo_file.name
+    storage = user.profile_photo_file.storage
+    with storage.open(source_name, 'rb') as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+        image.load()
+
+    fmt, extension = output_format()
+    digest = hashlib.sha1(source_name.encode()).hexdigest()[:12]
+    variants = {}
+    for size in settings.PROFILE_PHOTO_SIZES:
+        name = f'profile_photos/variants/{user_id}/{digest}_{size}.{extension}'
+        # Depolama kaydedilen adı değiştirebilir (HashedMediaStorage içerik özeti ekler);
+        # önceki çalıştırmanın dosyaları aşağıda eski varyantlarla birlikte silinir
+        variants[str(size)] = storage.save(name, ContentFile(render_variant(image, size, fmt)))
+
+    updated = CustomUser.objects.filter(
+        id=user_id, profile_photo_file=source_name
+    ).update(profile_photo_variants=variants)
+    if not updated:
+        for name in variants.values():
+            storage.delete(name)
+        return None
+
+    # update() sinyal göndermez, kart önbelleğini elle geçersiz kıl
+    from .cards import user_cards
+    user_cards.invalidate(user_id)
+
+    for old_name in set(user.profile_photo_variants.values()) - set(variants.values()):
+        storage.delete(old_name)
+    logger.info('profile_photo.variants', extra={'user_id': user_id, 'sizes': list(variants)})
+    return variants
+
+
+def discard_variants(user):
+    """Fotoğraf değişmeden önce eski varyant dosyalarını sil"""
+    storage = user.profile_photo_file.storage
+    for name in user.profile_photo_variants.values():
+        storage.delete(name)
+    user.profile_photo_variants = {}
+
+
+def pick_variant(variants, size):
+    """`size`'ı karşılayan en küçük varyantı, yoksa en büyüğünü seç"""
+    if not variants:
+        return None
+    sizes = sorted(int(key) for key in variants)
+    chosen = next((s for s in sizes if s >= size), sizes[-1])
+    return variants[str(chosen)]
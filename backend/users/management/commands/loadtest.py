@@ -0,0 +1,209 @@
+"""
+Eşzamanlı yük testi sürücüsü.
+
+Sunucu FAKE_FIREBASE_AUTH=1 ile çalışırken sahte Firebase token'larıyla
+sanal kullanıcılar oluşturur ve gerçekçi bir istek karışımını
+(giriş, arama, istek gönderme, arkadaş listesi) tekrar oynatır.
+
+Örnek:
+    FAKE_FIREBASE_AUTH=1 python manage.py runserver
+    python manage.py loadtest --base-url http://127.0.0.1:8000 --users 50 --duration 60
+"""
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.fake_firebase import FakeFirebaseIssuer
+
+FIRST_NAMES = ['Ali', 'Ayşe', 'Mehmet', 'Fatma', 'Ahmet', 'Zeynep', 'Can', 'Elif', 'Emre', 'Deniz']
+LAST_NAMES = ['Yılmaz', 'Demir', 'Kaya', 'Çelik', 'Öztürk', 'Şahin', 'Aydın', 'Arslan', 'Doğan', 'Koç']
+
+DEFAULT_MIX = 'login=1,search=4,send=2,friends=5'
+
+
+def percentile(sorted_values, pct):
+    """Sıralı listeden en yakın sıra yöntemiyle yüzdelik"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class Stats:
+    """Endpoint başına gecikme ve durum kodu kayıtları (thread-safe)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint, seconds, status_code=None):
+        with self.lock:
+            self.latencies[endpoint].append(seconds)
+            if status_code is None or status_code >= 500:
+                self.errors[endpoint] += 1
+            self.statuses[endpoint][status_code or 'exc'] += 1
+
+    def summary(self, elapsed):
+        rows = {}
+        for endpoint, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            rows[endpoint] = {
+                'requests': len(values),
+                'errors': self.errors[endpoint],
+                'rps': round(len(values) / elapsed, 2),
+                'p50_ms': round(percentile(values, 50) * 1000, 2),
+                'p90_ms': round(percentile(values, 90) * 1000, 2),
+                'p99_ms': round(percentile(values, 99) * 1000, 2),
+                'max_ms': round(values[-1] * 1000, 2),
+                'statuses': {str(k): v for k, v in self.statuses[endpoint].items()},
+            }
+        return rows
+
+
+class VirtualUser:
+    """Kendi oturumu (cookie) olan tek bir sanal kullanıcı"""
+
+    def __init__(self, index, base_url, issuer, stats, timeout):
+        import requests
+
+        self.index = index
+        self.base_url = base_url.rstrip('/')
+        self.issuer = issuer
+        self.stats = stats
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.user_id = None
+        self.first_name = FIRST_NAMES[index % len(FIRST_NAMES)]
+        self.last_name = LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)]
+
+    def call(self, endpoint, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, self.base_url + path, timeout=self.timeout, **kwargs
+            )
+        except Exception:
+            self.stats.record(endpoint, time.perf_counter() - start)
+            return None
+        self.stats.record(endpoint, time.perf_counter() - start, response.status_code)
+        return response
+
+    def login(self):
+        uid = f'loadtest-{self.index:06d}'
+        token = self.issuer.issue(
+            uid,
+            email=f'{uid}@loadtest.local',
+            name=f'{self.first_name} {self.last_name}',
+        )
+        response = self.call('login', 'POST', '/api/users/firebase-login/',
+                             json={'firebase_token': token})
+        if response is not None and response.status_code == 200:
+            self.user_id = response.json()['user']['id']
+        return self.user_id
+
+    def search(self, known_ids):
+        query = random.choice(FIRST_NAMES + LAST_NAMES)[:random.randint(2, 4)]
+        self.call('search', 'GET', '/api/users/search/', params={'q': query})
+
+    def send(self, known_ids):
+        candidates = [uid for uid in known_ids if uid != self.user_id]
+        if not candidates:
+            return
+        self.call('send', 'POST', '/api/friends/send-request/',
+                  json={'receiver_id': random.choice(candidates), 'note': 'yük testi'})
+
+    def friends(self, known_ids):
+        self.call('friends', 'GET', '/api/friends/my-friends/')
+
+
+class Command(BaseCommand):
+    help = 'Sahte Firebase token\'larıyla eşzamanlı yük testi çalıştırır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--users', type=int, default=20, help='Eşzamanlı sanal kullanıcı sayısı')
+        parser.add_argument('--duration', type=float, default=30, help='Test süresi (saniye)')
+        parser.add_argument('--mix', default=DEFAULT_MIX, help='İşlem ağırlıkları, ör. login=1,search=4')
+        parser.add_argument('--think-time', type=float, default=0.0, help='İstekler arası bekleme (saniye)')
+        parser.add_argument('--timeout', type=float, default=10.0)
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--json', dest='json_path', default=None, help='Sonuçları JSON dosyasına yaz')
+
+    def parse_mix(self, mix):
+        weights = {}
+        for part in mix.split(','):
+            name, _, weight = part.partition('=')
+            if name not in ('login', 'search', 'send', 'friends'):
+                raise CommandError(f'Bilinmeyen işlem: {name}')
+            weights[name] = float(weight or 1)
+        return list(weights), list(weights.values())
+
+    def handle(self, *args, **options):
+        if options['seed'] is not None:
+            random.seed(options['seed'])
+        actions, weights = self.parse_mix(options['mix'])
+
+        issuer = FakeFirebaseIssuer()
+        stats = Stats()
+        vusers = [
+            VirtualUser(i, options['base_url'], issuer, stats, options['timeout'])
+            for i in range(options['users'])
+        ]
+
+        # Isınma: herkes bir kez giriş yapar, id'ler arama/istek için paylaşılır
+        self.stdout.write(f"{len(vusers)} sanal kullanıcı giriş yapıyor...")
+        known_ids = [uid for uid in (vu.login() for vu in vusers) if uid]
+        if not known_ids:
+            raise CommandError('Hiçbir sanal kullanıcı giriş yapamadı. Sunucu FAKE_FIREBASE_AUTH=1 ile mi çalışıyor?')
+        stats = Stats()
+        for vu in vusers:
+            vu.stats = stats
+
+        deadline = time.monotonic() + options['duration']
+        think_time = options['think_time']
+
+        def run(vu):
+            while time.monotonic() < deadline:
+                action = random.choices(actions, weights)[0]
+                if action == 'login':
+                    vu.login()
+                else:
+                    getattr(vu, action)(known_ids)
+                if think_time:
+                    time.sleep(think_time)
+
+        started = time.monotonic()
+        threads = [threading.Thread(target=run, args=(vu,), daemon=True) for vu in vusers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        summary = stats.summary(elapsed)
+        total = sum(row['requests'] for row in summary.values())
+        self.stdout.write(f"\n{total} istek, {elapsed:.1f} sn, {total / elapsed:.1f} istek/sn\n")
+        header = f"{'endpoint':<10}{'istek':>8}{'hata':>6}{'rps':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for endpoint, row in summary.items():
+            self.stdout.write(
+                f"{endpoint:<10}{row['requests']:>8}{row['errors']:>6}{row['rps']:>9}"
+                f"{row['p50_ms']:>9}{row['p90_ms']:>9}{row['p99_ms']:>9}{row['max_ms']:>9}"
+            )
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump({
+                    'users': options['users'],
+                    'duration': elapsed,
+                    'total_requests': total,
+                    'endpoints': summary,
+                }, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Sonuçlar yazıldı: {options['json_path']}"))
@@ -0,0 +1,36 @@
+"""
+Profil fotoğrafı varyantlarını toplu üret.
+
+Pipeline'dan önce yüklenmiş fotoğraflar veya ayarlar (boyut/format)
+değiştiğinde kullanılır. Varsayılan olarak sadece varyantı olmayanlar işlenir.
+
+Örnek:
+    python manage.py photo_variants
+    python manage.py photo_variants --all
+"""
+from django.core.management.base import BaseCommand
+
+from users.images import generate_variants
+from users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = 'Yüklenmiş profil fotoğrafları için küçük boyut varyantlarını üretir'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Varyantı olanları da yeniden üret')
+
+    def handle(self, *args, **options):
+        users = CustomUser.objects.exclude(profile_photo_file='').exclude(profile_photo_file__isnull=True)
+        if not options['all']:
+            users = users.filter(profile_photo_variants={})
+
+        done = failed = 0
+        for user_id in users.values_list('id', flat=True).iterator():
+            try:
+                if generate_variants(user_id):
+                    done += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f'Kullanıcı {user_id}: {e}')
+        self.stdout.write(self.style.SUCCESS(f'{done} kullanıcı işlendi, {failed} hata'))
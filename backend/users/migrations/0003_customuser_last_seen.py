@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_customuser_firebase_uid_customuser_is_email_verified_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='last_seen',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Son Görülme'),
+        ),
+    ]
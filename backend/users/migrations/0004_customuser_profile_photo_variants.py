@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_customuser_last_seen'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='profile_photo_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:55
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def fill_email_hash(apps, schema_editor):
+    """Mevcut kullanıcıların email_hash alanını gruplar halinde doldur"""
+    CustomUser = apps.get_model('users', 'CustomUser')
+    batch = []
+    for user in CustomUser.objects.exclude(email='').exclude(email__isnull=True).only('id', 'email').iterator(chunk_size=2000):
+        user.email_hash = hashlib.sha256(user.email.strip().lower().encode()).hexdigest()
+        batch.append(user)
+        if len(batch) == 2000:
+            CustomUser.objects.bulk_update(batch, ['email_hash'])
+            batch = []
+    CustomUser.objects.bulk_update(batch, ['email_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_customuser_profile_photo_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='email_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.RunPython(fill_email_hash, migrations.RunPython.noop),
+    ]
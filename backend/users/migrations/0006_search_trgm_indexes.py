@@ -0,0 +1,45 @@
+# Generated by Django 6.0.1 on 2026-10-19 20:30
+
+from django.db import migrations
+
+# users.search'in icontains aramaları için (Django'nun ürettiği UPPER(sütun::text) ifadesiyle aynı)
+COLUMNS = ('first_name', 'last_name', 'username')
+
+
+def index_name(column):
+    return f'users_customuser_{column}_trgm'
+
+
+def create_trgm_indexes(apps, schema_editor):
+    """Sadece Postgres: pg_trgm ve tabloyu kilitlemeden (CONCURRENTLY) GIN indeksleri"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    CustomUser = apps.get_model('users', 'CustomUser')
+    qn = schema_editor.quote_name
+    table = qn(CustomUser._meta.db_table)
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {qn(index_name(column))} '
+            f'ON {table} USING gin ((UPPER({qn(column)}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trgm_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in COLUMNS:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {schema_editor.quote_name(index_name(column))}')
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY transaction içinde çalışmaz
+    atomic = False
+
+    dependencies = [
+        ('users', '0005_customuser_email_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trgm_indexes, drop_trgm_indexes),
+    ]
@@ -1,7 +1,15 @@
+import hashlib
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
 
+def hash_email(email):
+    """Rehber eşleştirmesi için e-posta özeti: sha256(küçük harf, boşluksuz e-posta)"""
+    email = (email or '').strip().lower()
+    return hashlib.sha256(email.encode()).hexdigest() if email else ''
+
+
 class CustomUser(AbstractUser):
     """
     Custom User model with Firebase authentication support.
@@ -16,6 +24,8 @@ class CustomUser(AbstractUser):
     # Profil fotoğrafı
     profile_photo = models.URLField(max_length=500, blank=True, null=True)
     profile_photo_file = models.ImageField(upload_to='profile_photos/', blank=True, null=True)
+    # Küçültülmüş kopyalar {"64": "profile_photos/variants/...", ...} (users/images.py üretir)
+    profile_photo_variants = models.JSONField(default=dict, blank=True)
     
     # E-posta doğrulama durumu
     is_email_verified = models.BooleanField(default=False, verbose_name="E-posta Doğrulandı")
@@ -23,6 +33,12 @@ class CustomUser(AbstractUser):
     # Admin/Normal kullanıcı ayrımı (Django'nun is_staff'ından bağımsız)
     is_admin_user = models.BooleanField(default=False, verbose_name="Admin Kullanıcı")
     
+    # hash_email(email) - rehber eşleştirmesi (save() günceller)
+    email_hash = models.CharField(max_length=64, blank=True, db_index=True, editable=False)
+    
+    # Son görülme - users/activity.py toplu olarak günceller
+    last_seen = models.DateTimeField(null=True, blank=True, verbose_name="Son Görülme")
+    
     class Meta:
         verbose_name = "Kullanıcı"
         verbose_name_plural = "Kullanıcılar"
@@ -30,8 +46,23 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return f"{self.first_name} {self.last_name}" if self.first_name else self.username
     
-    def get_profile_photo_url(self):
-        """Profil fotoğrafı URL'sini döndür (dosya veya URL)"""
+    def save(self, *args, **kwargs):
+        # Not: bulk_create/update() save() çağırmaz, email değiştiren toplu işlemler
+        # email_hash'i de yazmalı
+        self.email_hash = hash_email(self.email)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'email' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'email_hash'}
+        super().save(*args, **kwargs)
+    
+    def get_profile_photo_url(self, size=None):
+        """
+        Profil fotoğrafı URL'sini döndür (dosya veya URL).
+        size verilirse ve varyantlar hazırsa en uygun küçük kopya döner.
+        """
         if self.profile_photo_file:
+            if size and self.profile_photo_variants:
+                from .images import pick_variant
+                return self.profile_photo_file.storage.url(pick_variant(self.profile_photo_variants, size))
             return self.profile_photo_file.url
         return self.profile_photo
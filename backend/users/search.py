@@ -0,0 +1,41 @@
+"""
+Kullanıcı araması (API ve admin ortak).
+
+Ad, soyad ve kullanıcı adında icontains yapılır. Postgres'te bu sütunlarda
+UPPER(sütun::text) üzerinde gin_trgm_ops indeksleri vardır (users 0006);
+Django'nun icontains için ürettiği UPPER(...) LIKE UPPER(...) ifadesi bu
+indekslerle eşleşir, 3+ karakterli aramalar tablo taramasına düşmez.
+"""
+from django.db.models import Q
+
+from .models import hash_email
+
+NAME_FIELDS = ('first_name', 'last_name', 'username')
+
+
+def name_q(term, prefix=''):
+    q = Q()
+    for field in NAME_FIELDS:
+        q |= Q(**{f'{prefix}{field}__icontains': term})
+    return q
+
+
+def search(queryset, term):
+    """API araması: terim ad, soyad veya kullanıcı adında geçen kullanıcılar"""
+    return queryset.filter(name_q(term))
+
+
+def admin_q(term, prefix=''):
+    """
+    Admin araması: boşlukla ayrılan her kelime eşleşmeli. Sayı ise id, '@'
+    içeriyorsa e-posta (email_hash ile tam eşleşme, indeksli), değilse ad alanları.
+    """
+    q = Q()
+    for word in term.split():
+        if word.isdigit():
+            q &= Q(**{f'{prefix}id': int(word)}) | name_q(word, prefix)
+        elif '@' in word:
+            q &= Q(**{f'{prefix}email_hash': hash_email(word)})
+        else:
+            q &= name_q(word, prefix)
+    return q
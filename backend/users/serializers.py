@@ -1,30 +1,81 @@
+from django.conf import settings
 from rest_framework import serializers
+from core.fieldsets import SparseFieldsMixin, fieldset_from_context
+from core.rows import RowSerializer, uses
+from .activity import tracker
+from .cards import photo_url, render_card, user_cards
 from .models import CustomUser
 
 
-class UserSerializer(serializers.ModelSerializer):
+def photo_size_from_context(context, default=None):
+    """
+    profile_photo_url boyutu: context['photo_size'] > ?photo_size= > default.
+    'original' tam boy dosyayı döndürür.
+    """
+    size = context.get('photo_size')
+    request = context.get('request')
+    if size is None and request is not None:
+        size = getattr(request, 'query_params', request.GET).get('photo_size')
+    if size == 'original':
+        return None
+    try:
+        return int(size) if size else default
+    except (TypeError, ValueError):
+        return default
+
+
+def user_card_data(context, user_id, size):
+    """
+    Kullanıcı kartı (UserSearchSerializer çıktısıyla aynı). Liste view'ları
+    context['user_cards']'ı önceden doldurur, yoksa önbellekten tek tek alınır.
+    """
+    cards = context.get('user_cards')
+    card = cards.get(user_id) if cards is not None else None
+    if card is None:
+        card = user_cards.get(user_id)
+    return render_card(card, size) if card is not None else None
+
+
+class PhotoSizeMixin:
+    """profile_photo_url boyutunu context'ten seçer; iç içe serializer'lar kökün context'ini paylaşır"""
+    default_photo_size = None
+    
+    def get_photo_size(self):
+        if not hasattr(self, '_photo_size'):
+            self._photo_size = photo_size_from_context(self.context, self.default_photo_size)
+        return self._photo_size
+    
+    def get_profile_photo_url(self, obj):
+        return obj.get_profile_photo_url(self.get_photo_size())
+
+
+class UserSerializer(SparseFieldsMixin, PhotoSizeMixin, serializers.ModelSerializer):
     """Kullanıcı serializer - liste ve detay için"""
     full_name = serializers.SerializerMethodField()
     profile_photo_url = serializers.SerializerMethodField()
+    last_seen = serializers.SerializerMethodField()
     
     class Meta:
         model = CustomUser
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 
                   'full_name', 'profile_photo', 'profile_photo_url', 
-                  'is_admin_user', 'is_email_verified']
+                  'is_admin_user', 'is_email_verified', 'last_seen']
         read_only_fields = ['id', 'is_admin_user']
     
     def get_full_name(self, obj):
         return f"{obj.first_name} {obj.last_name}".strip() or obj.username
     
-    def get_profile_photo_url(self, obj):
-        return obj.get_profile_photo_url()
+    def get_last_seen(self, obj):
+        # Henüz yazılmamış dokunuşlar tampondan okunur
+        last_seen = tracker.last_seen(obj)
+        return serializers.DateTimeField().to_representation(last_seen) if last_seen else None
 
 
-class UserSearchSerializer(serializers.ModelSerializer):
-    """Kullanıcı arama sonuçları için basit serializer"""
+class UserSearchSerializer(SparseFieldsMixin, PhotoSizeMixin, serializers.ModelSerializer):
+    """Kullanıcı arama sonuçları için basit serializer (listelerde küçük avatar)"""
     full_name = serializers.SerializerMethodField()
     profile_photo_url = serializers.SerializerMethodField()
+    default_photo_size = settings.PROFILE_PHOTO_LIST_SIZE
     
     class Meta:
         model = CustomUser
@@ -32,9 +83,123 @@ class UserSearchSerializer(serializers.ModelSerializer):
     
     def get_full_name(self, obj):
         return f"{obj.first_name} {obj.last_name}".strip() or obj.username
+
+
+class UserCardField(PhotoSizeMixin, serializers.Field):
+    """
+    Kullanıcı id'sini önbellekli karta çevirir: UserSearchSerializer(user) ile aynı
+    çıktı, ancak ilişkinin yüklenmesini gerektirmez. Kullanım: UserCardField(source='sender_id')
+    """
+    default_photo_size = settings.PROFILE_PHOTO_LIST_SIZE
     
-    def get_profile_photo_url(self, obj):
-        return obj.get_profile_photo_url()
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+    
+    def to_representation(self, user_id):
+        fieldset = fieldset_from_context(self.context)
+        if not fieldset.expanded(self.field_name):
+            return user_id
+        return fieldset.pick(self.field_name, user_card_data(self.context, user_id, self.get_photo_size()))
+
+
+class CardRowSerializer(RowSerializer):
+    """
+    Kullanıcı kartı içeren satır serializer'ları (UserCardField karşılığı).
+    user_field ile işaretli alanlar genişletilmişse karta, değilse id'ye döner.
+    """
+    
+    def __init__(self, context=None):
+        self.card_getters = []
+        super().__init__(context)
+        self.photo_size = photo_size_from_context(self.context, settings.PROFILE_PHOTO_LIST_SIZE)
+        self.rendered = {}
+    
+    def bind(self, name, source):
+        getter = super().bind(name, source)
+        if not getattr(source, 'user_field', False) or not self.fieldset.expanded(name):
+            return getter
+        self.card_getters.append(getter)
+        pick = self.fieldset.pick
+        
+        def card_getter(row):
+            return pick(name, self.card(getter(row)))
+        return card_getter
+    
+    def card_ids(self, rows):
+        """Genişletilecek kartların kullanıcı id'leri (önbellekten toplu yükleme için)"""
+        return {getter(row) for row in rows for getter in self.card_getters} - {None}
+    
+    def card(self, user_id):
+        if user_id is None:
+            return None
+        # Aynı kullanıcı listede birden çok kez geçebilir (ör. bekleyen isteklerin alıcısı)
+        if user_id not in self.rendered:
+            self.rendered[user_id] = user_card_data(self.context, user_id, self.photo_size)
+        return self.rendered[user_id]
+
+
+def user_field(*columns):
+    """Satırdan kullanıcı id'si döndüren hesaplanan alan (CardRowSerializer karta çevirir)"""
+    def decorator(getter):
+        getter = uses(*columns)(getter)
+        getter.user_field = True
+        return getter
+    return decorator
+
+
+def card_field(name):
+    """Satırdaki kullanıcı id'si sütunu, kart olarak"""
+    @user_field(name)
+    def getter(self, row):
+        return row[name]
+    return getter
+
+
+@uses('first_name', 'last_name', 'username')
+def full_name(self, row):
+    return f"{row['first_name']} {row['last_name']}".strip() or row['username']
+
+
+@uses('profile_photo', 'profile_photo_file', 'profile_photo_variants')
+def profile_photo_url(self, row):
+    return photo_url(row['profile_photo_file'], row['profile_photo_variants'], row['profile_photo'], self.photo_size)
+
+
+class UserSearchRowSerializer(CardRowSerializer):
+    """UserSearchSerializer'ın .values() satırları için hızlı karşılığı"""
+    fields = [
+        ('id', 'id'),
+        ('first_name', 'first_name'),
+        ('last_name', 'last_name'),
+        ('full_name', full_name),
+        ('profile_photo', 'profile_photo'),
+        ('profile_photo_url', profile_photo_url),
+    ]
+
+
+class ContactMatchRowSerializer(UserSearchRowSerializer):
+    """Rehber eşleştirme sonucu: kart + istemcinin kişiyi bulacağı e-posta özeti"""
+    fields = UserSearchRowSerializer.fields + [('email_hash', 'email_hash')]
+
+
+@uses('first_name', 'last_name')
+def admin_full_name(self, row):
+    return f"{row['first_name']} {row['last_name']}".strip()
+
+
+class AdminUserRowSerializer(RowSerializer):
+    """Admin kullanıcı listesi (AllUsersView)"""
+    fields = [
+        ('id', 'id'),
+        ('email', 'email'),
+        ('first_name', 'first_name'),
+        ('last_name', 'last_name'),
+        ('full_name', admin_full_name),
+        ('profile_photo', uses('profile_photo')(lambda self, row: row['profile_photo'] or None)),
+        ('is_admin_user', 'is_admin_user'),
+        ('date_joined', uses('date_joined')(lambda self, row: row['date_joined'].isoformat())),
+    ]
 
 
 class GoogleAuthSerializer(serializers.Serializer):
@@ -0,0 +1,153 @@
+"""
+Giriş/kayıt sırasında kullanıcı oluşturma ve güncelleme.
+
+- Mevcut kullanıcı tek sorguyla bulunur, sadece gerçekten değişen alanlar
+  yazılır (çoğu girişte hiç UPDATE yoktur).
+- Kullanıcı adı çakışmaları, 'base%' ile başlayan tüm adlar tek sorguda
+  çekilerek çözülür.
+- Aynı kullanıcının eşzamanlı ilk girişleri firebase_uid/google_id unique
+  kısıtına çarpar; kaybeden istek kazananın oluşturduğu kaydı kullanır.
+"""
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from .images import discard_variants, strip_metadata
+from .models import CustomUser
+from .tasks import generate_photo_variants
+
+# Kullanıcı adı eşzamanlı olarak alınırsa kaç kez yeniden denenecek
+MAX_CREATE_ATTEMPTS = 5
+
+
+def split_name(name):
+    """'Ad Soyad' -> ('Ad', 'Soyad')"""
+    name_parts = name.split(' ', 1) if name else ['', '']
+    return name_parts[0], name_parts[1] if len(name_parts) > 1 else ''
+
+
+def pick_username(email, uid):
+    """E-postadan türetilen, boştaki ilk kullanıcı adı (tek sorgu)"""
+    base_username = email.split('@')[0] if email else f'user_{uid[:8]}'
+    taken = set(
+        CustomUser.objects.filter(username__startswith=base_username)
+        .values_list('username', flat=True)
+    )
+    if base_username not in taken:
+        return base_username
+    counter = 1
+    while f"{base_username}{counter}" in taken:
+        counter += 1
+    return f"{base_username}{counter}"
+
+
+def apply_changes(user, changes):
+    """Sadece farklı olan alanları yaz; değişen alan listesini döndür"""
+    changed = [field for field, value in changes.items() if getattr(user, field) != value]
+    for field in changed:
+        setattr(user, field, changes[field])
+    if changed:
+        user.save(update_fields=changed)
+    return changed
+
+
+def _create_user(identity_field, identity, email, fields):
+    """
+    Yeni kullanıcı oluştur. Aynı kimlikle eşzamanlı bir oluşturma kazanırsa
+    onun kaydını (created=False) döndürür.
+    """
+    for _ in range(MAX_CREATE_ATTEMPTS):
+        username = pick_username(email, identity)
+        try:
+            with transaction.atomic():
+                user = CustomUser.objects.create(
+                    username=username, email=email, **{identity_field: identity}, **fields
+                )
+            return user, True
+        except IntegrityError:
+            existing = CustomUser.objects.filter(**{identity_field: identity}).first()
+            if existing is not None:
+                return existing, False
+            # Kullanıcı adı bu arada başka bir kayıt tarafından alındı, tekrar dene
+    raise IntegrityError(f'Benzersiz kullanıcı adı bulunamadı: {email or identity}')
+
+
+def upsert_firebase_login_user(decoded_token):
+    """Firebase girişi: firebase_uid veya e-posta ile eşleştir, yoksa oluştur"""
+    uid = decoded_token['uid']
+    email = decoded_token.get('email', '')
+    picture = decoded_token.get('picture', '')
+    email_verified = decoded_token.get('email_verified', False)
+    first_name, last_name = split_name(decoded_token.get('name', ''))
+
+    lookup = Q(firebase_uid=uid)
+    if email:
+        lookup |= Q(email=email)
+    user = CustomUser.objects.filter(lookup).first()
+
+    if user is None:
+        return _create_user('firebase_uid', uid, email, {
+            'first_name': first_name,
+            'last_name': last_name,
+            'profile_photo': picture,
+            'is_email_verified': email_verified,
+        })
+
+    changes = {'firebase_uid': uid, 'is_email_verified': email_verified}
+    if picture:
+        changes['profile_photo'] = picture
+    if first_name and not user.first_name:
+        changes['first_name'] = first_name
+    if last_name and not user.last_name:
+        changes['last_name'] = last_name
+    apply_changes(user, changes)
+    return user, False
+
+
+def upsert_firebase_registered_user(decoded_token, first_name, last_name, profile_photo=None):
+    """Firebase kaydı: ad/soyad formdan gelir, fotoğraf yüklenebilir"""
+    uid = decoded_token['uid']
+    email = decoded_token.get('email', '')
+
+    user = CustomUser.objects.filter(firebase_uid=uid).first()
+    if user is None:
+        user, created = _create_user('firebase_uid', uid, email, {
+            'first_name': first_name,
+            'last_name': last_name,
+        })
+    else:
+        created = False
+        apply_changes(user, {'first_name': first_name, 'last_name': last_name})
+
+    if profile_photo:
+        discard_variants(user)
+        # Orijinal de herkese açık sunulur: konum vb. metadata saklanmadan atılır
+        user.profile_photo_file = strip_metadata(profile_photo)
+        user.save(update_fields=['profile_photo_file', 'profile_photo_variants'])
+        # Küçük boyutlar görev kuyruğunda üretilir; o zamana kadar orijinal döner
+        generate_photo_variants.enqueue(user.id)
+    return user, created
+
+
+def upsert_google_user(idinfo):
+    """Google girişi (geriye uyumluluk): google_id ile eşleştir"""
+    google_id = idinfo['sub']
+    email = idinfo.get('email', '')
+    fields = {
+        'first_name': idinfo.get('given_name', ''),
+        'last_name': idinfo.get('family_name', ''),
+        'profile_photo': idinfo.get('picture', ''),
+    }
+
+    user = CustomUser.objects.filter(google_id=google_id).first()
+    if user is None:
+        return _create_user('google_id', google_id, email, fields)
+    apply_changes(user, fields)
+    return user, False
+
+
+# Async view'lar için: transaction.atomic async bağlamda kullanılamadığından
+# servisler istek thread'inde (thread_sensitive) çalıştırılır.
+aupsert_firebase_login_user = sync_to_async(upsert_firebase_login_user)
+aupsert_firebase_registered_user = sync_to_async(upsert_firebase_registered_user)
+aupsert_google_user = sync_to_async(upsert_google_user)
@@ -0,0 +1,9 @@
+"""users uygulamasının arka plan görevleri (tasks.queue)"""
+from tasks.queue import task
+
+from .images import generate_variants
+
+
+@task('users.generate_photo_variants', max_attempts=3)
+def generate_photo_variants(user_id):
+    generate_variants(user_id)
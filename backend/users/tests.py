@@ -1,3 +1,412 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import msgpack
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path
+from django.utils import timezone
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+
+from core.querybudget import QueryBudgetTestMixin
+from core.ratelimit import get_backend
+from friends.models import BlockedUser
+from friends.tests import make_photo_users
+
+from . import async_views, views
+from .activity import ActivityTracker, write_last_seen
+from .auth_providers import AuthProvider
+from .cards import user_cards
+from .models import CustomUser
+from .serializers import UserSearchRowSerializer, UserSearchSerializer
+from .services import (
+    MAX_CREATE_ATTEMPTS, _create_user, pick_username, upsert_firebase_login_user, upsert_firebase_registered_user,
+)
+
+N = 5
+
+# AuthViewParityTests için: senkron ve async kimlik doğrulama view'ları yan yana
+urlpatterns = [
+    path('sync/firebase-login/', views.FirebaseLoginView.as_view()),
+    path('sync/firebase-register/', views.FirebaseRegisterView.as_view()),
+    path('sync/google-login/', views.GoogleLoginView.as_view()),
+    path('async/firebase-login/', async_views.AsyncFirebaseLoginView.as_view()),
+    path('async/firebase-register/', async_views.AsyncFirebaseRegisterView.as_view()),
+    path('async/google-login/', async_views.AsyncGoogleLoginView.as_view()),
+]
+
+
+class UsersQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """Arama ve toplu kart endpoint'lerinin sorgu sayısı satır sayısıyla büyümemeli"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username='me', email='me@example.com', password='x')
+
+    def setUp(self):
+        cache.clear()
+        backend = get_backend()
+        if hasattr(backend, 'tats'):
+            backend.tats.clear()
+        self.client.force_login(self.user)
+
+    def seed(self, prefix, count):
+        CustomUser.objects.bulk_create([
+            CustomUser(username=f'{prefix}{i}', first_name=f'Deniz{prefix}{i}', email=f'{prefix}{i}@example.com')
+            for i in range(count)
+        ])
+        users = list(CustomUser.objects.filter(username__startswith=prefix).order_by('id'))
+        # Engellenenler bulk yanıtında 'missing' olarak döner
+        BlockedUser.objects.bulk_create([BlockedUser(blocker=self.user, blocked=user) for user in users[::2]])
+        return users
+
+    def test_search(self):
+        total = 0
+        for prefix, count in (('small', N), ('large', 10 * N)):
+            self.seed(prefix, count)
+            total += count
+            response = self.assertWithinQueryBudget('get', '/api/users/search/?q=Deniz')
+            self.assertEqual(response.status_code, 200)
+            # Arama en fazla 20 sonuç döndürür
+            self.assertEqual(len(response.json()), min(total, 20))
+
+    def test_bulk(self):
+        for prefix, count in (('small', N), ('large', 10 * N)):
+            ids = [user.id for user in self.seed(prefix, count)]
+            cache.clear()
+            response = self.assertWithinQueryBudget('get', '/api/users/bulk/', {'ids': ','.join(map(str, ids))})
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertEqual(len(data['users']) + len(data['missing']), count)
+            self.assertEqual(len(data['missing']), len(ids[::2]))
+
+            response = self.assertWithinQueryBudget('post', '/api/users/bulk/', {'ids': ids})
+            self.assertEqual(response.status_code, 200)
+
+
+class RowSerializerEquivalenceTests(TestCase):
+    """Arama sonuçları: UserSearchRowSerializer, UserSearchSerializer ile byte byte aynı"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.me, *_ = make_photo_users(12)
+
+    def test_search(self):
+        queryset = CustomUser.objects.exclude(id=self.me.id)
+        renderer = JSONRenderer()
+        for params in ({}, {'photo_size': '256'}, {'photo_size': 'original'}, {'fields': 'id,full_name'}):
+            with self.subTest(params=params):
+                request = RequestFactory().get('/', params)
+                request.user = self.me
+                row_serializer = UserSearchRowSerializer({'request': request})
+                rows = list(queryset.values(*row_serializer.values_fields))
+                context = {'request': request, 'user_cards': user_cards.get_many(row_serializer.card_ids(rows))}
+                self.assertEqual(
+                    renderer.render(UserSearchRowSerializer(context).serialize(rows)),
+                    renderer.render(UserSearchSerializer(list(queryset), many=True, context=context).data),
+                )
+
+
+class ActivityTrackerTests(TestCase):
+    """last_seen tamponu: tekilleştirme, okuma birleştirme ve toplu yazma"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(username='seen', email='seen@example.com')
+        cls.other = CustomUser.objects.create_user(username='other', email='other@example.com')
+
+    def test_touch_dedupes_within_window(self):
+        tracker = ActivityTracker(window=60, flush_interval=30)
+        tracker.touch(self.user.id)
+        first = tracker.pending_for(self.user.id)
+        tracker.touch(self.user.id)
+        self.assertEqual(tracker.pending_for(self.user.id), first)
+        # Pencere dışında yeni değer alınır
+        tracker._recent[self.user.id] -= 61
+        tracker.touch(self.user.id)
+        self.assertGreater(tracker.pending_for(self.user.id), first)
+
+    def test_touch_does_not_write(self):
+        tracker = ActivityTracker(window=0, flush_interval=0)
+        with self.assertNumQueries(0):
+            tracker.touch(self.user.id)
+        self.assertIsNone(tracker._flusher_pid)
+
+    def test_last_seen_merges_buffer_and_database(self):
+        tracker = ActivityTracker()
+        now = timezone.now()
+        self.user.last_seen = now - timedelta(hours=1)
+        self.assertEqual(tracker.last_seen(self.user), self.user.last_seen)
+        tracker._pending[self.user.id] = now
+        self.assertEqual(tracker.last_seen(self.user), now)
+        self.user.last_seen = now + timedelta(hours=1)
+        self.assertEqual(tracker.last_seen(self.user), self.user.last_seen)
+        self.user.last_seen = None
+        self.assertEqual(tracker.last_seen(self.user), now)
+
+    def test_write_never_moves_backwards(self):
+        now = timezone.now()
+        newer = now + timedelta(hours=1)
+        CustomUser.objects.filter(id=self.other.id).update(last_seen=newer)
+        with self.assertNumQueries(1):
+            write_last_seen({self.user.id: now, self.other.id: now})
+        self.user.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(self.user.last_seen, now)
+        self.assertEqual(self.other.last_seen, newer)
+
+    def test_flush_writes_and_keeps_failed_batch(self):
+        tracker = ActivityTracker(window=60, flush_interval=30)
+        tracker.touch(self.user.id)
+        with mock.patch('users.activity.write_last_seen', side_effect=RuntimeError), \
+                self.assertLogs('users.activity', 'ERROR'):
+            self.assertEqual(tracker.flush(), 0)
+        self.assertIsNotNone(tracker.pending_for(self.user.id))
+
+        self.assertEqual(tracker.flush(), 1)
+        self.assertIsNone(tracker.pending_for(self.user.id))
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_seen)
+
+
+def jpeg_with_exif(width, height, orientation):
+    """EXIF yönü ve GPS konumu taşıyan JPEG"""
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    exif.get_ifd(0x8825)[1] = 'N'  # GPSLatitudeRef
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), 'red').save(buffer, 'JPEG', exif=exif)
+    return buffer.getvalue()
+
+
+@override_settings(TASKS_EAGER=True)
+class ProfilePhotoTests(TestCase):
+    """Yüklenen orijinal ve varyantlar: boyutlar, metadata, EXIF yönü, eski dosyalar"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def upload(self, data, name='me.jpg'):
+        with self.assertLogs('users.images', 'INFO'), self.captureOnCommitCallbacks(execute=True):
+            user, _ = upsert_firebase_registered_user(
+                {'uid': 'photo-uid', 'email': 'photo@example.com'}, 'Foto', 'Test',
+                SimpleUploadedFile(name, data, content_type='image/jpeg'),
+            )
+        user.refresh_from_db()
+        return user
+
+    def assertClean(self, name, size):
+        with default_storage.open(name, 'rb') as f:
+            image = Image.open(f)
+            image.load()
+        self.assertEqual(image.size, size)
+        self.assertEqual(len(image.getexif()), 0)
+        self.assertNotIn('icc_profile', image.info)
+
+    def test_original_and_variants_are_stripped_and_oriented(self):
+        # Yön 6: 90° döndürülmüş; gösterilen boyut 1000×2000
+        user = self.upload(jpeg_with_exif(2000, 1000, orientation=6))
+        self.assertClean(user.profile_photo_file.name, (1000, 2000))
+
+        self.assertEqual(set(user.profile_photo_variants), {str(size) for size in settings.PROFILE_PHOTO_SIZES})
+        for size in settings.PROFILE_PHOTO_SIZES:
+            with self.subTest(size=size):
+                self.assertClean(user.profile_photo_variants[str(size)], (size // 2, size))
+
+    def test_new_upload_deletes_old_variants(self):
+        old = self.upload(jpeg_with_exif(300, 300, orientation=1)).profile_photo_variants
+        new = self.upload(jpeg_with_exif(400, 200, orientation=1), name='new.jpg').profile_photo_variants
+        self.assertEqual(len(new), len(settings.PROFILE_PHOTO_SIZES))
+        for name in old.values():
+            self.assertFalse(default_storage.exists(name))
+        for name in new.values():
+            self.assertTrue(default_storage.exists(name))
+
+
+class UserServiceTests(TestCase):
+    """Giriş/kayıt servisleri: kullanıcı adı seçimi, eşzamanlı oluşturma, gereksiz yazma yok"""
+
+    token = {'uid': 'uid-1', 'email': 'deniz@example.com', 'name': 'Deniz Yılmaz',
+             'picture': 'https://example.com/d.jpg', 'email_verified': True}
+
+    def test_username_collisions_resolved_in_one_query(self):
+        for username in ('deniz', 'deniz1', 'deniz2', 'denizci'):
+            CustomUser.objects.create_user(username=username, email=f'{username}@example.org')
+        with self.assertNumQueries(1):
+            self.assertEqual(pick_username('deniz@example.com', 'uid'), 'deniz3')
+        with self.assertNumQueries(1):
+            self.assertEqual(pick_username('', 'abcdefghijk'), 'user_abcdefgh')
+
+    def test_concurrent_create_returns_existing_row(self):
+        # Yarışı kaybeden istek: ilk aramada yoktu, oluştururken unique kısıtına çarptı
+        winner = CustomUser.objects.create_user(username='winner', email='w@example.com', firebase_uid='race')
+        user, created = _create_user('firebase_uid', 'race', 'loser@example.com', {'first_name': 'X'})
+        self.assertEqual((user.id, created), (winner.id, False))
+        self.assertEqual(CustomUser.objects.count(), 1)
+
+    def test_username_taken_meanwhile_is_retried(self):
+        CustomUser.objects.create_user(username='taken', email='t@example.com')
+        with mock.patch('users.services.pick_username', side_effect=['taken', 'free']):
+            user, created = _create_user('firebase_uid', 'uid-2', 'x@example.com', {})
+        self.assertEqual((user.username, created), ('free', True))
+
+        with mock.patch('users.services.pick_username', return_value='taken') as pick, \
+                self.assertRaises(IntegrityError):
+            _create_user('firebase_uid', 'uid-3', 'y@example.com', {})
+        self.assertEqual(pick.call_count, MAX_CREATE_ATTEMPTS)
+
+    def test_login_without_changes_does_not_write(self):
+        user, created = upsert_firebase_login_user(self.token)
+        self.assertTrue(created)
+        self.assertEqual((user.username, user.first_name, user.last_name), ('deniz', 'Deniz', 'Yılmaz'))
+
+        # Değişiklik yoksa yalnızca arama sorgusu
+        with self.assertNumQueries(1):
+            self.assertEqual(upsert_firebase_login_user(self.token), (user, False))
+
+        # Değişen alan tek başına yazılır
+        with CaptureQueriesContext(connection) as ctx:
+            upsert_firebase_login_user({**self.token, 'picture': 'https://example.com/new.jpg'})
+        updates = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"profile_photo"', updates[0])
+        self.assertNotIn('"first_name"', updates[0])
+        user.refresh_from_db()
+        self.assertEqual(user.profile_photo, 'https://example.com/new.jpg')
+
+
+class StubProvider(AuthProvider):
+    """'ok:<uid>' token'larını kabul eden sağlayıcı"""
+
+    def _load(self):
+        return True
+
+    def verify(self, token):
+        if not token.startswith('ok:'):
+            raise ValueError('Token imzası geçersiz')
+        uid = token[3:]
+        return {'uid': uid, 'sub': uid, 'email': f'{uid}@example.com', 'name': 'Ada Kaya', 'email_verified': True}
+
+
+@override_settings(ROOT_URLCONF='users.tests')
+class AuthViewParityTests(TestCase):
+    """Async giriş/kayıt view'ları senkron view'larla aynı yanıtı (JSON veya MessagePack) vermeli"""
+
+    def setUp(self):
+        cache.clear()
+        get_backend().tats.clear()
+        patcher = mock.patch.dict('users.auth_providers._registry', {
+            'firebase': StubProvider(), 'google': StubProvider(),
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, client, url, data, **extra):
+        get_backend().tats.clear()
+        if client is self.async_client:
+            return async_to_sync(client.post)(url, data, **extra)
+        return client.post(url, data, **extra)
+
+    def both(self, view, data, **extra):
+        """Aynı isteği önce senkron, sonra async view'a gönder; (yanıt, gövde) çiftleri"""
+        results = []
+        for client, prefix in ((self.client, 'sync'), (self.async_client, 'async')):
+            response = self.post(client, f'/{prefix}/{view}/', data, **extra)
+            results.append((response, self.decode(response)))
+        return results
+
+    def decode(self, response):
+        if response['Content-Type'] == 'application/msgpack':
+            body = msgpack.unpackb(response.content)
+        else:
+            body = response.json()
+        # Giriş sonrası ActivityMiddleware son görülmeyi günceller
+        body.get('user', {}).pop('last_seen', None)
+        return body
+
+    def assertSame(self, results, status):
+        (sync, sync_body), (async_, async_body) = results
+        self.assertEqual((sync.status_code, async_.status_code), (status, status))
+        self.assertEqual(async_['Content-Type'], sync['Content-Type'])
+        self.assertIn('Accept', async_['Vary'])
+        self.assertEqual(async_body, sync_body)
+        return sync_body
+
+    def test_login_responses_match_in_both_formats(self):
+        CustomUser.objects.create_user(username='ada', email='ada@example.com', firebase_uid='ada', google_id='ada')
+        for view, field in (('firebase-login', 'firebase_token'), ('google-login', 'id_token')):
+            for accept in ('application/json', 'application/msgpack'):
+                with self.subTest(view=view, accept=accept):
+                    body = self.assertSame(self.both(
+                        view, {field: 'ok:ada'}, content_type='application/json', headers={'Accept': accept},
+                    ), 200)
+                    self.assertEqual(body['message'], 'Giriş başarılı')
+
+    def test_new_user_login(self):
+        responses = [
+            self.post(client, f'/{prefix}/firebase-login/', {'firebase_token': f'ok:{prefix}'},
+                      content_type='application/json', headers={'Accept': 'application/msgpack'})
+            for client, prefix in ((self.client, 'sync'), (self.async_client, 'async'))
+        ]
+        for response in responses:
+            self.assertEqual(response.status_code, 200)
+            body = self.decode(response)
+            self.assertEqual((body['is_new_user'], body['user']['full_name']), (True, 'Ada Kaya'))
+        self.assertEqual(set(CustomUser.objects.values_list('firebase_uid', flat=True)), {'sync', 'async'})
+
+    def test_errors_match(self):
+        for accept in ('application/json', 'application/msgpack'):
+            with self.subTest(accept=accept):
+                self.assertSame(self.both(
+                    'firebase-login', {}, content_type='application/json', headers={'Accept': accept},
+                ), 400)
+                body = self.assertSame(self.both(
+                    'firebase-login', {'firebase_token': 'forged'}, content_type='application/json',
+                    headers={'Accept': accept},
+                ), 401)
+                self.assertEqual(body['detail'], 'Token imzası geçersiz')
+                self.assertSame(self.both(
+                    'firebase-login', '{"firebase_token":', content_type='application/json', headers={'Accept': accept},
+                ), 400)
+        # Register yalnızca form/multipart kabul eder
+        self.assertSame(self.both(
+            'firebase-register', {'firebase_token': 'ok:ada'}, content_type='application/json',
+        ), 415)
+
+    def test_msgpack_request_body(self):
+        CustomUser.objects.create_user(username='ada', email='ada@example.com', firebase_uid='ada')
+        body = self.assertSame(self.both(
+            'firebase-login', msgpack.packb({'firebase_token': 'ok:ada'}),
+            content_type='application/msgpack', headers={'Accept': 'application/msgpack'},
+        ), 200)
+        self.assertEqual(body['user']['username'], 'ada')
+
+    def test_register_matches(self):
+        for client, prefix in ((self.client, 'sync'), (self.async_client, 'async')):
+            with self.subTest(view=prefix):
+                data = {'firebase_token': f'ok:{prefix}', 'first_name': 'Ada', 'last_name': prefix}
+                response = self.post(client, f'/{prefix}/firebase-register/', data, headers={'Accept': 'application/msgpack'})
+                self.assertEqual((response.status_code, response['Content-Type']), (201, 'application/msgpack'))
+                self.assertEqual(self.decode(response)['user']['full_name'], f'Ada {prefix}')
+
+        self.assertSame(self.both('firebase-register', {'first_name': 'Ada'}), 400)
+        # Var olan kullanıcı: 200
+        body = self.assertSame(self.both(
+            'firebase-register', {'firebase_token': 'ok:sync', 'first_name': 'Ada', 'last_name': 'Kaya'},
+            headers={'Accept': 'application/msgpack'},
+        ), 200)
+        self.assertEqual((body['is_new_user'], body['user']['full_name']), (False, 'Ada Kaya'))
@@ -1,9 +1,19 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     GoogleLoginView, CurrentUserView, UserSearchView, LogoutView,
-    FirebaseLoginView, FirebaseRegisterView, AllUsersView, ToggleAdminView
+    FirebaseLoginView, FirebaseRegisterView, AllUsersView, ToggleAdminView,
+    ContactMatchView, UserBulkView
 )
 
+# ASGI altında kimlik doğrulama endpoint'leri async sürümlerle sunulur
+if settings.ASYNC_AUTH_VIEWS:
+    from .async_views import (
+        AsyncFirebaseLoginView as FirebaseLoginView,
+        AsyncFirebaseRegisterView as FirebaseRegisterView,
+        AsyncGoogleLoginView as GoogleLoginView,
+    )
+
 urlpatterns = [
     # BURASI YENİ: Ana adrese gelenleri 'AllUsersView' karşılasın
     path('', AllUsersView.as_view(), name='users-list-root'), 
@@ -18,6 +28,8 @@ urlpatterns = [
     # User operations
     path('me/', CurrentUserView.as_view(), name='current-user'),
     path('search/', UserSearchView.as_view(), name='user-search'),
+    path('match-contacts/', ContactMatchView.as_view(), name='match-contacts'),
+    path('bulk/', UserBulkView.as_view(), name='user-bulk'),
     path('logout/', LogoutView.as_view(), name='logout'),
     
     # Admin operations (Bu da dursun, zararı yok)
@@ -3,45 +3,28 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.db.models import Q
+import hashlib
+import json
+import re
+
 from django.conf import settings
+from django.db.models import Q
+from django.utils.http import parse_etags
 
+from core.fieldsets import FieldSet
+from friends.models import BlockedUser
+from . import search
+from .auth_providers import get_provider
+from .cards import render_card, user_cards
 from .models import CustomUser
 from .serializers import (
     UserSerializer, UserSearchSerializer, GoogleAuthSerializer,
-    FirebaseAuthSerializer, FirebaseRegisterSerializer
+    FirebaseAuthSerializer, FirebaseRegisterSerializer, AdminUserRowSerializer,
+    ContactMatchRowSerializer, UserSearchRowSerializer, photo_size_from_context
+)
+from .services import (
+    upsert_firebase_login_user, upsert_firebase_registered_user, upsert_google_user
 )
-
-# Firebase Admin SDK - opsiyonel import
-try:
-    import firebase_admin
-    from firebase_admin import auth as firebase_auth, credentials
-    
-    # Firebase Admin SDK'yı başlat (henüz başlatılmamışsa)
-    if not firebase_admin._apps:
-        # serviceAccountKey.json dosyasının yolu
-        import os
-        cred_path = os.path.join(settings.BASE_DIR, 'serviceAccountKey.json')
-        if os.path.exists(cred_path):
-            cred = credentials.Certificate(cred_path)
-            firebase_admin.initialize_app(cred)
-            FIREBASE_ENABLED = True
-        else:
-            FIREBASE_ENABLED = False
-            print("Warning: serviceAccountKey.json not found. Firebase authentication disabled.")
-    else:
-        FIREBASE_ENABLED = True
-except ImportError:
-    FIREBASE_ENABLED = False
-    print("Warning: firebase-admin not installed. Firebase authentication disabled.")
-
-# Google OAuth (geriye uyumluluk için)
-try:
-    from google.oauth2 import id_token
-    from google.auth.transport import requests
-    GOOGLE_AUTH_ENABLED = True
-except ImportError:
-    GOOGLE_AUTH_ENABLED = False
 
 
 class FirebaseLoginView(APIView):
@@ -50,9 +33,12 @@ class FirebaseLoginView(APIView):
     Firebase ID token doğrulayıp kullanıcı oluşturur veya mevcut kullanıcıyı döndürür.
     """
     permission_classes = [permissions.AllowAny]
+    rate_limits = [('ip', '10/m')]
+    query_budget = 14
     
     def post(self, request):
-        if not FIREBASE_ENABLED:
+        firebase = get_provider('firebase')
+        if not firebase.available:
             return Response({
                 'error': 'Firebase authentication disabled',
                 'detail': 'Firebase Admin SDK not configured'
@@ -66,56 +52,10 @@ class FirebaseLoginView(APIView):
         
         try:
             # Firebase ID token doğrulama
-            decoded_token = firebase_auth.verify_id_token(token)
-            
-            uid = decoded_token['uid']
-            email = decoded_token.get('email', '')
-            name = decoded_token.get('name', '')
-            picture = decoded_token.get('picture', '')
-            email_verified = decoded_token.get('email_verified', False)
-            
-            # İsmi parçala
-            name_parts = name.split(' ', 1) if name else ['', '']
-            first_name = name_parts[0]
-            last_name = name_parts[1] if len(name_parts) > 1 else ''
+            decoded_token = firebase.verify(token)
             
-            # Kullanıcı var mı kontrol et (firebase_uid veya email ile)
-            user = CustomUser.objects.filter(
-                Q(firebase_uid=uid) | Q(email=email)
-            ).first()
-            
-            if user:
-                # Mevcut kullanıcıyı güncelle
-                user.firebase_uid = uid
-                user.is_email_verified = email_verified
-                if picture:
-                    user.profile_photo = picture
-                if first_name and not user.first_name:
-                    user.first_name = first_name
-                if last_name and not user.last_name:
-                    user.last_name = last_name
-                user.save()
-                created = False
-            else:
-                # Yeni kullanıcı oluştur
-                username = email.split('@')[0] if email else f'user_{uid[:8]}'
-                # Username benzersiz olmalı
-                base_username = username
-                counter = 1
-                while CustomUser.objects.filter(username=username).exists():
-                    username = f"{base_username}{counter}"
-                    counter += 1
-                
-                user = CustomUser.objects.create(
-                    firebase_uid=uid,
-                    username=username,
-                    email=email,
-                    first_name=first_name,
-                    last_name=last_name,
-                    profile_photo=picture,
-                    is_email_verified=email_verified,
-                )
-                created = True
+            # Kullanıcıyı bul/oluştur, sadece değişen alanları yaz
+            user, created = upsert_firebase_login_user(decoded_token)
             
             # Session oluştur
             from django.contrib.auth import login
@@ -141,9 +81,12 @@ class FirebaseRegisterView(APIView):
     """
     permission_classes = [permissions.AllowAny]
     parser_classes = [MultiPartParser, FormParser]
+    rate_limits = [('ip', '5/m')]
+    query_budget = 14
     
     def post(self, request):
-        if not FIREBASE_ENABLED:
+        firebase = get_provider('firebase')
+        if not firebase.available:
             return Response({
                 'error': 'Firebase authentication disabled',
                 'detail': 'Firebase Admin SDK not configured'
@@ -161,42 +104,11 @@ class FirebaseRegisterView(APIView):
         
         try:
             # Firebase ID token doğrulama
-            decoded_token = firebase_auth.verify_id_token(firebase_token)
-            
-            uid = decoded_token['uid']
-            email = decoded_token.get('email', '')
-            
-            # Kullanıcı var mı kontrol et
-            user = CustomUser.objects.filter(firebase_uid=uid).first()
+            decoded_token = firebase.verify(firebase_token)
             
-            if user:
-                # Mevcut kullanıcıyı güncelle
-                user.first_name = first_name
-                user.last_name = last_name
-                if profile_photo:
-                    user.profile_photo_file = profile_photo
-                user.save()
-                created = False
-            else:
-                # Yeni kullanıcı oluştur
-                username = email.split('@')[0] if email else f'user_{uid[:8]}'
-                base_username = username
-                counter = 1
-                while CustomUser.objects.filter(username=username).exists():
-                    username = f"{base_username}{counter}"
-                    counter += 1
-                
-                user = CustomUser.objects.create(
-                    firebase_uid=uid,
-                    username=username,
-                    email=email,
-                    first_name=first_name,
-                    last_name=last_name,
-                )
-                if profile_photo:
-                    user.profile_photo_file = profile_photo
-                    user.save()
-                created = True
+            user, created = upsert_firebase_registered_user(
+                decoded_token, first_name, last_name, profile_photo
+            )
             
             # Session oluştur
             from django.contrib.auth import login
@@ -221,9 +133,12 @@ class GoogleLoginView(APIView):
     Google ID token doğrulayıp kullanıcı oluşturur veya mevcut kullanıcıyı döndürür.
     """
     permission_classes = [permissions.AllowAny]
+    rate_limits = [('ip', '10/m')]
+    query_budget = 14
     
     def post(self, request):
-        if not GOOGLE_AUTH_ENABLED:
+        google = get_provider('google')
+        if not google.available:
             return Response({
                 'error': 'Google authentication disabled',
             }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
@@ -236,36 +151,9 @@ class GoogleLoginView(APIView):
         
         try:
             # Google ID token doğrulama
-            idinfo = id_token.verify_oauth2_token(
-                token, 
-                requests.Request(), 
-                settings.GOOGLE_CLIENT_ID
-            )
-            
-            google_id = idinfo['sub']
-            email = idinfo.get('email', '')
-            first_name = idinfo.get('given_name', '')
-            last_name = idinfo.get('family_name', '')
-            profile_photo = idinfo.get('picture', '')
+            idinfo = google.verify(token)
             
-            # Kullanıcı var mı kontrol et, yoksa oluştur
-            user, created = CustomUser.objects.get_or_create(
-                google_id=google_id,
-                defaults={
-                    'username': email.split('@')[0] if email else f'user_{google_id[:8]}',
-                    'email': email,
-                    'first_name': first_name,
-                    'last_name': last_name,
-                    'profile_photo': profile_photo,
-                }
-            )
-            
-            # Mevcut kullanıcının bilgilerini güncelle
-            if not created:
-                user.profile_photo = profile_photo
-                user.first_name = first_name
-                user.last_name = last_name
-                user.save()
+            user, created = upsert_google_user(idinfo)
             
             # Session oluştur
             from django.contrib.auth import login
@@ -286,9 +174,10 @@ class GoogleLoginView(APIView):
 
 class CurrentUserView(APIView):
     """Mevcut kullanıcı bilgilerini döndür"""
+    query_budget = 3
     
     def get(self, request):
-        return Response(UserSerializer(request.user).data)
+        return Response(UserSerializer(request.user, context={'request': request}).data)
 
 
 class UserSearchView(generics.ListAPIView):
@@ -297,6 +186,13 @@ class UserSearchView(generics.ListAPIView):
     Ad soyad ile arama yapılabilir.
     """
     serializer_class = UserSearchSerializer
+    query_budget = 4
+    
+    def list(self, request, *args, **kwargs):
+        # Sonuçlar .values() satırlarından DRF'siz serileştirilir
+        row_serializer = UserSearchRowSerializer(self.get_serializer_context())
+        rows = self.filter_queryset(self.get_queryset()).values(*row_serializer.values_fields)
+        return Response(row_serializer.serialize(rows))
     
     def get_queryset(self):
         query = self.request.query_params.get('q', '')
@@ -304,15 +200,114 @@ class UserSearchView(generics.ListAPIView):
             return CustomUser.objects.none()
         
         # Kendisi hariç arama yap
-        return CustomUser.objects.filter(
-            Q(first_name__icontains=query) | 
-            Q(last_name__icontains=query) |
-            Q(username__icontains=query)
-        ).exclude(id=self.request.user.id)[:20]
+        return search.search(CustomUser.objects.exclude(id=self.request.user.id), query)[:20]
+
+
+class ContactMatchView(APIView):
+    """
+    Rehberdeki e-posta özetlerini (users.models.hash_email) kayıtlı kullanıcılarla eşleştir.
+    Özetler CONTACT_MATCH_CHUNK'lık gruplar halinde indeksli email_hash ile aranır;
+    kendisi ve engelleşilen kullanıcılar sonuçta yer almaz.
+    """
+    rate_limits = [('ip', '30/m'), ('user', '10/m')]
+    query_budget = 10
+    hash_re = re.compile(r'^[0-9a-f]{64}$')
+    
+    def post(self, request):
+        hashes = request.data.get('hashes')
+        if not isinstance(hashes, list) or not hashes:
+            return Response({'error': 'hashes listesi gerekli'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(hashes) > settings.CONTACT_MATCH_MAX:
+            return Response(
+                {'error': f'En fazla {settings.CONTACT_MATCH_MAX} kişi gönderilebilir'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        unique_hashes = {h.lower() for h in hashes if isinstance(h, str)}
+        if not all(self.hash_re.match(h) for h in unique_hashes):
+            return Response({'error': 'Geçersiz e-posta özeti (sha256 hex bekleniyor)'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        me = request.user
+        candidates = CustomUser.objects.filter(is_active=True).exclude(id=me.id).exclude(
+            id__in=BlockedUser.objects.filter(blocker=me).values('blocked_id')
+        ).exclude(
+            id__in=BlockedUser.objects.filter(blocked=me).values('blocker_id')
+        )
+        
+        unique_hashes = sorted(unique_hashes)
+        serializer = ContactMatchRowSerializer({'request': request})
+        matches = []
+        for start in range(0, len(unique_hashes), settings.CONTACT_MATCH_CHUNK):
+            chunk = unique_hashes[start:start + settings.CONTACT_MATCH_CHUNK]
+            matches.extend(serializer.serialize(
+                candidates.filter(email_hash__in=chunk).values(*serializer.values_fields)
+            ))
+        
+        return Response({'count': len(matches), 'matches': matches})
+
+
+class UserBulkView(APIView):
+    """
+    Birden çok kullanıcının kartını tek seferde döndür (istemci önbelleği için).
+    GET ?ids=1,2,3 veya POST {"ids": [...]}. Engelleşilen ve bulunamayan
+    kullanıcılar 'missing' listesinde döner. Yanıt içeriğinden üretilen ETag
+    If-None-Match ile eşleşirse 304 döner.
+    """
+    query_budget = 5
+    
+    def get(self, request):
+        raw_ids = []
+        for value in request.query_params.getlist('ids'):
+            raw_ids.extend(part for part in value.split(',') if part)
+        return self.respond(request, raw_ids)
+    
+    def post(self, request):
+        raw_ids = request.data.get('ids')
+        if not isinstance(raw_ids, list):
+            return Response({'error': 'ids listesi gerekli'}, status=status.HTTP_400_BAD_REQUEST)
+        return self.respond(request, raw_ids)
+    
+    def respond(self, request, raw_ids):
+        try:
+            ids = list(dict.fromkeys(int(user_id) for user_id in raw_ids))
+        except (TypeError, ValueError):
+            return Response({'error': 'ids tam sayı olmalı'}, status=status.HTTP_400_BAD_REQUEST)
+        if not ids:
+            return Response({'error': 'ids gerekli'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > settings.USER_BULK_MAX:
+            return Response(
+                {'error': f'En fazla {settings.USER_BULK_MAX} kullanıcı istenebilir'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        me = request.user
+        hidden = set()
+        for blocker_id, blocked_id in BlockedUser.objects.filter(
+            Q(blocker=me, blocked_id__in=ids) | Q(blocker_id__in=ids, blocked=me)
+        ).values_list('blocker_id', 'blocked_id'):
+            hidden.add(blocked_id if blocker_id == me.id else blocker_id)
+        
+        cards = user_cards.get_many(set(ids) - hidden)
+        size = photo_size_from_context({'request': request}, settings.PROFILE_PHOTO_LIST_SIZE)
+        fieldset = FieldSet.from_request(request)
+        data = {
+            'users': [fieldset.filter(render_card(cards[user_id], size)) for user_id in ids if user_id in cards],
+            'missing': [user_id for user_id in ids if user_id not in cards],
+        }
+        
+        etag = '"%s"' % hashlib.sha1(
+            json.dumps(data, sort_keys=True, separators=(',', ':')).encode()
+        ).hexdigest()
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+        # Sıkıştırılmış yanıtın ETag'i zayıflatılır (W/); karşılaştırma zayıf yapılır
+        if_none_match = {tag.removeprefix('W/') for tag in parse_etags(request.headers.get('If-None-Match', ''))}
+        if etag in if_none_match or '*' in if_none_match:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(data, headers=headers)
 
 
 class LogoutView(APIView):
     """Çıkış yapma endpoint'i"""
+    query_budget = 6
     
     def post(self, request):
         from django.contrib.auth import logout
@@ -329,27 +324,18 @@ class IsAdminUser(permissions.BasePermission):
 class AllUsersView(APIView):
     """Tüm kullanıcıları listele (sadece admin görebilir)"""
     permission_classes = [IsAdminUser]
+    query_budget = 4
     
     def get(self, request):
-        users = CustomUser.objects.all().order_by('-date_joined')
-        data = []
-        for user in users:
-            data.append({
-                'id': user.id,
-                'email': user.email,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'full_name': f"{user.first_name} {user.last_name}".strip(),
-                'profile_photo': user.profile_photo if user.profile_photo else None,
-                'is_admin_user': user.is_admin_user,
-                'date_joined': user.date_joined.isoformat(),
-            })
-        return Response(data)
+        serializer = AdminUserRowSerializer({'request': request})
+        users = CustomUser.objects.order_by('-date_joined').values(*serializer.values_fields)
+        return Response(serializer.serialize(users))
 
 
 class ToggleAdminView(APIView):
     """Kullanıcıya admin yetkisi ver/kaldır (sadece admin yapabilir)"""
     permission_classes = [IsAdminUser]
+    query_budget = 6
     
     def post(self, request, user_id):
         try: